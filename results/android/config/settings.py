@@ -8,3 +8,14 @@ ANDROID_CDP = True  # Set True to use real Android device with Chrome via CDP
 # Chrome DevTools Protocol (CDP) settings for real device
 CDP_HOST = "localhost"
 CDP_PORT = 9222  # Default port for remote debugging
+
+# Screenshot capture
+SCREENSHOT_FORMAT = "png"  # "png", "jpeg" or "webp" (webp needs Pillow)
+SCREENSHOT_QUALITY = 80  # JPEG/WebP quality (0-100)
+SCREENSHOT_FULL_PAGE = True  # Set False to capture only the viewport instead of the full scrollable page
+SCREENSHOT_KEEP_RUNS = 20  # Runs whose screenshots are kept; older unreferenced images are deleted
+SCREENSHOT_MAX_MB = None  # Size budget for kept screenshots; older runs are dropped past it (None = no limit)
+
+# SQLite result store shared with the API and desktop suites (None = results/results.db, "off" to skip)
+RESULTS_DB = None
+TREND_RUNS = 30  # Runs shown in reports/trend_dashboard.html (0 to skip the dashboard)
@@ -5,3 +5,22 @@ from utils.logger import log_info
 @pytest.fixture(scope="session", autouse=True)
 def print_test_env():
     log_info(f"Test running on: {settings.URL} | Device: {settings.DEVICE} | Headless: {settings.HEADLESS}")
+
+@pytest.fixture(scope="session", autouse=True)
+def flush_pending_screenshots():
+    yield
+    from utils.screenshots import flush_screenshots
+    flush_screenshots()
+
+@pytest.fixture(scope="session", autouse=True)
+def render_trend_dashboard():
+    yield
+    if settings.RESULTS_DB == "off" or not settings.TREND_RUNS:
+        return
+    from pathlib import Path
+    from utils.report_engine import DEFAULT_DB_PATH, update_dashboard
+    # Result files saved by earlier runs are picked up too; known ones are skipped
+    path = update_dashboard("android", [str(p) for p in sorted(Path("reports").glob("*.json"))],
+                            "reports/trend_dashboard.html", settings.RESULTS_DB or DEFAULT_DB_PATH,
+                            settings.TREND_RUNS)
+    log_info(f"Trend dashboard generated: {path}")
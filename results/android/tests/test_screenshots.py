@@ -0,0 +1,97 @@
+"""
+Unit tests for the content-addressed screenshot objects and their retention
+"""
+import asyncio
+import os
+import time
+
+import pytest
+
+from utils import screenshots
+
+
+class FakePage:
+    def __init__(self, *frames):
+        self.frames = list(frames)
+
+    async def screenshot(self, **options):
+        return self.frames.pop(0)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Point the module at an empty objects directory with a fresh run"""
+    monkeypatch.setattr(screenshots, "OBJECTS_DIR", tmp_path / "objects")
+    monkeypatch.setattr(screenshots, "_run_steps", {})
+    monkeypatch.setattr(screenshots, "_pending", [])
+    monkeypatch.setattr(screenshots, "_run_started", time.time())
+    monkeypatch.setattr(screenshots.settings, "SCREENSHOT_KEEP_RUNS", 20)
+    monkeypatch.setattr(screenshots.settings, "SCREENSHOT_MAX_MB", None)
+    return tmp_path / "objects"
+
+
+def _object(data: bytes, age: float = 3600) -> str:
+    """Write an object as an earlier run would have, ``age`` seconds ago"""
+    path = screenshots.get_screenshot_path(data)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    old = time.time() - age
+    os.utime(path, (old, old))
+    return str(path)
+
+
+def _objects(objects_dir):
+    return sorted(path.name for path in objects_dir.glob("*/*"))
+
+
+def test_identical_screenshots_are_written_once(store):
+    page = FakePage(b"same", b"same", b"other")
+    paths = [asyncio.run(screenshots.take_screenshot(page, step, image_format="png"))
+             for step in ("home", "cart", "checkout")]
+    screenshots.wait_for_screenshots()
+
+    assert paths[0] == paths[1] != paths[2]
+    assert len(_objects(store)) == 2
+    assert screenshots._run_steps == {"home": paths[0], "cart": paths[0], "checkout": paths[2]}
+
+
+def test_run_count_limit_drops_old_runs_and_their_objects(store, monkeypatch):
+    monkeypatch.setattr(screenshots.settings, "SCREENSHOT_KEEP_RUNS", 2)
+    shared = _object(b"shared")
+    manifest = {"runs": [{"run_id": f"run{n}", "steps": {"shared": shared, "own": _object(f"run {n}".encode())}}
+                         for n in range(1, 4)]}
+    dropped = manifest["runs"][0]["steps"]["own"]
+
+    screenshots._apply_retention(manifest)
+
+    assert [run["run_id"] for run in manifest["runs"]] == ["run2", "run3"]
+    assert len(_objects(store)) == 3
+    assert not os.path.exists(dropped) and os.path.exists(shared)
+
+
+def test_size_budget_keeps_the_newest_runs_that_fit(store, monkeypatch):
+    monkeypatch.setattr(screenshots.settings, "SCREENSHOT_MAX_MB", 250 / (1024 * 1024))
+    manifest = {"runs": [{"run_id": f"run{n}", "steps": {"page": _object(bytes([n]) * 100)}} for n in range(1, 4)]}
+
+    screenshots._apply_retention(manifest)
+
+    assert [run["run_id"] for run in manifest["runs"]] == ["run2", "run3"]
+    assert len(_objects(store)) == 2
+
+
+def test_retention_keeps_in_flight_and_concurrent_objects(store):
+    stale = _object(b"stale")
+    manifest = {"runs": [{"run_id": "run1", "steps": {"page": _object(b"page")}}]}
+    # A concurrent run mid-write, an object it has just finished, and an old object it reused
+    in_flight = screenshots.get_screenshot_path(b"new")
+    in_flight = in_flight.with_name(f"{in_flight.name}.123.tmp")
+    in_flight.parent.mkdir(parents=True, exist_ok=True)
+    in_flight.write_bytes(b"partial")
+    fresh = _object(b"concurrent", age=-1)
+    reused = _object(b"reused")
+    assert screenshots._reuse(screenshots.get_screenshot_path(b"reused"))
+
+    screenshots._apply_retention(manifest)
+
+    assert not os.path.exists(stale)
+    assert in_flight.exists() and os.path.exists(fresh) and os.path.exists(reused)
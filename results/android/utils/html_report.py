@@ -1,7 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import hashlib
 import json
 from datetime import datetime
 
+from utils.report_engine import REPORT_CSS, get_template, render, write_static_assets
+
+THUMBNAIL_SIZE = (240, 480)
+SCREENSHOT_FIELDS = (("screenshot", "Homepage"), ("login_screenshot", "After Login"))
+
+def _make_thumbnail(source: Path, thumb_dir: Path):
+    """Small JPEG next to the report, or None when Pillow or the image is missing"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        stat = source.stat()
+        key = hashlib.sha256(f"{source.resolve()}:{stat.st_mtime_ns}:{THUMBNAIL_SIZE}".encode()).hexdigest()[:32]
+        thumb = thumb_dir / f"{key}.jpg"
+        if not thumb.exists():
+            thumb_dir.mkdir(parents=True, exist_ok=True)
+            with Image.open(source) as image:
+                image = image.convert("RGB")
+                image.thumbnail(THUMBNAIL_SIZE)
+                image.save(thumb, format="JPEG", quality=70)
+        return thumb
+    except OSError:
+        return None
+
+def _screenshot_gallery(result: dict, html_dir: Path) -> str:
+    """Lazily loaded thumbnails (built in a worker pool) that expand to the full screenshot on click"""
+    from utils.screenshots import wait_for_screenshots
+    wait_for_screenshots()
+    shots = [(label, Path(result[field])) for field, label in SCREENSHOT_FIELDS if result.get(field)]
+    if not shots:
+        return ""
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        thumbs = list(executor.map(lambda shot: _make_thumbnail(shot[1], html_dir / "thumbnails"), shots))
+    item = get_template('android_gallery_item.html')
+    items = "".join(
+        item.render({"href": f"../{path.as_posix()}", "label": label,
+                     "src": f"thumbnails/{thumb.name}" if thumb else f"../{path.as_posix()}"})
+        for (label, path), thumb in zip(shots, thumbs)
+    )
+    return render('android_gallery.html', title="Screenshots", items=items)
+
 def generate_html_report(json_path: str, html_path: str = None):
     with open(json_path, 'r', encoding='utf-8') as f:
         result = json.load(f)
@@ -9,51 +53,22 @@ def generate_html_report(json_path: str, html_path: str = None):
     if not html_path:
         html_path = str(Path(json_path).with_suffix('.html'))
 
-    steps_html = ""
-    for idx, step in enumerate(result.get('steps', []), 1):
-        status_color = '#27ae60' if step['status'] == 'passed' else '#e74c3c'
-        steps_html += f"<tr><td>{idx}</td><td>{step['step'].replace('_',' ').title()}</td><td style='color:{status_color};font-weight:bold'>{step['status'].title()}</td><td>{step['details']}</td></tr>"
-
-    # Only show the main screenshot (homepage or login success)
-    screenshot_path = result.get('screenshot')
-    screenshot_html = ""
-    if screenshot_path:
-        screenshot_html = f"<div class='screenshot-block'><h3>Screenshot</h3><img src='../{screenshot_path}' alt='Screenshot' class='main-screenshot'></div>"
-
-    html = f"""
-    <html>
-    <head>
-        <title>Test Report - {result.get('test','')}</title>
-        <style>
-            body {{ font-family: 'Segoe UI', Arial, sans-serif; background: #f8f9fa; margin: 0; padding: 0; }}
-            .container {{ max-width: 900px; margin: 40px auto; background: #fff; border-radius: 12px; box-shadow: 0 2px 12px #0001; padding: 32px; }}
-            h1 {{ color: #2c3e50; }}
-            h2 {{ margin-top: 0; }}
-            table {{ border-collapse: collapse; width: 100%; margin-top: 24px; }}
-            th, td {{ border: 1px solid #e1e4e8; padding: 10px 12px; text-align: left; }}
-            th {{ background: #f2f2f2; color: #34495e; }}
-            tr:nth-child(even) {{ background: #f9f9f9; }}
-            .main-screenshot {{ max-width: 500px; border-radius: 8px; border: 2px solid #e1e4e8; margin-top: 16px; }}
-            .screenshot-block {{ margin: 32px 0; text-align: center; }}
-            .status-badge {{ display: inline-block; padding: 6px 18px; border-radius: 20px; font-size: 1.1em; font-weight: bold; color: #fff; background: {'#27ae60' if result.get('status')=='passed' else '#e74c3c'}; }}
-            .footer {{ margin-top: 40px; color: #888; font-size: 0.95em; text-align: right; }}
-        </style>
-    </head>
-    <body>
-        <div class='container'>
-            <h1>Test Report: {result.get('test','')}</h1>
-            <h2>Status: <span class='status-badge'>{result.get('status','').title()}</span></h2>
-            <h3>Test Steps</h3>
-            <table>
-                <tr><th>#</th><th>Step</th><th>Status</th><th>Details</th></tr>
-                {steps_html}
-            </table>
-            {screenshot_html}
-            <div class='footer'>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>
-        </div>
-    </body>
-    </html>
-    """
+    row = get_template('android_step_row.html')
+    steps_html = "".join(
+        row.render({"index": idx, "step": step['step'].replace('_', ' ').title(), "status": step['status'].title(),
+                     "status_class": step['status'], "details": step['details']})
+        for idx, step in enumerate(result.get('steps', []), 1)
+    )
+
+    write_static_assets(str(Path(html_path).parent))
+    html = "".join((
+        render('page_head.html', title=f"Test Report - {result.get('test', '')}", stylesheet=REPORT_CSS,
+               body_class="simple"),
+        render('android_report.html', test=result.get('test', ''), status=result.get('status', '').title(),
+               status_class=result.get('status', ''), steps=steps_html,
+               gallery=_screenshot_gallery(result, Path(html_path).parent),
+               generated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+    ))
     with open(html_path, 'w', encoding='utf-8') as f:
         f.write(html)
     return html_path
@@ -1,6 +1,7 @@
 import json
 from pathlib import Path
 from datetime import datetime
+from config import settings
 
 def save_json_report(data: dict, name: str = "result"): 
     reports_dir = Path("reports")
@@ -9,4 +10,9 @@ def save_json_report(data: dict, name: str = "result"):
     path = reports_dir / f"{name}_{timestamp}.json"
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2)
+    if settings.RESULTS_DB != "off":
+        # Same history database as the API and desktop suites
+        from utils.report_engine import DEFAULT_DB_PATH, ResultStore
+        with ResultStore(settings.RESULTS_DB or DEFAULT_DB_PATH) as store:
+            store.ingest_summaries("android", [str(path)])
     return str(path)
@@ -0,0 +1,17 @@
+"""
+Shared report rendering engine, result store and trend dashboard (results/reporting) for the android suite
+
+The android suite runs with its own directory as the import root, so the
+repository root is appended to the path to reach the shared package.
+"""
+import os
+import sys
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from results.reporting import (REPORT_CSS, ReportWriter, Template, escape, get_template, render,  # noqa: E402
+                               stats_table, summary_cards, write_static_assets)
+from results.reporting.result_store import DEFAULT_DB_PATH, ResultStore  # noqa: E402
+from results.reporting.trends import compute_trends, render_dashboard, update_dashboard  # noqa: E402
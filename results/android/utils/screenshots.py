@@ -1,15 +1,139 @@
+import hashlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from playwright.async_api import Page
 from datetime import datetime
+from config import settings
 
 SCREENSHOT_DIR = Path("screenshots")
 SCREENSHOT_DIR.mkdir(exist_ok=True)
+# Images are stored once under the SHA-256 of their captured bytes; the manifest maps step name -> object
+OBJECTS_DIR = SCREENSHOT_DIR / "objects"
+MANIFEST_FILE = SCREENSHOT_DIR / "manifest.json"
+SCREENSHOT_EXTENSIONS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
 
-def get_screenshot_path(name: str) -> Path:
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return SCREENSHOT_DIR / f"{name}_{timestamp}.png"
+# Disk writes happen here so the test only waits for the browser grab
+_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="screenshot-writer")
+_pending = []
+_run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+# Objects modified after this are in use by a run still in progress and survive retention
+_run_started = time.time()
+_run_steps = {}
 
-async def take_screenshot(page: Page, name: str):
-    path = get_screenshot_path(name)
-    await page.screenshot(path=str(path), full_page=True)
+def get_screenshot_path(data: bytes, image_format: str = "png") -> Path:
+    """Content-addressed path of a screenshot; identical images share one file"""
+    digest = hashlib.sha256(data).hexdigest()
+    return OBJECTS_DIR / digest[:2] / f"{digest}.{SCREENSHOT_EXTENSIONS[image_format]}"
+
+def _reuse(path: Path) -> bool:
+    """Refresh an existing object's modification time so retention sees it in use; False if absent"""
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+def _to_webp(data: bytes, quality: int) -> bytes:
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.open(io.BytesIO(data)).save(buffer, format="WEBP", quality=quality)
+    return buffer.getvalue()
+
+def _write(data: bytes, path: Path, quality: int = None):
+    if path.suffix == ".webp":
+        data = _to_webp(data, quality)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+async def take_screenshot(page: Page, name: str, full_page: bool = None, image_format: str = None,
+                          quality: int = None, clip: dict = None):
+    """Grab a screenshot (viewport, full page or clip region) and write it off the event loop.
+
+    The browser only encodes PNG and JPEG; a WebP shot is grabbed as PNG and
+    converted with Pillow on the writer thread.
+    """
+    image_format = image_format or settings.SCREENSHOT_FORMAT
+    if image_format not in SCREENSHOT_EXTENSIONS:
+        raise ValueError(f"Unsupported screenshot format: {image_format}")
+    if image_format == "webp":
+        try:
+            import PIL  # noqa: F401
+        except ImportError as e:
+            raise ImportError("WebP screenshots require the 'Pillow' package") from e
+    quality = settings.SCREENSHOT_QUALITY if quality is None else quality
+    options = {"type": "png" if image_format == "webp" else image_format,
+               "full_page": settings.SCREENSHOT_FULL_PAGE if full_page is None else full_page}
+    if image_format == "jpeg":
+        options["quality"] = quality
+    if clip is not None:
+        options["clip"] = clip
+        options["full_page"] = False
+    data = await page.screenshot(**options)
+    path = get_screenshot_path(data, image_format)
+    if str(path) not in _run_steps.values() and not _reuse(path):
+        _pending.append(_writer.submit(_write, data, path, quality))
+    _run_steps[name] = str(path)
     return str(path)
+
+def _load_manifest() -> dict:
+    try:
+        return json.loads(MANIFEST_FILE.read_text())
+    except (OSError, ValueError):
+        return {"runs": []}
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+def _is_stale(path: Path) -> bool:
+    # In-flight .tmp files and objects written or reused since this run started belong to a live run
+    try:
+        return path.suffix != ".tmp" and path.stat().st_mtime < _run_started
+    except FileNotFoundError:
+        return False
+
+def _apply_retention(manifest: dict):
+    # Keep the newest runs within the run count and size budget, then drop stale objects none of them reference
+    runs = manifest["runs"][-settings.SCREENSHOT_KEEP_RUNS:]
+    max_bytes = int(settings.SCREENSHOT_MAX_MB * 1024 * 1024) if settings.SCREENSHOT_MAX_MB else None
+    referenced = set()
+    kept = []
+    total = 0
+    for position, run in enumerate(reversed(runs)):
+        files = {Path(p) for p in run["steps"].values()} - referenced
+        new_bytes = sum(_file_size(path) for path in files)
+        # The newest run (this one) is always kept
+        if max_bytes is not None and position > 0 and total + new_bytes > max_bytes:
+            break
+        kept.append(run)
+        total += new_bytes
+        referenced |= files
+    manifest["runs"] = kept[::-1]
+    if OBJECTS_DIR.exists():
+        for path in OBJECTS_DIR.glob("*/*"):
+            if path not in referenced and _is_stale(path):
+                path.unlink(missing_ok=True)
+
+def wait_for_screenshots():
+    """Wait until every queued screenshot is on disk"""
+    while _pending:
+        _pending.pop(0).result()
+
+def flush_screenshots():
+    """Wait until every queued screenshot is on disk, then record this run in the manifest"""
+    wait_for_screenshots()
+    if not _run_steps:
+        return
+    manifest = _load_manifest()
+    manifest["runs"] = [run for run in manifest["runs"] if run["run_id"] != _run_id]
+    manifest["runs"].append({"run_id": _run_id, "steps": dict(_run_steps)})
+    _apply_retention(manifest)
+    MANIFEST_FILE.write_text(json.dumps(manifest, indent=2))
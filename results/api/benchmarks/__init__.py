@@ -0,0 +1 @@
+# Offline benchmarks for the API test client and reporting utilities
@@ -0,0 +1,66 @@
+"""
+Benchmark: serial requests.Session calls vs concurrent AsyncAPIClient calls
+
+Runs offline against the local StubAPIServer. From the repository root:
+
+    python -m results.api.benchmarks.bench_async_client --latency-ms 50 --rounds 5
+"""
+import argparse
+import time
+
+import requests
+
+from ..utils.api_test_utils import APIEndpoints, APITestDataGenerator
+from ..utils.async_api_client import APICall, AsyncAPIClient
+from ..utils.stub_server import StubAPIServer
+
+
+def build_calls(base_url: str):
+    """Same mix of independent endpoint checks the API suite issues"""
+    calls = [
+        APICall("products", "GET", base_url + APIEndpoints.GET_PRODUCTS_LIST),
+        APICall("brands", "GET", base_url + APIEndpoints.GET_BRANDS_LIST),
+        APICall("invalid_login", "POST", base_url + APIEndpoints.VERIFY_LOGIN,
+                data={"email": "invalid@example.com", "password": "wrongpassword"}),
+    ]
+    for term in APITestDataGenerator.generate_search_terms():
+        calls.append(APICall(f"search_{term}", "POST", base_url + APIEndpoints.SEARCH_PRODUCT,
+                             data={"search_product": term}))
+    return calls
+
+
+def run_serial(calls) -> float:
+    start = time.perf_counter()
+    with requests.Session() as session:
+        for call in calls:
+            session.request(call.method, call.url, data=call.data, params=call.params)
+    return time.perf_counter() - start
+
+
+def run_concurrent(calls, concurrency: int) -> float:
+    start = time.perf_counter()
+    AsyncAPIClient(concurrency=concurrency).run(calls)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Artificial per-request server latency")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    with StubAPIServer(latency_ms=args.latency_ms) as server:
+        calls = build_calls(server.base_url)
+        serial = [run_serial(calls) for _ in range(args.rounds)]
+        concurrent = [run_concurrent(calls, args.concurrency) for _ in range(args.rounds)]
+
+    best_serial, best_concurrent = min(serial), min(concurrent)
+    print(f"{len(calls)} calls per round, {args.latency_ms:.0f} ms server latency, {args.rounds} rounds")
+    print(f"serial     best {best_serial * 1000:8.1f} ms")
+    print(f"concurrent best {best_concurrent * 1000:8.1f} ms")
+    print(f"speedup    {best_serial / best_concurrent:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
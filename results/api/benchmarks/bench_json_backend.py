@@ -0,0 +1,72 @@
+"""
+Micro-benchmark: JSON backends on productsList payloads
+
+Decodes and encodes productsList bodies of several sizes (the recorded
+catalog repeated) with every installed backend of utils.json_backend, and
+reports the best time per operation. From the repository root:
+
+    python -m results.api.benchmarks.bench_json_backend --products 34 1000 10000
+"""
+import argparse
+import json
+import os
+import time
+
+from ..utils import json_backend
+
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fixtures", "catalog.json")
+
+
+def build_body(size: int) -> bytes:
+    """productsList response body with ``size`` products, as the server sends it"""
+    with open(CATALOG_FILE, 'r', encoding='utf-8') as f:
+        products = json.load(f)["products"]
+    payload = {"responseCode": 200, "products": [dict(products[i % len(products)], id=i + 1) for i in range(size)]}
+    return json.dumps(payload).encode("utf-8")
+
+
+def best_of(rounds: int, number: int, func, *args, **kwargs) -> float:
+    """Best mean seconds per call over ``rounds`` batches of ``number`` calls"""
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            func(*args, **kwargs)
+        elapsed = (time.perf_counter() - start) / number
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def installed_backends():
+    return [name for name, module in (("orjson", json_backend.orjson), ("ujson", json_backend.ujson),
+                                      ("json", json)) if module is not None]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, nargs="+", default=[34, 1000, 10000])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'products':>9} {'KiB':>8} {'backend':>8} {'loads us':>10} {'dumps us':>10} {'pretty us':>10} "
+          f"{'vs json':>8}")
+    for size in args.products:
+        body = build_body(size)
+        number = max(1, 20000 // size)
+        baseline = None
+        for name in ["json"] + [b for b in installed_backends() if b != "json"]:
+            json_backend.configure(name)
+            payload = json_backend.loads(body)
+            decode = best_of(args.rounds, number, json_backend.loads, body)
+            encode = best_of(args.rounds, number, json_backend.dumps, payload, pretty=False)
+            pretty = best_of(args.rounds, number, json_backend.dumps, payload, pretty=True)
+            total = decode + encode
+            baseline = baseline or total
+            print(f"{size:>9} {len(body) / 1024:>8.1f} {name:>8} {decode * 1e6:>10.1f} {encode * 1e6:>10.1f} "
+                  f"{pretty * 1e6:>10.1f} {baseline / total:>7.1f}x")
+    json_backend.configure()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: extracting deep product fields path by path vs in one traversal
+
+Builds a productsList payload of N products and pulls five fields out of
+every product: with the old split-and-walk per product and path, with one
+compiled wildcard path per field, and with a single PathSet traversal.
+From the repository root:
+
+    python -m results.api.benchmarks.bench_json_path --sizes 10000 100000
+"""
+import argparse
+import json
+import os
+import time
+
+from ..utils.json_path import compile_path, compile_paths
+
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fixtures", "catalog.json")
+FIELDS = ["id", "name", "price", "category.category", "category.usertype.usertype"]
+
+
+def build_payload(size: int):
+    with open(CATALOG_FILE, 'r', encoding='utf-8') as f:
+        products = json.load(f)["products"]
+    return {"responseCode": 200, "products": [dict(products[i % len(products)], id=i + 1) for i in range(size)]}
+
+
+def split_and_walk(payload):
+    """The pre-compilation extraction: re-split the path for every product and field"""
+    values = {field: [] for field in FIELDS}
+    for product in payload["products"]:
+        for field in FIELDS:
+            current = product
+            for key in field.split('.'):
+                if isinstance(current, dict) and key in current:
+                    current = current[key]
+                else:
+                    current = None
+                    break
+            values[field].append(current)
+    return values
+
+
+def path_per_field(payload):
+    return {field: compile_path(f"products.*.{field}").get(payload) for field in FIELDS}
+
+
+def one_traversal(payload):
+    return compile_paths(tuple(f"products.*.{field}" for field in FIELDS)).extract(payload)
+
+
+def best_of(rounds: int, func, *args) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'products':>10} {'split ms':>10} {'per-path ms':>12} {'one pass ms':>12} {'speed-up':>9}")
+    for size in args.sizes:
+        payload = build_payload(size)
+        split = best_of(args.rounds, split_and_walk, payload)
+        per_path = best_of(args.rounds, path_per_field, payload)
+        single = best_of(args.rounds, one_traversal, payload)
+        print(f"{size:>10} {split * 1000:>10.1f} {per_path * 1000:>12.1f} {single * 1000:>12.1f} "
+              f"{split / single:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
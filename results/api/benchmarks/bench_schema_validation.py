@@ -0,0 +1,76 @@
+"""
+Benchmark: compiled response schemas vs a field-by-field walk on large payloads
+
+Builds a productsList payload of N products (copies of the recorded catalog)
+and times APITestValidator's compiled check, the path-collecting walk it
+falls back to for invalid payloads, and a hand-written membership loop over
+every product. From the repository root:
+
+    python -m results.api.benchmarks.bench_schema_validation --sizes 10000 100000
+"""
+import argparse
+import copy
+import json
+import os
+import time
+
+from ..utils.api_test_utils import APIEndpoints, APITestValidator, RESPONSE_SCHEMAS
+from ..utils.response_schema import _explain
+
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fixtures", "catalog.json")
+REQUIRED_PRODUCT_FIELDS = ["id", "name", "price", "brand", "category"]
+
+
+def build_payload(size: int):
+    with open(CATALOG_FILE, 'r', encoding='utf-8') as f:
+        products = json.load(f)["products"]
+    return {"responseCode": 200, "products": [copy.deepcopy(products[i % len(products)]) for i in range(size)]}
+
+
+def hand_written(payload) -> bool:
+    """The pre-schema checks, extended to every product"""
+    if "products" not in payload or not isinstance(payload["products"], list):
+        return False
+    for product in payload["products"]:
+        for field in REQUIRED_PRODUCT_FIELDS:
+            if field not in product:
+                return False
+    return True
+
+
+def best_of(rounds: int, func, *args) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    schema = APITestValidator.schema(APIEndpoints.GET_PRODUCTS_LIST)
+    spec = RESPONSE_SCHEMAS[APIEndpoints.GET_PRODUCTS_LIST]
+    print(f"{'products':>10} {'compiled ms':>12} {'walk ms':>9} {'hand ms':>9} {'speed-up':>9} "
+          f"{'invalid ms':>11} {'violations':>11}")
+    for size in args.sizes:
+        payload = build_payload(size)
+        compiled = best_of(args.rounds, schema.is_valid, payload)
+        walk = best_of(args.rounds, _explain, spec, payload, "$", [])
+        hand = best_of(args.rounds, hand_written, payload)
+        # Break one product in a hundred to time collecting the violations
+        for product in payload["products"][::100]:
+            del product["category"]["usertype"]
+            product["price"] = 500
+        invalid = best_of(args.rounds, schema.violations, payload)
+        print(f"{size:>10} {compiled * 1000:>12.2f} {walk * 1000:>9.2f} {hand * 1000:>9.2f} "
+              f"{walk / compiled:>8.1f}x {invalid * 1000:>11.2f} {len(schema.violations(payload)):>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: streaming API HTML report generation on synthetic results
+
+Writes N synthetic results as JSON Lines, renders them with
+APIHTMLReportGenerator.generate_streaming_report and reports time per
+result and peak Python memory. From the repository root:
+
+    python -m results.api.benchmarks.bench_streaming_report --sizes 10000 100000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from ..utils.api_html_report_generator import APIHTMLReportGenerator
+from ..utils.api_test_utils import APIEndpoints
+
+
+ENDPOINTS = [
+    ("GET", APIEndpoints.GET_PRODUCTS_LIST),
+    ("GET", APIEndpoints.GET_BRANDS_LIST),
+    ("POST", APIEndpoints.SEARCH_PRODUCT),
+    ("POST", APIEndpoints.VERIFY_LOGIN),
+]
+
+
+def write_synthetic_results(path: str, count: int, body_bytes: int):
+    """Write ``count`` results, each carrying a response body of about ``body_bytes``"""
+    body = {"products": "x" * body_bytes}
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            method, endpoint = ENDPOINTS[i % len(ENDPOINTS)]
+            result = {
+                "test_name": f"synthetic_{i}",
+                "api_endpoint": APIEndpoints.get_full_url(endpoint),
+                "http_method": method,
+                "status_code": 200,
+                "response_time_ms": 100.0 + i % 250,
+                "test_status": "FAIL" if i % 17 == 0 else "PASS",
+                "details": "Synthetic result",
+                "timestamp": "2025-01-01T00:00:00",
+                "request_data": {},
+                "response_data": body,
+            }
+            f.write(json.dumps(result, separators=(",", ":")) + "\n")
+
+
+def measure(results_file: str, output_path: str):
+    """Return (seconds, peak traced bytes) for one streaming render"""
+    generator = APIHTMLReportGenerator()
+    start = time.perf_counter()
+    generator.generate_streaming_report(results_file, output_path=output_path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    generator.generate_streaming_report(results_file, output_path=output_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--body-bytes", type=int, default=2048, help="Size of each synthetic response body")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'results':>10} {'total s':>9} {'us/result':>10} {'peak MiB':>9} {'html MiB':>9}")
+        for size in args.sizes:
+            results_file = os.path.join(tmp, f"results_{size}.jsonl")
+            output_path = os.path.join(tmp, f"report_{size}.html")
+            write_synthetic_results(results_file, size, args.body_bytes)
+            elapsed, peak = measure(results_file, output_path)
+            print(f"{size:>10} {elapsed:>9.2f} {elapsed / size * 1e6:>10.1f} "
+                  f"{peak / 2 ** 20:>9.2f} {os.path.getsize(output_path) / 2 ** 20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
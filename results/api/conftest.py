@@ -8,20 +8,268 @@ import pytest
 import requests
 import json
 import os
+import glob
+import shutil
 from datetime import datetime
 
 
+# Per-worker result shards of pytest-xdist runs, merged by the controller
+SHARDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports", "shards")
+# Key under which the controller passes the shard run id to its workers
+SHARD_RUN_KEY = "api_shard_run"
+# Key under which the controller passes the stand-in server URL to its workers
+STUB_URL_KEY = "api_stub_url"
+# One summary per run, ingested into the result store for the trend dashboard
+HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports", "history")
+
+
+def pytest_addoption(parser, pluginmanager):
+    """Command line options for API test execution modes"""
+    from ..reporting import pytest_plugin
+    # --results-db, --trend-runs and the --schedule options are shared with the desktop suite
+    pytest_plugin.register(pluginmanager)
+    group = parser.getgroup("api", "API test execution")
+    group.addoption(
+        "--api-concurrent", action="store_true", default=False,
+        help="Run independent endpoint checks concurrently; create/verify/delete stay sequential"
+    )
+    group.addoption(
+        "--api-concurrency", type=int, default=10,
+        help="Maximum number of in-flight requests in --api-concurrent mode"
+    )
+    group.addoption(
+        "--api-pool-size", type=int, default=10,
+        help="Per-host connection limit of the shared HTTP transport"
+    )
+    group.addoption(
+        "--api-pool-block", action="store_true", default=False,
+        help="Wait for a free pooled connection instead of opening extra ones"
+    )
+    group.addoption(
+        "--api-retries", type=int, default=3,
+        help="Connection/5xx retries applied by the shared HTTP adapter"
+    )
+    group.addoption(
+        "--api-no-keep-alive", action="store_true", default=False,
+        help="Send 'Connection: close' so every request opens a new connection"
+    )
+    group.addoption(
+        "--api-load", action="store_true", default=False,
+        help="Run the load test against productsList, searchProduct and verifyLogin"
+    )
+    group.addoption(
+        "--api-load-profile", choices=["steady", "ramp", "spike"], default="steady",
+        help="Shape of the offered request rate in --api-load mode"
+    )
+    group.addoption(
+        "--api-load-rps", type=float, default=50,
+        help="Peak offered requests per second in --api-load mode"
+    )
+    group.addoption(
+        "--api-load-duration", type=float, default=10,
+        help="Length of the load run in seconds"
+    )
+    group.addoption(
+        "--api-load-concurrency", type=int, default=50,
+        help="Maximum number of in-flight requests in --api-load mode"
+    )
+    group.addoption(
+        "--api-load-target", choices=["stub", "live"], default="stub",
+        help="Send load to the local stub server (default, for CI) or the live API"
+    )
+    group.addoption(
+        "--api-search-terms", type=int, action="append", default=None, metavar="COUNT",
+        help="Run the fan-out search test with COUNT generated terms (repeat for several sizes)"
+    )
+    group.addoption(
+        "--api-target", choices=["live", "stub"], default="live",
+        help="Run the suite against the live API or an in-process stand-in server with stateful accounts"
+    )
+    group.addoption(
+        "--api-stub-latency-ms", type=float, default=0.0,
+        help="Delay the stand-in server adds to every response with --api-target stub"
+    )
+    group.addoption(
+        "--api-cassette", choices=["off", "record", "replay", "once"], default="off",
+        help="Record exchanges to a cassette, replay them without the network, or replay and record misses"
+    )
+    group.addoption(
+        "--api-cassette-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "cassettes", "default"),
+        help="Cassette directory (one JSON Lines segment per recording process)"
+    )
+    group.addoption(
+        "--api-cassette-live", action="append", default=None, metavar="ROUTE",
+        help="Route that always goes to the server, in addition to createAccount/updateAccount/deleteAccount"
+    )
+    group.addoption(
+        "--api-cache", choices=["off", "memory", "disk"], default="off",
+        help="Cache productsList/brandsList/searchProduct responses in memory, or in memory and on disk"
+    )
+    group.addoption(
+        "--api-cache-ttl", type=float, default=300,
+        help="Seconds a cached response is used before it is revalidated with the server"
+    )
+    group.addoption(
+        "--api-cache-size", type=int, default=256,
+        help="Maximum number of responses kept in the in-memory cache tier"
+    )
+    group.addoption(
+        "--api-cache-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "http_cache"),
+        help="Directory of the on-disk cache tier with --api-cache disk"
+    )
+    group.addoption(
+        "--api-json-backend", choices=["auto", "orjson", "ujson", "json"], default="auto",
+        help="JSON library for response bodies, logs and reports (auto: orjson, then ujson, then json)"
+    )
+    group.addoption(
+        "--api-json-pretty", action="store_true", default=False,
+        help="Indent the summary JSON files instead of writing them compact"
+    )
+    group.addoption(
+        "--api-reqres-compression", choices=["none", "gzip", "zstd"], default="none",
+        help="Compression for request/response JSON Lines log segments"
+    )
+    group.addoption(
+        "--api-reqres-segment-mb", type=float, default=16,
+        help="Rotate request/response log segments after this many MB"
+    )
+
+
+def pytest_configure(config):
+    """Apply JSON and request/response log writer options before any test logs an exchange"""
+    from .utils import json_backend
+    from .utils.reqres_log_writer import configure_log_writers
+    from ..reporting.worker_shards import new_run_id, worker_id
+    # pytest.ini uses a [tool:pytest] header, which pytest does not read from that file
+    config.addinivalue_line("markers", "load: API load tests (run with --api-load)")
+    config.addinivalue_line("markers", "product_management: Product management API tests")
+    config.addinivalue_line("markers", "stub_only: tests that run only against the stand-in server (--api-target stub)")
+    json_backend.configure(config.getoption("--api-json-backend"), pretty=config.getoption("--api-json-pretty"))
+    if worker_id(config) is None:
+        # Shard run id handed to pytest-xdist workers in pytest_configure_node
+        config._api_shard_run = new_run_id()
+    compression = config.getoption("--api-reqres-compression")
+    try:
+        configure_log_writers(
+            compression=None if compression == "none" else compression,
+            max_segment_bytes=int(config.getoption("--api-reqres-segment-mb") * 1024 * 1024),
+            # Exchange log segments are named after the run so its report reads only them
+            run_id=config.workerinput[SHARD_RUN_KEY] if worker_id(config) else config._api_shard_run,
+        )
+    except ImportError as e:
+        raise pytest.UsageError(f"--api-reqres-compression {compression}: {e}") from e
+    if config.getoption("--api-target") == "stub":
+        _use_stub_server(config)
+    db_path = config.getoption("--results-db")
+    if db_path != "off":
+        suite_dir = os.path.dirname(os.path.abspath(__file__))
+        scheduler = config.pluginmanager.get_plugin("duration_scheduler")
+        if scheduler is not None:
+            # Collected together with the desktop suite: one scheduler plans both
+            scheduler.add_suite("api", getattr(config, "_api_shard_run", None), root=suite_dir)
+        else:
+            from ..reporting.duration_scheduler import DurationScheduler
+            from ..reporting.result_store import DEFAULT_DB_PATH
+            config.pluginmanager.register(DurationScheduler(
+                config, "api", db_path or DEFAULT_DB_PATH, getattr(config, "_api_shard_run", None),
+                mode=config.getoption("--schedule"), scope=config.getoption("--schedule-scope"),
+                history_runs=config.getoption("--schedule-history-runs"),
+                report_path="reports/schedule_report.json", root=suite_dir,
+            ), "duration_scheduler")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip load tests unless --api-load and stub-only tests unless --api-target stub.
+
+    Skipping at collection keeps load_target_url from starting a stub server for a skipped test.
+    """
+    skip_load = pytest.mark.skip(reason="load test runs only with --api-load")
+    skip_stub_only = pytest.mark.skip(reason="runs only against the stand-in server (--api-target stub)")
+    for item in items:
+        if not config.getoption("--api-load") and item.get_closest_marker("load") is not None:
+            item.add_marker(skip_load)
+        if config.getoption("--api-target") != "stub" and item.get_closest_marker("stub_only") is not None:
+            item.add_marker(skip_stub_only)
+
+
+def _use_stub_server(config):
+    """Point APIEndpoints.BASE_URL (and with it the tests' BASE_URL) at the stand-in server.
+
+    The controller starts one server and hands its URL to the pytest-xdist
+    workers, so an account created on one worker can be used on another.
+    """
+    from .utils.api_test_utils import APIEndpoints
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is not None:
+        APIEndpoints.BASE_URL = workerinput[STUB_URL_KEY]
+        return
+    from .utils.stub_server import StubAPIServer
+    config._api_stub_server = StubAPIServer(latency_ms=config.getoption("--api-stub-latency-ms")).start()
+    APIEndpoints.BASE_URL = config._api_stub_server.base_url
+
+
+def pytest_unconfigure(config):
+    server = getattr(config, "_api_stub_server", None)
+    if server is not None:
+        server.stop()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Tell each pytest-xdist worker where to write its result shard"""
+    node.workerinput[SHARD_RUN_KEY] = node.config._api_shard_run
+    server = getattr(node.config, "_api_stub_server", None)
+    if server is not None:
+        node.workerinput[STUB_URL_KEY] = server.base_url
+
+
 @pytest.fixture(scope="session")
 def api_base_url():
-    """Base URL for API tests"""
-    return "https://automationexercise.com/api"
+    """Base URL for API tests: the live API, or the stand-in server with --api-target stub"""
+    from .utils.api_test_utils import APIEndpoints
+    return APIEndpoints.BASE_URL
 
 
 @pytest.fixture(scope="session")
-def api_session():
+def api_transport(request):
+    """Pooled HTTP transport shared by every session in the API suite"""
+    from .utils.http_transport import SharedTransport
+    config = request.config
+    cassette = None
+    if config.getoption("--api-cassette") != "off":
+        from .utils.cassette import Cassette, DEFAULT_LIVE_ROUTES
+        from ..reporting.worker_shards import worker_id
+        cassette = Cassette(
+            config.getoption("--api-cassette-dir"), mode=config.getoption("--api-cassette"),
+            live_routes=DEFAULT_LIVE_ROUTES + tuple(config.getoption("--api-cassette-live") or ()),
+            # One segment per process, so xdist workers never write to the same file
+            segment_name=worker_id(config) or "main",
+        )
+    cache = None
+    if config.getoption("--api-cache") != "off":
+        from .utils.response_cache import ResponseCache
+        cache = ResponseCache(
+            max_entries=config.getoption("--api-cache-size"), ttl_s=config.getoption("--api-cache-ttl"),
+            disk_dir=config.getoption("--api-cache-dir") if config.getoption("--api-cache") == "disk" else None,
+        )
+    transport = SharedTransport(
+        pool_maxsize=config.getoption("--api-pool-size"),
+        pool_block=config.getoption("--api-pool-block"),
+        max_retries=config.getoption("--api-retries"),
+        keep_alive=not config.getoption("--api-no-keep-alive"),
+        cassette=cassette,
+        cache=cache,
+    )
+    # Kept on config so pytest_sessionfinish can put the counters in the report
+    config._api_transport = transport
+    yield transport
+    transport.close()
+
+
+@pytest.fixture(scope="session")
+def api_session(api_transport):
     """Requests session for API tests"""
-    session = requests.Session()
-    session.headers.update({
+    session = api_transport.new_session({
         'Content-Type': 'application/x-www-form-urlencoded',
         'User-Agent': 'API-Test-Suite/1.0'
     })
@@ -29,6 +277,17 @@ def api_session():
     session.close()
 
 
+@pytest.fixture(scope="session")
+def load_target_url(request, api_base_url):
+    """Base URL the load test drives: a local stub server unless --api-load-target live"""
+    if request.config.getoption("--api-load-target") == "live":
+        yield api_base_url
+        return
+    from .utils.stub_server import StubAPIServer
+    with StubAPIServer() as server:
+        yield server.base_url
+
+
 @pytest.fixture(autouse=True)
 def setup_test_directories():
     """Setup test directories for API tests"""
@@ -88,25 +347,146 @@ def get_reporter():
     return APITestReporter()
 
 
+def _session_reporter():
+    """Reporter holding the results of the tests run in this process"""
+    try:
+        # Try relative import now that __init__.py files are present
+        from .tests.test_api_automation import reporter
+    except ImportError:
+        # Fallback: create a new reporter (will not have in-memory results)
+        from .utils.api_test_utils import APITestReporter
+        reporter = APITestReporter("reports/api_test_execution_summary.json")
+    return reporter
+
+
+def _cassette_stats(transport):
+    if transport is None or transport.cassette is None:
+        return None
+    return transport.cassette.stats.as_dict()
+
+
+def _cache_stats(transport):
+    if transport is None or transport.cache is None:
+        return None
+    return transport.cache.stats.as_dict()
+
+
+def _result_shards(run_id):
+    """Shards of one run, written and read with the configured JSON backend"""
+    from ..reporting.worker_shards import ResultShards
+    from .utils import json_backend
+    return ResultShards(SHARDS_DIR, run_id, dumps=lambda payload: json_backend.dumps(payload, pretty=False),
+                        loads=json_backend.loads)
+
+
+def _write_worker_shard(config, worker):
+    """Write this pytest-xdist worker's results and pool counters to its shard"""
+    reporter = _session_reporter()
+    transport = getattr(config, "_api_transport", None)
+    _result_shards(config.workerinput[SHARD_RUN_KEY]).write(worker, {
+        "worker": worker,
+        "test_results": reporter.test_results,
+        "transport_stats": transport.stats.as_dict() if transport is not None else None,
+        "cassette_stats": _cassette_stats(transport),
+        "cache_stats": _cache_stats(transport),
+        "load_test": reporter.load_test,
+    })
+
+
+def _merge_worker_shards(config):
+    """Combine every worker shard of this run into a single reporter"""
+    from .utils.api_test_utils import APITestReporter
+    from .utils.http_transport import merge_transport_stats
+    shards = _result_shards(config._api_shard_run)
+    reporter = APITestReporter("reports/api_test_execution_summary.json")
+    transport_stats = []
+    cassette_stats = []
+    cache_stats = []
+    for shard in shards.read_all():
+        for result in shard.get("test_results", []):
+            reporter.add_result(result)
+        if shard.get("transport_stats"):
+            transport_stats.append(shard["transport_stats"])
+        if shard.get("cassette_stats"):
+            cassette_stats.append(shard["cassette_stats"])
+        if shard.get("cache_stats"):
+            cache_stats.append(shard["cache_stats"])
+        if shard.get("load_test"):
+            reporter.load_test = shard["load_test"]
+    if transport_stats:
+        reporter.transport_stats = merge_transport_stats(transport_stats)
+    if cassette_stats:
+        from .utils.cassette import merge_cassette_stats
+        reporter.cassette_stats = merge_cassette_stats(cassette_stats)
+    if cache_stats:
+        from .utils.response_cache import merge_cache_stats
+        reporter.cache_stats = merge_cache_stats(cache_stats)
+    shards.cleanup()
+    return reporter
+
+
+def _record_run(config, summary, summary_file):
+    """Add the run to the SQLite result store and re-render the trend dashboard"""
+    db_path = config.getoption("--results-db")
+    if db_path == "off" or not summary.get("total_tests"):
+        return None
+    from ..reporting.result_store import DEFAULT_DB_PATH, ResultStore
+    from ..reporting.trends import compute_trends, render_dashboard
+    # Keep this run's summary; summaries copied in from other machines are ingested with it
+    os.makedirs(HISTORY_DIR, exist_ok=True)
+    shutil.copyfile(summary_file, os.path.join(HISTORY_DIR, f"{config._api_shard_run}.json"))
+    with ResultStore(db_path or DEFAULT_DB_PATH) as store:
+        store.record_api_summary(summary, run_key=config._api_shard_run)
+        store.ingest_summaries("api", glob.glob(os.path.join(HISTORY_DIR, "*.json")))
+        trend_runs = config.getoption("--trend-runs")
+        if trend_runs:
+            return render_dashboard(compute_trends(store, "api", trend_runs), "reports/trend_dashboard.html")
+    return None
+
+
 # Hook: Generate beautiful HTML report after all tests
 def pytest_sessionfinish(session, exitstatus):
     """Generate beautiful API HTML report after test session finishes."""
+    from ..reporting.worker_shards import is_xdist_controller, worker_id
+    # Make sure every queued request/response record is on disk first
+    from .utils.reqres_log_writer import close_log_writers
+    close_log_writers()
+    if session.config.option.collectonly:
+        return
+    worker = worker_id(session.config)
+    if worker is not None:
+        # Workers only hand their results to the controller, which renders the reports
+        _write_worker_shard(session.config, worker)
+        return
     try:
-        try:
-            # Try relative import now that __init__.py files are present
-            from .tests.test_api_automation import reporter
-        except ImportError:
-            # Fallback: create a new reporter (will not have in-memory results)
-            from .utils.api_test_utils import APITestReporter
-            reporter = APITestReporter("reports/api_test_execution_summary.json")
-        reporter.generate_report()
+        if is_xdist_controller(session.config):
+            reporter = _merge_worker_shards(session.config)
+        else:
+            reporter = _session_reporter()
+            transport = getattr(session.config, "_api_transport", None)
+            if transport is not None:
+                reporter.transport_stats = transport.stats.as_dict()
+                reporter.cassette_stats = _cassette_stats(transport)
+                reporter.cache_stats = _cache_stats(transport)
+        summary = reporter.generate_report()
         from .utils.api_html_report_generator import APIHTMLReportGenerator
-        generator = APIHTMLReportGenerator("reports/api_test_execution_summary.json")
-        report_path = generator.generate_beautiful_report(output_path="reports/API_Execution_Report.html")
+        generator = APIHTMLReportGenerator("reports/api_test_execution_summary.json",
+                                           reqres_log_dir="request_response_logs",
+                                           reqres_run_id=session.config._api_shard_run)
+        # Stream results from the JSON Lines file rather than re-loading the summary
+        report_path = generator.generate_streaming_report(reporter.results_file,
+                                                          output_path="reports/API_Execution_Report.html",
+                                                          summary=summary)
         session.config.pluginmanager.get_plugin("terminalreporter").write_sep(
             "=",
             f"✨ Beautiful API HTML report generated: {report_path}"
         )
+        trend_path = _record_run(session.config, summary, reporter.report_file)
+        if trend_path:
+            session.config.pluginmanager.get_plugin("terminalreporter").write_sep(
+                "=",
+                f"📈 API trend dashboard generated: {trend_path}"
+            )
     except Exception as e:
         session.config.pluginmanager.get_plugin("terminalreporter").write_sep(
             "=",
@@ -14,9 +14,10 @@ from datetime import datetime
 from typing import Dict
 import requests
 import pytest
-import json
 
-from ..utils.api_test_utils import APITestLogger, APITestReporter
+from ..utils.api_test_utils import APITestLogger, APITestReporter, APIEndpoints, APITestValidator
+from ..utils import json_backend
+from ..utils.reqres_log_writer import get_log_writer
 
 
 # Always resolve paths relative to this test file's directory
@@ -31,18 +32,33 @@ timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 HTML_REPORT = os.path.join(REPORTS_DIR, f"api_test_report_{timestamp}.html")
 LOG_FILE = os.path.join(LOGS_DIR, f"api_test_logs_{timestamp}.log")
 logger = APITestLogger(log_file=LOG_FILE)
-BASE_URL = "https://automationexercise.com/api"
+# Live API unless --api-target stub pointed APIEndpoints at the stand-in server (before collection)
+BASE_URL = APIEndpoints.BASE_URL
 
 # Use a single global reporter instance for all tests and hooks
 reporter = APITestReporter(SUMMARY_JSON)
 
 class APITestClient:
     """API Test Client for automation exercise"""
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, prefetched: Dict = None, transport=None, seed: str = None):
+        # Own cookies per client, connections borrowed from the shared transport pool
+        self.session = transport.new_session() if transport is not None else requests.Session()
         self.test_results = []
+        # Responses already fetched concurrently by the --api-concurrent mode
+        self.prefetched = prefetched if prefetched is not None else {}
+        # Seeded in cassette mode so the generated user, and with it every request body, repeats between runs
+        self.random = random.Random(seed) if seed is not None else random
+    def send(self, name: str, method: str, url: str, **kwargs):
+        """Return the prefetched response for ``name``, or issue the call on the session"""
+        if name in self.prefetched:
+            response = self.prefetched.pop(name)
+            if isinstance(response, Exception):
+                raise response
+            return response
+        return self.session.request(method, url, **kwargs)
     def log_request_response(self, method: str, url: str, request_data: Dict, response: requests.Response, test_name=None):
         log_entry = {
+            "test_name": test_name or "api_test",
             "timestamp": datetime.now().isoformat(),
             "method": method,
             "url": url,
@@ -51,17 +67,14 @@ class APITestClient:
             "response_headers": dict(response.headers),
             "response_body": response.text
         }
-        reqres_dir = os.path.join(BASE_DIR, "..", "request_response_logs")
-        reqres_filename = f"{test_name or 'api_test'}_{method}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        reqres_path = os.path.join(reqres_dir, reqres_filename)
-        with open(reqres_path, 'w', encoding='utf-8') as f:
-            json.dump(log_entry, f, indent=2)
+        # Written off the test thread into rotating JSON Lines segments
+        get_log_writer(REQRES_DIR).write(log_entry)
         logger.info(f"{method} {url} - Status: {response.status_code}")
     def generate_random_email(self):
-        random_string = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+        random_string = ''.join(self.random.choices(string.ascii_lowercase + string.digits, k=8))
         return f"test_{random_string}@example.com"
     def generate_test_user_data(self):
-        random_id = ''.join(random.choices(string.digits, k=6))
+        random_id = ''.join(self.random.choices(string.digits, k=6))
         return {
             "name": f"Test User {random_id}",
             "email": self.generate_random_email(),
@@ -82,9 +95,50 @@ class APITestClient:
             "mobile_number": "1234567890"
         }
 
+SEARCH_TERMS = ["top", "tshirt", "jean", "dress"]
+
+def build_independent_calls():
+    """Endpoint checks that do not depend on each other and can run concurrently"""
+    from ..utils.async_api_client import APICall
+    calls = [
+        APICall("test_01_get_user_detail_by_email_invalid", "GET", BASE_URL + APIEndpoints.GET_USER_LIST,
+                params={"email": "nonexistent@example.com"}),
+        APICall("test_04_verify_login_invalid", "POST", BASE_URL + APIEndpoints.VERIFY_LOGIN,
+                data={"email": "invalid@example.com", "password": "wrongpassword"}),
+        APICall("test_06_get_all_products_list", "GET", BASE_URL + APIEndpoints.GET_PRODUCTS_LIST),
+        APICall("test_07_get_all_brands_list", "GET", BASE_URL + APIEndpoints.GET_BRANDS_LIST),
+    ]
+    for idx, term in enumerate(SEARCH_TERMS, 1):
+        calls.append(APICall(f"test_05_search_product_{idx}", "POST", BASE_URL + APIEndpoints.SEARCH_PRODUCT,
+                             data={"search_product": term}))
+    return calls
+
+@pytest.fixture(scope="session")
+def concurrent_responses(request, api_transport):
+    """Prefetch the independent endpoint checks concurrently when --api-concurrent is set.
+
+    The calls go through the shared transport, so cassette replay, the response
+    cache and the connection counters apply to them as to sequential calls.
+    The create -> verify -> delete chain is never prefetched and stays sequential.
+    """
+    if not request.config.getoption("--api-concurrent"):
+        return {}
+    from ..utils.async_api_client import AsyncAPIClient
+    client = AsyncAPIClient(
+        concurrency=request.config.getoption("--api-concurrency"),
+        transport=api_transport,
+    )
+    responses = client.run(build_independent_calls())
+    logger.info(f"Prefetched {len(responses)} independent API calls concurrently")
+    return responses
+
 @pytest.fixture
-def api_client():
-    return APITestClient()
+def api_client(concurrent_responses, api_transport, request):
+    seed = None
+    if request.config.getoption("--api-cassette") != "off":
+        cassette_name = os.path.basename(os.path.normpath(request.config.getoption('--api-cassette-dir')))
+        seed = f"cassette:{cassette_name}:{request.node.nodeid}"
+    return APITestClient(prefetched=concurrent_responses, transport=api_transport, seed=seed)
 
 @pytest.fixture
 def test_user_data(api_client):
@@ -94,7 +148,7 @@ class TestAutomationExerciseAPI:
     def test_01_get_user_detail_by_email_invalid(self, api_client, request):
         url = f"{BASE_URL}/getUserDetailByEmail"
         params = {"email": "nonexistent@example.com"}
-        response = api_client.session.get(url, params=params)
+        response = api_client.send("test_01_get_user_detail_by_email_invalid", "GET", url, params=params)
         api_client.log_request_response("GET", url, params, response, test_name="test_01_get_user_detail_by_email_invalid")
         status = "PASS" if response.status_code in [200, 404] else "FAIL"
         # Add to reporter
@@ -105,7 +159,8 @@ class TestAutomationExerciseAPI:
             status_code=response.status_code,
             response_time=response.elapsed.total_seconds() * 1000 if hasattr(response, 'elapsed') else 0,
             status="PASS" if response.status_code in [200, 404] else "FAIL",
-            details=f"Response: {response.text[:100]}..."
+            details=f"Response: {response.text[:100]}...",
+            log_name="test_01_get_user_detail_by_email_invalid"
         )
         assert response.status_code in [200, 404], f"Expected 200 or 404, got {response.status_code}"
         logger.info("✓ Test 1 Passed: GET user detail by email (invalid)")
@@ -123,7 +178,8 @@ class TestAutomationExerciseAPI:
             status_code=response.status_code,
             response_time=response.elapsed.total_seconds() * 1000 if hasattr(response, 'elapsed') else 0,
             status="PASS" if response.status_code in [200, 201] else "FAIL",
-            details=f"Response: {response.text[:100]}..."
+            details=f"Response: {response.text[:100]}...",
+            log_name="test_02_create_user_account"
         )
         assert response.status_code in [200, 201], f"Expected 200/201, got {response.status_code}"
         api_client.created_user = test_user_data
@@ -146,7 +202,8 @@ class TestAutomationExerciseAPI:
             status_code=response.status_code,
             response_time=response.elapsed.total_seconds() * 1000 if hasattr(response, 'elapsed') else 0,
             status="PASS" if response.status_code == 200 else "FAIL",
-            details=f"Response: {response.text[:100]}..."
+            details=f"Response: {response.text[:100]}...",
+            log_name="test_03_verify_login_valid"
         )
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
         response_text = response.text.lower()
@@ -158,7 +215,7 @@ class TestAutomationExerciseAPI:
     def test_04_verify_login_invalid(self, api_client, request):
         url = f"{BASE_URL}/verifyLogin"
         login_data = {"email": "invalid@example.com", "password": "wrongpassword"}
-        response = api_client.session.post(url, data=login_data)
+        response = api_client.send("test_04_verify_login_invalid", "POST", url, data=login_data)
         api_client.log_request_response("POST", url, login_data, response, test_name="test_04_verify_login_invalid")
         status = "PASS" if response.status_code in [200, 401, 404] else "FAIL"
         # Add to reporter
@@ -169,17 +226,17 @@ class TestAutomationExerciseAPI:
             status_code=response.status_code,
             response_time=response.elapsed.total_seconds() * 1000 if hasattr(response, 'elapsed') else 0,
             status="PASS" if response.status_code in [200, 401, 404] else "FAIL",
-            details=f"Response: {response.text[:100]}..."
+            details=f"Response: {response.text[:100]}...",
+            log_name="test_04_verify_login_invalid"
         )
         assert response.status_code in [200, 401, 404], f"Expected 200/401/404, got {response.status_code}"
         logger.info("✓ Test 4 Passed: Invalid login handled correctly")
 
     def test_05_search_product(self, api_client, request):
         url = f"{BASE_URL}/searchProduct"
-        search_terms = ["top", "tshirt", "jean", "dress"]
-        for idx, term in enumerate(search_terms, 1):
+        for idx, term in enumerate(SEARCH_TERMS, 1):
             search_data = {"search_product": term}
-            response = api_client.session.post(url, data=search_data)
+            response = api_client.send(f"test_05_search_product_{idx}", "POST", url, data=search_data)
             api_client.log_request_response("POST", url, search_data, response, test_name=f"test_05_search_product_{idx}")
             status = "PASS" if response.status_code == 200 else "FAIL"
             # Add to reporter
@@ -190,18 +247,21 @@ class TestAutomationExerciseAPI:
                 status_code=response.status_code,
                 response_time=response.elapsed.total_seconds() * 1000 if hasattr(response, 'elapsed') else 0,
                 status="PASS" if response.status_code == 200 else "FAIL",
-                details=f"Response: {response.text[:100]}..."
+                details=f"Response: {response.text[:100]}...",
+                log_name=f"test_05_search_product_{idx}"
             )
             assert response.status_code == 200, f"Expected 200, got {response.status_code}"
             try:
-                products = response.json()
+                products = json_backend.response_json(response)
                 logger.info(f"✓ Search for '{term}' returned {len(products.get('products', []))} products")
-            except json.JSONDecodeError:
+                violations = APITestValidator.search_violations(products, term)
+                assert not violations, f"Invalid search response for '{term}': {violations[:10]}"
+            except ValueError:
                 logger.info(f"✓ Search for '{term}' completed - Response: {response.text[:100]}...")
 
     def test_06_get_all_products_list(self, api_client, request):
         url = f"{BASE_URL}/productsList"
-        response = api_client.session.get(url)
+        response = api_client.send("test_06_get_all_products_list", "GET", url)
         api_client.log_request_response("GET", url, {}, response, test_name="test_06_get_all_products_list")
         status = "PASS" if response.status_code == 200 else "FAIL"
         # Add to reporter
@@ -212,18 +272,21 @@ class TestAutomationExerciseAPI:
             status_code=response.status_code,
             response_time=response.elapsed.total_seconds() * 1000 if hasattr(response, 'elapsed') else 0,
             status="PASS" if response.status_code == 200 else "FAIL",
-            details=f"Response: {response.text[:100]}..."
+            details=f"Response: {response.text[:100]}...",
+            log_name="test_06_get_all_products_list"
         )
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
         try:
-            products = response.json()
+            products = json_backend.response_json(response)
             logger.info(f"✓ Retrieved products list with {len(products.get('products', []))} products")
-        except json.JSONDecodeError:
+            violations = APITestValidator.violations(APIEndpoints.GET_PRODUCTS_LIST, products)
+            assert not violations, f"Invalid products list: {violations[:10]}"
+        except ValueError:
             logger.info("✓ Products list retrieved successfully")
 
     def test_07_get_all_brands_list(self, api_client, request):
         url = f"{BASE_URL}/brandsList"
-        response = api_client.session.get(url)
+        response = api_client.send("test_07_get_all_brands_list", "GET", url)
         api_client.log_request_response("GET", url, {}, response, test_name="test_07_get_all_brands_list")
         status = "PASS" if response.status_code == 200 else "FAIL"
         # Add to reporter
@@ -234,13 +297,16 @@ class TestAutomationExerciseAPI:
             status_code=response.status_code,
             response_time=response.elapsed.total_seconds() * 1000 if hasattr(response, 'elapsed') else 0,
             status="PASS" if response.status_code == 200 else "FAIL",
-            details=f"Response: {response.text[:100]}..."
+            details=f"Response: {response.text[:100]}...",
+            log_name="test_07_get_all_brands_list"
         )
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
         try:
-            brands = response.json()
+            brands = json_backend.response_json(response)
             logger.info(f"✓ Retrieved brands list with {len(brands.get('brands', []))} brands")
-        except json.JSONDecodeError:
+            violations = APITestValidator.violations(APIEndpoints.GET_BRANDS_LIST, brands)
+            assert not violations, f"Invalid brands list: {violations[:10]}"
+        except ValueError:
             logger.info("✓ Brands list retrieved successfully")
 
     def test_08_delete_user_account(self, api_client, test_user_data, request):
@@ -257,7 +323,8 @@ class TestAutomationExerciseAPI:
             status_code=response.status_code,
             response_time=response.elapsed.total_seconds() * 1000 if hasattr(response, 'elapsed') else 0,
             status="PASS" if response.status_code in [200, 404] else "FAIL",
-            details=f"Response: {response.text[:100]}..."
+            details=f"Response: {response.text[:100]}...",
+            log_name="test_08_delete_user_account"
         )
         assert response.status_code in [200, 404], f"Expected 200 or 404, got {response.status_code}"
         if "Account deleted!" in response.text or "deleted" in response.text.lower():
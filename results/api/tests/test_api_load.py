@@ -0,0 +1,34 @@
+"""
+API load test for productsList, searchProduct and verifyLogin
+Runs only with --api-load; targets the local stub server unless --api-load-target live
+"""
+import pytest
+
+from ..utils.load_generator import LoadGenerator, LoadProfile
+from .test_api_automation import logger, reporter
+
+
+# Share of requests allowed to fail or return an invalid payload
+MAX_ERROR_RATE = 0.01
+
+
+@pytest.mark.load
+def test_load_profile(request, load_target_url):
+    config = request.config
+    profile = LoadProfile.named(
+        config.getoption("--api-load-profile"),
+        rps=config.getoption("--api-load-rps"),
+        duration=config.getoption("--api-load-duration"),
+    )
+    generator = LoadGenerator(load_target_url, profile, concurrency=config.getoption("--api-load-concurrency"))
+    logger.info(f"Starting {profile.name} load profile against {load_target_url} "
+                f"({profile.duration:.0f}s, peak {config.getoption('--api-load-rps'):.0f} rps)")
+    result = generator.run()
+    reporter.load_test = result
+    total = result["total"]
+    logger.info(f"✓ Load test sent {total['requests']} requests at {result['throughput_rps']} rps, "
+                f"p99 {total['p99_ms']} ms, {total['errors']} errors, {total['invalid']} invalid")
+    failures = total["errors"] + total["invalid"]
+    assert total["requests"] > 0, "Load profile produced no requests"
+    assert failures <= total["requests"] * MAX_ERROR_RATE, \
+        f"{failures} of {total['requests']} requests failed or returned invalid payloads"
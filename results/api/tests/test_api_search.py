@@ -0,0 +1,50 @@
+"""
+Fan-out search test: one concurrent searchProduct call per term
+Uses the ten common terms; --api-search-terms COUNT scales it up for search stress runs
+"""
+import pytest
+
+from ..utils.api_test_utils import APIEndpoints, APITestDataGenerator
+from ..utils.search_fan_out import SearchFanOut
+from .test_api_automation import BASE_URL, logger, reporter
+
+
+# Share of searches allowed to fail or return an invalid payload
+MAX_ERROR_RATE = 0.01
+
+
+def pytest_generate_tests(metafunc):
+    if "search_term_count" in metafunc.fixturenames:
+        counts = metafunc.config.getoption("--api-search-terms") or [None]
+        metafunc.parametrize("search_term_count", counts,
+                             ids=[f"{count}_terms" if count else "common_terms" for count in counts])
+
+
+@pytest.mark.product_management
+def test_search_fan_out(request, search_term_count):
+    terms = APITestDataGenerator.generate_search_terms(search_term_count)
+    fan_out = SearchFanOut(BASE_URL, concurrency=request.config.getoption("--api-concurrency"))
+    result = fan_out.run(terms)
+    latency = result["latency"]
+    for search in result["searches"]:
+        if search["error"] or not search["valid"]:
+            logger.warning(f"Search for '{search['term']}' failed: status {search['status_code']}, "
+                           f"{search['error'] or 'invalid payload'}")
+    failures = result["errors"] + result["invalid"]
+    status = "PASS" if failures <= len(terms) * MAX_ERROR_RATE else "FAIL"
+    reporter.add_test_result(
+        test_name=f"POST To Search Product - fan-out of {len(terms)} terms",
+        api_endpoint=BASE_URL + APIEndpoints.SEARCH_PRODUCT,
+        method="POST",
+        status_code=result["status_code"],
+        response_time=latency["p50_ms"],
+        status=status,
+        details=(f"{result['with_results']} of {len(terms)} terms matched products, {failures} failed; "
+                 f"{result['throughput_rps']} rps at concurrency {result['concurrency']}, "
+                 f"p95 {latency['p95_ms']} ms, max {latency['max_ms']} ms; "
+                 f"status codes {result['status_codes']}"),
+    )
+    logger.info(f"✓ Fan-out search of {len(terms)} terms in {result['elapsed_s']}s "
+                f"({result['throughput_rps']} rps, p95 {latency['p95_ms']} ms, {failures} failed)")
+    assert failures <= len(terms) * MAX_ERROR_RATE, \
+        f"{failures} of {len(terms)} searches failed or returned invalid payloads"
@@ -0,0 +1,47 @@
+"""
+Account round trip on the stand-in server: createAccount, getUserDetailByEmail, deleteAccount
+Runs only with --api-target stub, so the live API never gets these accounts
+"""
+import pytest
+import requests
+
+from ..utils import json_backend
+from ..utils.api_test_utils import APIEndpoints
+from .test_api_automation import logger, reporter
+
+
+@pytest.fixture
+def stub_session(api_session):
+    """Session straight to the stand-in server: its account store is under test, so no cassette or cache"""
+    with requests.Session() as session:
+        session.headers.update(api_session.headers)
+        yield session
+
+
+@pytest.mark.stub_only
+def test_user_detail_round_trip(stub_session, api_base_url, unique_user_data):
+    created = stub_session.post(api_base_url + APIEndpoints.CREATE_USER, data=unique_user_data)
+    assert json_backend.response_json(created)["responseCode"] == 201, created.text
+    try:
+        detail = stub_session.get(api_base_url + APIEndpoints.GET_USER_LIST,
+                                  params={"email": unique_user_data["email"]})
+        user = json_backend.response_json(detail).get("user", {})
+        # Stored under the createAccount form keys, returned under the live API's field names
+        assert user.get("email") == unique_user_data["email"], f"Unexpected user detail: {user}"
+        assert user.get("first_name") == unique_user_data["firstname"]
+        assert user.get("last_name") == unique_user_data["lastname"]
+        assert user.get("birth_day") == unique_user_data["birth_date"]
+        assert "password" not in user
+    finally:
+        stub_session.delete(api_base_url + APIEndpoints.DELETE_USER,
+                            data={"email": unique_user_data["email"], "password": unique_user_data["password"]})
+    reporter.add_test_result(
+        test_name="Stand-in server account round trip",
+        api_endpoint=api_base_url + APIEndpoints.GET_USER_LIST,
+        method="GET",
+        status_code=detail.status_code,
+        response_time=detail.elapsed.total_seconds() * 1000,
+        status="PASS",
+        details=f"Detail fields of {unique_user_data['email']} match the createAccount form",
+    )
+    logger.info("✓ Stand-in server returned the created account's details")
@@ -0,0 +1,173 @@
+"""
+Record and replay through CassetteAdapter with an in-process server in place of the network
+"""
+import json
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from ..utils.api_test_utils import APIEndpoints
+from ..utils.async_api_client import APICall, AsyncAPIClient
+from ..utils.cassette import Cassette, CassetteAdapter, CassetteMiss
+from ..utils.http_transport import SharedTransport
+
+
+# The live API address; --api-target stub repoints APIEndpoints.BASE_URL, and matching ignores the host
+BASE_URL = "https://automationexercise.com/api"
+
+
+class CountingServer(BaseAdapter):
+    """Answers every request with its call number, method and body"""
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def send(self, request, **kwargs):
+        self.calls.append(request)
+        body = request.body.decode("utf-8") if isinstance(request.body, bytes) else request.body
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        response._content = json.dumps({"call": len(self.calls), "method": request.method,
+                                        "body": body}).encode("utf-8")
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def cassette_session(cassette, server):
+    session = requests.Session()
+    adapter = CassetteAdapter(cassette, server)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def record(directory, *requests_args):
+    """Record each (method, route, kwargs) exchange into a fresh segment of ``directory``"""
+    server = CountingServer()
+    cassette = Cassette(str(directory), mode="record")
+    session = cassette_session(cassette, server)
+    responses = [session.request(method, BASE_URL + route, **kwargs) for method, route, kwargs in requests_args]
+    cassette.close()
+    return responses
+
+
+def test_round_trip_replays_recordings_without_the_server(tmp_path):
+    recorded = record(tmp_path, ("GET", APIEndpoints.GET_PRODUCTS_LIST, {}),
+                      ("POST", APIEndpoints.SEARCH_PRODUCT, {"data": {"search_product": "top"}}))
+
+    server = CountingServer()
+    cassette = Cassette(str(tmp_path), mode="replay")
+    session = cassette_session(cassette, server)
+    replayed = [session.get(BASE_URL + APIEndpoints.GET_PRODUCTS_LIST),
+                session.post(BASE_URL + APIEndpoints.SEARCH_PRODUCT, data={"search_product": "top"})]
+
+    assert server.calls == []
+    assert len(cassette) == 2
+    assert [r.status_code for r in replayed] == [r.status_code for r in recorded]
+    assert [r.json() for r in replayed] == [r.json() for r in recorded]
+    assert replayed[0].headers["Content-Type"] == "application/json"
+    assert replayed[0].recorded_elapsed_ms is not None
+    assert cassette.stats.as_dict()["hits"] == 2
+
+
+def test_repeated_requests_replay_in_order_then_repeat_the_last(tmp_path):
+    route = APIEndpoints.GET_PRODUCTS_LIST
+    record(tmp_path, ("GET", route, {}), ("GET", route, {}))
+
+    session = cassette_session(Cassette(str(tmp_path), mode="replay"), CountingServer())
+    assert [session.get(BASE_URL + route).json()["call"] for _ in range(3)] == [1, 2, 2]
+
+
+def test_missing_interaction_raises_in_replay_mode(tmp_path):
+    record(tmp_path, ("GET", APIEndpoints.GET_PRODUCTS_LIST, {}))
+
+    server = CountingServer()
+    cassette = Cassette(str(tmp_path), mode="replay")
+    session = cassette_session(cassette, server)
+    with pytest.raises(CassetteMiss):
+        session.get(BASE_URL + APIEndpoints.GET_BRANDS_LIST)
+    assert server.calls == []
+    assert cassette.stats.as_dict()["misses"] == 1
+
+
+def test_once_mode_records_the_missing_interaction(tmp_path):
+    record(tmp_path, ("GET", APIEndpoints.GET_PRODUCTS_LIST, {}))
+
+    server = CountingServer()
+    cassette = Cassette(str(tmp_path), mode="once")
+    session = cassette_session(cassette, server)
+    session.get(BASE_URL + APIEndpoints.GET_PRODUCTS_LIST)
+    session.get(BASE_URL + APIEndpoints.GET_BRANDS_LIST)
+    cassette.close()
+
+    assert len(server.calls) == 1
+    assert cassette.stats.as_dict()["recorded"] == 1
+    assert len(Cassette(str(tmp_path), mode="replay")) == 2
+
+
+def test_form_bodies_match_regardless_of_field_order(tmp_path):
+    route = APIEndpoints.VERIFY_LOGIN
+    record(tmp_path, ("POST", route, {"data": [("email", "a@example.com"), ("password", "secret")]}))
+
+    session = cassette_session(Cassette(str(tmp_path), mode="replay"), CountingServer())
+    response = session.post(BASE_URL + route, data=[("password", "secret"), ("email", "a@example.com")])
+    assert response.json()["call"] == 1
+    with pytest.raises(CassetteMiss):
+        session.post(BASE_URL + route, data={"email": "a@example.com", "password": "other"})
+
+
+def test_json_bodies_match_regardless_of_key_order(tmp_path):
+    route = APIEndpoints.SEARCH_PRODUCT
+    record(tmp_path, ("POST", route, {"json": {"search_product": "top", "page": 1}}))
+
+    session = cassette_session(Cassette(str(tmp_path), mode="replay"), CountingServer())
+    response = session.post(BASE_URL + route, data='{"page": 1, "search_product": "top"}',
+                            headers={"Content-Type": "application/json"})
+    assert response.status_code == 200
+    with pytest.raises(CassetteMiss):
+        session.post(BASE_URL + route, json={"search_product": "dress", "page": 1})
+
+
+def test_query_order_and_host_do_not_affect_matching(tmp_path):
+    route = APIEndpoints.GET_USER_LIST
+    record(tmp_path, ("GET", route, {"params": [("email", "a@example.com"), ("lang", "en")]}))
+
+    session = cassette_session(Cassette(str(tmp_path), mode="replay"), CountingServer())
+    response = session.get("http://127.0.0.1:8000/api" + route + "?lang=en&email=a%40example.com")
+    assert response.json()["call"] == 1
+
+
+def test_live_routes_bypass_the_cassette(tmp_path):
+    server = CountingServer()
+    cassette = Cassette(str(tmp_path), mode="replay")
+    session = cassette_session(cassette, server)
+    session.post(BASE_URL + APIEndpoints.CREATE_USER, data={"email": "a@example.com"})
+
+    assert len(server.calls) == 1
+    assert len(cassette) == 0
+    assert cassette.stats.as_dict()["live"] == 1
+
+
+def test_concurrent_prefetch_replays_through_the_shared_transport(tmp_path):
+    record(tmp_path, ("GET", APIEndpoints.GET_PRODUCTS_LIST, {}), ("GET", APIEndpoints.GET_BRANDS_LIST, {}))
+
+    transport = SharedTransport(cassette=Cassette(str(tmp_path), mode="replay"))
+    results = AsyncAPIClient(concurrency=4, transport=transport).run([
+        APICall("products", "GET", BASE_URL + APIEndpoints.GET_PRODUCTS_LIST),
+        APICall("brands", "GET", BASE_URL + APIEndpoints.GET_BRANDS_LIST),
+        APICall("missing", "GET", BASE_URL + APIEndpoints.GET_USER_LIST, params={"email": "a@example.com"}),
+    ])
+    transport.close()
+
+    assert results["products"].json()["call"] == 1
+    assert results["brands"].json()["call"] == 2
+    assert isinstance(results["missing"], CassetteMiss)
+    assert transport.cassette.stats.as_dict()["hits"] == 2
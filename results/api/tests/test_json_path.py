@@ -0,0 +1,95 @@
+"""
+Compiled JSON paths: missing keys, list indexes, wildcards, PathSet extraction and malformed paths
+"""
+import pytest
+
+from ..utils.json_path import PathSet, compile_path, compile_paths
+
+
+DATA = {
+    "responseCode": 200,
+    "products": [
+        {"id": 1, "name": "Blue Top", "price": "Rs. 500",
+         "category": {"usertype": {"usertype": "Women"}, "category": "Tops"}},
+        {"id": 2, "name": "Men Tshirt", "price": "Rs. 400",
+         "category": {"usertype": {"usertype": "Men"}, "category": "Tshirts"}},
+        {"id": 3, "name": "Sleeveless Dress"},
+    ],
+    "meta": {"total": 3, "empty": None},
+}
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("responseCode", 200),
+    ("products.0.name", "Blue Top"),
+    ("products[1].price", "Rs. 400"),
+    ("products.-1.id", 3),
+    ("products[0].category.usertype.usertype", "Women"),
+    ("meta.total", 3),
+])
+def test_plain_paths(path, expected):
+    assert compile_path(path).get(DATA) == expected
+
+
+@pytest.mark.parametrize("path", [
+    "missing",
+    "meta.missing",
+    "products.2.category.category",
+    "responseCode.value",
+    "meta.total.0",
+])
+def test_missing_keys_return_the_default(path):
+    assert compile_path(path).get(DATA) is None
+    assert compile_path(path).get(DATA, default="n/a") == "n/a"
+
+
+def test_present_null_is_not_missing():
+    assert compile_path("meta.empty").get(DATA, default="n/a") is None
+
+
+@pytest.mark.parametrize("path", ["products.3.name", "products[-4].name", "products.99"])
+def test_index_out_of_range_returns_the_default(path):
+    assert compile_path(path).get(DATA) is None
+
+
+def test_index_on_an_object_is_a_key():
+    assert compile_path("codes.404").get({"codes": {"404": "Not Found"}}) == "Not Found"
+    assert compile_path("codes.404").get({"codes": ["x"]}) is None
+
+
+def test_wildcards_skip_elements_without_the_rest_of_the_path():
+    assert compile_path("products.*.id").get(DATA) == [1, 2, 3]
+    assert compile_path("products[*].category.category").get(DATA) == ["Tops", "Tshirts"]
+    assert compile_path("products.*.category.usertype.*").get(DATA) == ["Women", "Men"]
+
+
+def test_wildcards_over_objects_empty_lists_and_scalars():
+    assert compile_path("meta.*").get(DATA) == [3, None]
+    assert compile_path("products.*.id").get({"products": []}) == []
+    assert compile_path("responseCode.*").get(DATA) == []
+    assert compile_path("missing.*").get(DATA) == []
+
+
+def test_path_set_matches_single_path_extraction():
+    paths = ["responseCode", "products.0.name", "products.*.name", "products.*.category.category",
+             "products.7.name", "meta.*"]
+    extracted = PathSet(paths).extract(DATA)
+    assert extracted == {path: compile_path(path).get(DATA) for path in paths}
+    assert compile_paths(tuple(paths)).extract(DATA) == extracted
+
+
+def test_compiled_paths_are_memoized():
+    assert compile_path("products.*.price") is compile_path("products.*.price")
+
+
+@pytest.mark.parametrize("path", ["", "products..name", "products.", ".products", "products[", "products]",
+                                  "products[0", "products[]", "products[[0]]"])
+def test_malformed_paths_raise(path):
+    with pytest.raises(ValueError, match="Malformed JSON path"):
+        compile_path(path)
+    with pytest.raises(ValueError):
+        PathSet(["responseCode", path])
+
+
+def test_leading_index_addresses_a_top_level_list():
+    assert compile_path("[1].id").get(DATA["products"]) == 2
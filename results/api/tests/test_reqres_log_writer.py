@@ -0,0 +1,88 @@
+"""
+Request/response log segments: rotation, compression, flushing and write errors
+"""
+import gzip
+import importlib.util
+import os
+
+import pytest
+
+from ..utils.reqres_log_writer import (
+    RequestResponseLogReader, RequestResponseLogWriter, configure_log_writers,
+)
+
+
+def records(count, test_name="test_a"):
+    return [{"test_name": test_name, "seq": i, "body": "x" * 64} for i in range(count)]
+
+
+def test_flush_makes_queued_records_readable(tmp_path):
+    writer = RequestResponseLogWriter(str(tmp_path), run_id="run")
+    try:
+        for record in records(5):
+            writer.write(record)
+        writer.flush()
+        assert writer.records_written == 5
+        assert [r["seq"] for r in RequestResponseLogReader(str(tmp_path)).find("test_a")] == list(range(5))
+    finally:
+        writer.close()
+
+
+def test_segments_rotate_at_the_size_limit_and_read_back_in_order(tmp_path):
+    writer = RequestResponseLogWriter(str(tmp_path), max_segment_bytes=400, batch_size=1, run_id="run")
+    for record in records(10):
+        writer.write(record)
+    writer.close()
+
+    reader = RequestResponseLogReader(str(tmp_path), run_id="run")
+    segments = reader.segments()
+    assert len(segments) > 1
+    assert all(os.path.getsize(path) <= 400 for path in segments)
+    assert [r["seq"] for r in reader.iter_records()] == list(range(10))
+
+
+def test_reader_keeps_runs_apart(tmp_path):
+    for run_id, test_name in (("run1", "test_a"), ("run2", "test_b")):
+        writer = RequestResponseLogWriter(str(tmp_path), run_id=run_id)
+        for record in records(2, test_name):
+            writer.write(record)
+        writer.close()
+
+    assert set(RequestResponseLogReader(str(tmp_path), run_id="run2").index()) == {"test_b"}
+    assert set(RequestResponseLogReader(str(tmp_path)).index()) == {"test_a", "test_b"}
+
+
+def test_gzip_segments_are_compressed_and_readable(tmp_path):
+    writer = RequestResponseLogWriter(str(tmp_path), compression="gzip", run_id="run")
+    for record in records(3):
+        writer.write(record)
+    writer.close()
+
+    [segment] = RequestResponseLogReader(str(tmp_path), run_id="run").segments()
+    assert segment.endswith(".jsonl.gz")
+    with gzip.open(segment, 'rt', encoding='utf-8') as f:
+        assert len(f.readlines()) == 3
+    assert [r["seq"] for r in RequestResponseLogReader(str(tmp_path)).iter_records()] == [0, 1, 2]
+
+
+def test_write_errors_are_raised_from_flush_write_and_close(tmp_path, monkeypatch):
+    writer = RequestResponseLogWriter(str(tmp_path), run_id="run")
+
+    def fail(batch):
+        raise OSError("disk full")
+    monkeypatch.setattr(writer, "_write_batch", fail)
+
+    writer.write(records(1)[0])
+    with pytest.raises(OSError, match="disk full"):
+        writer.flush()
+    with pytest.raises(OSError, match="disk full"):
+        writer.write(records(1)[0])
+    with pytest.raises(OSError, match="disk full"):
+        writer.close()
+    assert not writer._thread.is_alive()
+
+
+@pytest.mark.skipif(importlib.util.find_spec("zstandard") is not None, reason="zstandard is installed")
+def test_zstd_without_zstandard_fails_at_configuration():
+    with pytest.raises(ImportError, match="zstandard"):
+        configure_log_writers(compression="zstd")
@@ -0,0 +1,161 @@
+"""
+ResponseCache tiers and CachingAdapter revalidation with an in-process server in place of the network
+"""
+import io
+import json
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from ..utils.api_test_utils import APIEndpoints
+from ..utils.response_cache import CachingAdapter, ResponseCache
+
+
+BASE_URL = "https://automationexercise.com/api"
+PRODUCTS_URL = BASE_URL + APIEndpoints.GET_PRODUCTS_LIST
+
+
+class ScriptedServer(BaseAdapter):
+    """Answers with the queued (status, headers) pairs in order, then keeps repeating the last"""
+    def __init__(self, *replies):
+        super().__init__()
+        self.replies = list(replies) or [(200, {})]
+        self.calls = []
+
+    def send(self, request, **kwargs):
+        self.calls.append(request)
+        status, headers = self.replies[min(len(self.calls), len(self.replies)) - 1]
+        response = requests.Response()
+        response.status_code = status
+        response.reason = "OK" if status == 200 else "Not Modified"
+        response.headers = CaseInsensitiveDict(dict({"Content-Type": "application/json"}, **headers))
+        response._content = b"" if status == 304 else json.dumps({"call": len(self.calls)}).encode("utf-8")
+        response.raw = io.BytesIO(response._content)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def caching_session(cache, server):
+    session = requests.Session()
+    session.mount("https://", CachingAdapter(cache, server))
+    return session
+
+
+def expire(cache):
+    """Age every memory entry past the TTL"""
+    for entry in cache._memory.values():
+        entry["stored_at"] -= cache.ttl_s + 1
+
+
+def test_fresh_entry_is_served_from_memory():
+    server = ScriptedServer()
+    cache = ResponseCache()
+    session = caching_session(cache, server)
+
+    first = session.get(PRODUCTS_URL)
+    second = session.get(PRODUCTS_URL)
+
+    assert len(server.calls) == 1
+    assert second.json() == first.json()
+    stats = cache.stats.as_dict()
+    assert (stats["misses"], stats["stored"], stats["memory_hits"]) == (1, 1, 1)
+
+
+def test_uncacheable_routes_always_reach_the_server():
+    server = ScriptedServer()
+    session = caching_session(ResponseCache(), server)
+    for _ in range(2):
+        session.get(BASE_URL + APIEndpoints.GET_USER_LIST, params={"email": "a@example.com"})
+    assert len(server.calls) == 2
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    server = ScriptedServer()
+    cache = ResponseCache(max_entries=2)
+    session = caching_session(cache, server)
+    products, brands = PRODUCTS_URL, BASE_URL + APIEndpoints.GET_BRANDS_LIST
+    search = BASE_URL + APIEndpoints.SEARCH_PRODUCT
+
+    session.get(products)
+    session.get(brands)
+    session.get(products)  # brands is now the oldest
+    session.post(search, data={"search_product": "top"})
+    assert cache.stats.as_dict()["evictions"] == 1
+
+    session.get(products)
+    assert len(server.calls) == 3
+    session.get(brands)
+    assert len(server.calls) == 4
+
+
+def test_expired_entry_without_validators_is_fetched_again():
+    server = ScriptedServer()
+    cache = ResponseCache(ttl_s=60)
+    session = caching_session(cache, server)
+
+    session.get(PRODUCTS_URL)
+    expire(cache)
+    response = session.get(PRODUCTS_URL)
+
+    assert response.json() == {"call": 2}
+    assert "If-None-Match" not in server.calls[1].headers
+    assert cache.stats.as_dict()["misses"] == 2
+
+
+def test_304_revalidates_and_takes_the_new_validators():
+    server = ScriptedServer(
+        (200, {"ETag": '"v1"', "Last-Modified": "Mon, 12 Oct 2026 10:00:00 GMT", "Cache-Control": "max-age=60"}),
+        (304, {"ETag": '"v2"', "Last-Modified": "Sat, 17 Oct 2026 10:00:00 GMT", "Cache-Control": "max-age=120"}),
+    )
+    cache = ResponseCache(ttl_s=60)
+    session = caching_session(cache, server)
+
+    first = session.get(PRODUCTS_URL)
+    expire(cache)
+    revalidated = session.get(PRODUCTS_URL)
+
+    assert server.calls[1].headers["If-None-Match"] == '"v1"'
+    assert server.calls[1].headers["If-Modified-Since"] == "Mon, 12 Oct 2026 10:00:00 GMT"
+    assert revalidated.status_code == 200
+    assert revalidated.json() == first.json()
+    assert revalidated.headers["ETag"] == '"v2"'
+    assert revalidated.headers["Cache-Control"] == "max-age=120"
+    assert cache.stats.as_dict()["revalidated"] == 1
+
+    # The refreshed entry is fresh again, and the next revalidation sends the new validators
+    session.get(PRODUCTS_URL)
+    assert len(server.calls) == 2
+    expire(cache)
+    session.get(PRODUCTS_URL)
+    assert server.calls[2].headers["If-None-Match"] == '"v2"'
+    assert server.calls[2].headers["If-Modified-Since"] == "Sat, 17 Oct 2026 10:00:00 GMT"
+
+
+def test_no_store_responses_are_not_cached():
+    server = ScriptedServer((200, {"Cache-Control": "no-store"}))
+    cache = ResponseCache()
+    session = caching_session(cache, server)
+
+    session.get(PRODUCTS_URL)
+    session.get(PRODUCTS_URL)
+
+    assert len(server.calls) == 2
+    assert cache.stats.as_dict()["stored"] == 0
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    server = ScriptedServer()
+    caching_session(ResponseCache(disk_dir=str(tmp_path)), server).get(PRODUCTS_URL)
+
+    cache = ResponseCache(disk_dir=str(tmp_path))
+    response = caching_session(cache, server).get(PRODUCTS_URL)
+
+    assert len(server.calls) == 1
+    assert response.json() == {"call": 1}
+    assert cache.stats.as_dict()["disk_hits"] == 1
+    assert not list(tmp_path.rglob("*.tmp"))
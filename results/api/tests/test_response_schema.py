@@ -0,0 +1,125 @@
+"""
+Compiled response schemas: checker results, violation paths and parity with the interpreted walk
+"""
+import copy
+
+import pytest
+
+from ..utils.api_test_utils import APIEndpoints, APITestValidator, PRODUCT_SCHEMA, RESPONSE_SCHEMAS
+from ..utils.response_schema import ListOf, Schema, _explain
+
+
+def product(index=1):
+    return {"id": index, "name": f"Top {index}", "price": "Rs. 500", "brand": "Polo",
+            "category": {"usertype": {"usertype": "Women"}, "category": "Tops"}}
+
+
+def products_payload(count=3):
+    return {"responseCode": 200, "products": [product(i) for i in range(count)]}
+
+
+def interpreted_violations(spec, data):
+    violations = []
+    _explain(spec, data, "$", violations)
+    return violations
+
+
+def test_valid_payload_has_no_violations():
+    schema = APITestValidator.schema(APIEndpoints.GET_PRODUCTS_LIST)
+    assert schema.is_valid(products_payload())
+    assert schema.violations(products_payload()) == []
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1", "$.products[1].id: expected int, got str"),
+    (True, "$.products[1].id: expected int, got bool"),
+    (1.5, "$.products[1].id: expected int, got float"),
+    (None, "$.products[1].id: expected int, got null"),
+])
+def test_type_mismatch_is_reported_with_its_path(value, expected):
+    payload = products_payload()
+    payload["products"][1]["id"] = value
+    schema = APITestValidator.schema(APIEndpoints.GET_PRODUCTS_LIST)
+    assert not schema.is_valid(payload)
+    assert schema.violations(payload) == [expected]
+
+
+def test_float_accepts_whole_numbers_but_not_strings():
+    schema = Schema({"price": float})
+    assert schema.is_valid({"price": 5})
+    assert schema.is_valid({"price": 5.5})
+    assert schema.violations({"price": "5.5"}) == ["$.price: expected float, got str"]
+
+
+def test_missing_required_keys_are_all_reported():
+    payload = products_payload()
+    del payload["products"][0]["brand"]
+    del payload["products"][2]["category"]["usertype"]["usertype"]
+    assert APITestValidator.violations(APIEndpoints.GET_PRODUCTS_LIST, payload) == [
+        "$.products[0]: missing key 'brand'",
+        "$.products[2].category.usertype: missing key 'usertype'",
+    ]
+
+
+def test_extra_keys_are_allowed():
+    payload = products_payload()
+    payload["products"][0]["discount"] = "10%"
+    assert APITestValidator.schema(APIEndpoints.GET_PRODUCTS_LIST).is_valid(payload)
+
+
+def test_nested_arrays_check_every_element():
+    schema = Schema({"grid": ListOf(ListOf(int, min_items=1))})
+    assert schema.is_valid({"grid": [[1, 2], [3]]})
+    assert schema.violations({"grid": [[1], [], [2, "3"]]}) == [
+        "$.grid[1]: expected at least 1 items, got 0",
+        "$.grid[2][1]: expected int, got str",
+    ]
+    assert schema.violations({"grid": [1]}) == ["$.grid[0]: expected list, got int"]
+
+
+def test_min_items_and_empty_lists():
+    assert APITestValidator.violations(APIEndpoints.GET_PRODUCTS_LIST, products_payload(0)) == [
+        "$.products: expected at least 1 items, got 0"]
+    assert APITestValidator.violations(APIEndpoints.SEARCH_PRODUCT, products_payload(0)) == []
+
+
+def test_wrong_container_types():
+    schema = APITestValidator.schema(APIEndpoints.GET_PRODUCTS_LIST)
+    assert schema.violations([]) == ["$: expected object, got list"]
+    assert schema.violations({"responseCode": 200, "products": {}}) == ["$.products: expected list, got dict"]
+
+
+def test_unsupported_schema_elements_are_rejected():
+    with pytest.raises(TypeError):
+        Schema({"id": 1})
+
+
+def mutations():
+    """Valid payloads and single-field corruptions of them, for every route schema"""
+    base = products_payload()
+    yield APIEndpoints.GET_PRODUCTS_LIST, base
+    for key in list(PRODUCT_SCHEMA):
+        for value in (None, "x", 1, [], {}):
+            payload = copy.deepcopy(base)
+            payload["products"][2][key] = value
+            yield APIEndpoints.GET_PRODUCTS_LIST, payload
+        payload = copy.deepcopy(base)
+        del payload["products"][0][key]
+        yield APIEndpoints.SEARCH_PRODUCT, payload
+    for value in (None, [], "", {"usertype": {}}, {"usertype": {"usertype": 1}, "category": "Tops"}):
+        payload = copy.deepcopy(base)
+        payload["products"][1]["category"] = value
+        yield APIEndpoints.SEARCH_PRODUCT, payload
+    yield APIEndpoints.GET_BRANDS_LIST, {"responseCode": 200, "brands": [{"id": 1, "brand": "Polo"}]}
+    yield APIEndpoints.GET_BRANDS_LIST, {"responseCode": 200, "brands": [{"id": "1", "brand": "Polo"}]}
+    yield APIEndpoints.GET_BRANDS_LIST, {"responseCode": 200, "brands": None}
+    yield APIEndpoints.CREATE_USER, {"responseCode": 201, "message": "User created!"}
+    yield APIEndpoints.CREATE_USER, {"responseCode": "201", "message": "User created!"}
+    yield APIEndpoints.VERIFY_LOGIN, {"message": "User exists!"}
+    yield APIEndpoints.VERIFY_LOGIN, None
+
+
+def test_compiled_checker_agrees_with_the_interpreted_walk():
+    for endpoint, payload in mutations():
+        compiled = APITestValidator.schema(endpoint).is_valid(payload)
+        assert compiled == (not interpreted_violations(RESPONSE_SCHEMAS[endpoint], payload)), (endpoint, payload)
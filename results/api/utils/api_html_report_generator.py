@@ -1,14 +1,34 @@
 """
 Beautiful HTML Report Generator for API Testing
+
+Regenerate a report from the last run's summary, from the repository root:
+
+    python -m results.api.utils.api_html_report_generator [--results FILE] [--output FILE]
 """
-import json
+import argparse
 import os
 from datetime import datetime
 
+from . import json_backend
+from ...reporting import (REPORT_CSS, ReportWriter, get_template, render, stats_table, summary_cards,
+                          write_static_assets)
+
+
+SUITE_REPORTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "reports")
+# Items beyond this index share the last fade-in delay
+MAX_ANIMATED_ITEMS = 20
+# Fields of a logged exchange shown in the report
+EXCHANGE_FIELDS = ("method", "url", "response_status", "request_data")
+
 
 class APIHTMLReportGenerator:
-    def __init__(self, test_results_file: str = "reports/api_test_execution_summary.json"):
+    def __init__(self, test_results_file: str = "reports/api_test_execution_summary.json",
+                 reqres_log_dir: str = None, reqres_run_id: str = None):
         self.test_results_file = test_results_file
+        # Optional request_response_logs directory to link each test to its logged exchange
+        self.reqres_log_dir = reqres_log_dir
+        # Run whose segments are read; None reads every run in the directory
+        self.reqres_run_id = reqres_run_id
 
     def generate_beautiful_report(self, output_path=None):
         """Generate a beautiful HTML report for API tests"""
@@ -16,20 +36,56 @@ class APIHTMLReportGenerator:
         if not os.path.exists(self.test_results_file):
             raise FileNotFoundError(f"Test results file not found: {self.test_results_file}")
 
-        with open(self.test_results_file, 'r') as f:
-            data = json.load(f)
+        with open(self.test_results_file, 'r', encoding='utf-8') as f:
+            data = json_backend.load(f)
 
-        html_content = self._create_html_template(data)
+        return self._write_report(data, data.get('test_results', []), output_path)
+
+    def generate_streaming_report(self, results_file, output_path=None, summary=None):
+        """Generate the report from a JSON Lines results file without loading it into memory.
+
+        Counters are taken from ``summary`` when given, otherwise computed in a
+        first pass over the file; test items are then rendered one line at a time.
+        """
+        if not os.path.exists(results_file):
+            raise FileNotFoundError(f"Test results file not found: {results_file}")
+        if summary is None:
+            summary = self._summarize_results(self._iter_results(results_file))
+        return self._write_report(summary, self._iter_results(results_file), output_path)
+
+    def _write_report(self, data, results, output_path=None):
+        """Write head, test items and tail to the output file chunk by chunk, with the shared stylesheet"""
+        exchanges = self._load_exchanges()
 
         # Save HTML report with timestamped name if provided
         if output_path is None:
             output_path = f"reports/beautiful_api_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        write_static_assets(os.path.dirname(output_path) or ".")
+        with ReportWriter(output_path) as writer:
+            writer.write(self._render_head(data))
+            for i, test in enumerate(results):
+                writer.write(self._render_test_item(i, test, exchanges))
+            writer.write(self._render_tail())
 
         return output_path
-        
+
+    @staticmethod
+    def _iter_results(results_file):
+        """Yield test results from a JSON Lines file"""
+        with open(results_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json_backend.loads(line)
+
+    @staticmethod
+    def _summarize_results(results):
+        """Compute summary counters and latency breakdowns in a single pass over the results"""
+        from .api_test_utils import APIResultAggregator
+        aggregator = APIResultAggregator()
+        for result in results:
+            aggregator.add(result)
+        return aggregator.summary()
+
     def create_sample_report_data(self):
         """Create sample report data based on executed tests"""
         sample_data = {
@@ -96,348 +152,182 @@ class APIHTMLReportGenerator:
         # Create reports directory if it doesn't exist
         os.makedirs(os.path.dirname(self.test_results_file), exist_ok=True)
         
-        with open(self.test_results_file, 'w') as f:
-            json.dump(sample_data, f, indent=2)
+        with open(self.test_results_file, 'w', encoding='utf-8') as f:
+            json_backend.dump(sample_data, f)
         
-    def _create_html_template(self, data):
+    def _load_exchanges(self):
+        """Index the last logged request/response exchange and exchange count by test name.
+
+        Response bodies are dropped so the index stays small for long runs.
+        """
+        if not self.reqres_log_dir or not os.path.isdir(self.reqres_log_dir):
+            return {}
+        from .reqres_log_writer import RequestResponseLogReader
+        exchanges = {}
+        for record in RequestResponseLogReader(self.reqres_log_dir, self.reqres_run_id).iter_records():
+            name = record.get('test_name')
+            count = exchanges[name][0] + 1 if name in exchanges else 1
+            exchanges[name] = (count, {key: record.get(key) for key in EXCHANGE_FIELDS})
+        return exchanges
+
+    def _create_html_template(self, data, exchanges=None):
         """Create HTML template with API test results"""
+        exchanges = exchanges or {}
+        items = [self._render_test_item(i, test, exchanges) for i, test in enumerate(data.get('test_results', []))]
+        return self._render_head(data) + "".join(items) + self._render_tail()
+
+    def _render_head(self, data):
+        """Render everything up to the first test item"""
         passed_tests = data.get('passed', 0)
-        failed_tests = data.get('failed', 0)
         total_tests = data.get('total_tests', 0)
-        total_api_calls = data.get('total_api_calls', 0)
-        avg_response_time = data.get('avg_response_time', 0)
         pass_rate = (passed_tests / total_tests * 100) if total_tests > 0 else 0
-        
-        html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>API Testing Report - Automation Exercise</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }}
-        
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 15px;
-            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }}
-        
-        .header {{
-            background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
-            color: white;
-            padding: 30px;
-            text-align: center;
-        }}
-        
-        .header h1 {{
-            font-size: 2.5em;
-            margin-bottom: 10px;
-        }}
-        
-        .header p {{
-            font-size: 1.2em;
-            opacity: 0.9;
-        }}
-        
-        .summary {{
-            padding: 30px;
-            background: #f8f9fa;
-        }}
-        
-        .summary-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }}
-        
-        .summary-card {{
-            background: white;
-            padding: 25px;
-            border-radius: 10px;
-            text-align: center;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.08);
-            border-left: 4px solid;
-        }}
-        
-        .summary-card.total {{ border-left-color: #3498db; }}
-        .summary-card.passed {{ border-left-color: #27ae60; }}
-        .summary-card.failed {{ border-left-color: #e74c3c; }}
-        .summary-card.calls {{ border-left-color: #9b59b6; }}
-        .summary-card.response {{ border-left-color: #f39c12; }}
-        .summary-card.rate {{ border-left-color: #2ecc71; }}
-        
-        .summary-card h3 {{
-            font-size: 2.2em;
-            margin-bottom: 10px;
-            color: #2c3e50;
-        }}
-        
-        .summary-card p {{
-            color: #7f8c8d;
-            font-weight: 600;
-        }}
-        
-        .progress-bar {{
-            width: 100%;
-            height: 10px;
-            background: #ecf0f1;
-            border-radius: 5px;
-            overflow: hidden;
-            margin: 20px 0;
-        }}
-        
-        .progress-fill {{
-            height: 100%;
-            background: linear-gradient(90deg, #27ae60, #2ecc71);
-            width: {pass_rate}%;
-            transition: width 0.5s ease;
-        }}
-        
-        .test-results {{
-            padding: 30px;
-        }}
-        
-        .test-results h2 {{
-            color: #2c3e50;
-            margin-bottom: 25px;
-            font-size: 1.8em;
-        }}
-        
-        .test-item {{
-            background: white;
-            margin-bottom: 20px;
-            border-radius: 10px;
-            overflow: hidden;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.08);
-            border-left: 4px solid;
-        }}
-        
-        .test-item.passed {{ border-left-color: #27ae60; }}
-        .test-item.failed {{ border-left-color: #e74c3c; }}
-        
-        .test-header {{
-            padding: 20px;
-            background: #f8f9fa;
-            cursor: pointer;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-        
-        .test-name {{
-            font-weight: 600;
-            color: #2c3e50;
-            flex: 1;
-        }}
-        
-        .test-method {{
-            background: #3498db;
-            color: white;
-            padding: 4px 12px;
-            border-radius: 4px;
-            font-size: 0.8em;
-            font-weight: 600;
-            margin: 0 10px;
-        }}
-        
-        .test-method.POST {{ background: #e67e22; }}
-        .test-method.GET {{ background: #27ae60; }}
-        .test-method.PUT {{ background: #f39c12; }}
-        .test-method.DELETE {{ background: #e74c3c; }}
-        
-        .test-status {{
-            padding: 5px 15px;
-            border-radius: 20px;
-            color: white;
-            font-weight: 600;
-            font-size: 0.9em;
-        }}
-        
-        .test-status.passed {{ background: #27ae60; }}
-        .test-status.failed {{ background: #e74c3c; }}
-        
-        .test-details {{
-            padding: 20px;
-            display: none;
-        }}
-        
-        .test-details.show {{
-            display: block;
-        }}
-        
-        .test-meta {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 15px;
-            margin-bottom: 15px;
-        }}
-        
-        .meta-item {{
-            background: #f8f9fa;
-            padding: 10px;
-            border-radius: 5px;
-        }}
-        
-        .meta-label {{
-            font-weight: 600;
-            color: #7f8c8d;
-            font-size: 0.9em;
-        }}
-        
-        .meta-value {{
-            color: #2c3e50;
-            margin-top: 5px;
-        }}
-        
-        .endpoint {{
-            font-family: 'Courier New', monospace;
-            background: #ecf0f1;
-            padding: 8px;
-            border-radius: 4px;
-            font-size: 0.9em;
-            word-break: break-all;
-        }}
-        
-        .footer {{
-            background: #2c3e50;
-            color: white;
-            text-align: center;
-            padding: 20px;
-        }}
-        
-        @keyframes fadeIn {{
-            from {{ opacity: 0; transform: translateY(20px); }}
-            to {{ opacity: 1; transform: translateY(0); }}
-        }}
-        
-        .test-item {{
-            animation: fadeIn 0.5s ease forwards;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🚀 API Testing Report</h1>
-            <p>Automation Exercise - API Test Execution Results</p>
-            <p>Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
-        </div>
-        
-        <div class="summary">
-            <div class="summary-grid">
-                <div class="summary-card total">
-                    <h3>{total_tests}</h3>
-                    <p>Total Tests</p>
-                </div>
-                <div class="summary-card passed">
-                    <h3>{passed_tests}</h3>
-                    <p>Passed</p>
-                </div>
-                <div class="summary-card failed">
-                    <h3>{failed_tests}</h3>
-                    <p>Failed</p>
-                </div>
-                <div class="summary-card calls">
-                    <h3>{total_api_calls}</h3>
-                    <p>API Calls</p>
-                </div>
-                <div class="summary-card response">
-                    <h3>{avg_response_time:.1f}ms</h3>
-                    <p>Avg Response</p>
-                </div>
-                <div class="summary-card rate">
-                    <h3>{pass_rate:.1f}%</h3>
-                    <p>Pass Rate</p>
-                </div>
-            </div>
-            
-            <div class="progress-bar">
-                <div class="progress-fill"></div>
-            </div>
-        </div>
-        
-        <div class="test-results">
-            <h2>🔗 API Test Execution Details</h2>
-"""
-        
-        # Add test results
-        for i, test in enumerate(data.get('test_results', [])):
-            status_class = test['test_status'].lower()
-            method_class = test['http_method']
-            html += f"""
-            <div class="test-item {status_class}" style="animation-delay: {i * 0.1}s;">
-                <div class="test-header" onclick="toggleDetails({i})">
-                    <div class="test-name">{test['test_name']}</div>
-                    <div class="test-method {method_class}">{test['http_method']}</div>
-                    <div class="test-status {status_class}">{test['test_status']}</div>
-                </div>
-                <div class="test-details" id="details-{i}">
-                    <div class="test-meta">
-                        <div class="meta-item">
-                            <div class="meta-label">API Endpoint</div>
-                            <div class="meta-value endpoint">{test['api_endpoint']}</div>
-                        </div>
-                        <div class="meta-item">
-                            <div class="meta-label">Status Code</div>
-                            <div class="meta-value">{test['status_code']}</div>
-                        </div>
-                        <div class="meta-item">
-                            <div class="meta-label">Response Time</div>
-                            <div class="meta-value">{test['response_time_ms']:.1f} ms</div>
-                        </div>
-                        <div class="meta-item">
-                            <div class="meta-label">Timestamp</div>
-                            <div class="meta-value">{test['timestamp']}</div>
-                        </div>
-                    </div>
-                    
-                    <div class="meta-item">
-                        <div class="meta-label">Details</div>
-                        <div class="meta-value">{test['details']}</div>
-                    </div>
-                </div>
-            </div>
-"""
-        
-        html += """
-        </div>
-        
-        <div class="footer">
-            <p>🔗 Generated by API Testing Framework</p>
-            <p>Powered by Python & Requests</p>
-        </div>
-    </div>
-    
-    <script>
-        function toggleDetails(index) {
-            const details = document.getElementById(`details-${index}`);
-            details.classList.toggle('show');
-        }
-    </script>
-</body>
-</html>
-"""
-        return html
+        cards = summary_cards([
+            ("total", total_tests, "Total Tests"),
+            ("passed", passed_tests, "Passed"),
+            ("failed", data.get('failed', 0), "Failed"),
+            ("calls", data.get('total_api_calls', 0), "API Calls"),
+            ("response", f"{data.get('avg_response_time', 0):.1f}ms", "Avg Response"),
+            ("rate", f"{pass_rate:.1f}%", "Pass Rate"),
+        ])
+        sections = (self._generate_latency_section(data)
+                    + self._generate_load_test_section(data.get('load_test'))
+                    + self._generate_transport_section(data.get('transport_stats'))
+                    + self._generate_cassette_section(data.get('cassette'))
+                    + self._generate_cache_section(data.get('http_cache')))
+        return "".join((
+            render('page_head.html', title="API Testing Report - Automation Exercise", stylesheet=REPORT_CSS,
+                   body_class="api"),
+            render('page_header.html', heading="🚀 API Testing Report",
+                   subtitle="Automation Exercise - API Test Execution Results",
+                   generated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            render('summary.html', cards=cards, pass_rate=pass_rate, sections=sections,
+                   results_title="🔗 API Test Execution Details"),
+        ))
 
+    def _render_test_item(self, i, test, exchanges=None):
+        """Render a single test result"""
+        exchanges = exchanges or {}
+        return get_template('api_test_item.html').render({
+            "index": i,
+            "status_class": test['test_status'].lower(),
+            "status": test['test_status'],
+            "method": test['http_method'],
+            "test_name": test['test_name'],
+            # Cap the staggered fade-in so long reports do not animate for minutes
+            "delay": min(i, MAX_ANIMATED_ITEMS) * 0.1,
+            "api_endpoint": test['api_endpoint'],
+            "status_code": test['status_code'],
+            "response_time_ms": test['response_time_ms'],
+            "timestamp": test['timestamp'],
+            "details": test['details'],
+            "exchange": self._generate_exchange_section(exchanges.get(test.get('log_name'))),
+        })
 
-if __name__ == "__main__":
-    generator = APIHTMLReportGenerator()
-    report_path = generator.generate_beautiful_report()
+    def _render_tail(self):
+        """Render the closing part of the page"""
+        return render('page_tail.html', footer="🔗 Generated by API Testing Framework",
+                      powered_by="Powered by Python & Requests")
+
+    def _generate_exchange_section(self, exchange):
+        """Generate the logged request/response exchange for a test"""
+        if not exchange:
+            return ""
+        count, record = exchange
+        return render('api_exchange.html', count=count, method=record.get('method') or '',
+                      url=record.get('url') or '', response_status=record.get('response_status') or '',
+                      request_data=json_backend.dumps(record.get('request_data') or {}, pretty=False))
+
+    def _generate_latency_section(self, data):
+        """Generate latency percentile tables per endpoint route and HTTP method"""
+        by_endpoint = data.get('latency_by_endpoint')
+        if not by_endpoint:
+            return ""
+        sections = [("📈 Latency by Endpoint", "Endpoint", by_endpoint),
+                    ("📊 Latency by Method", "Method", data.get('latency_by_method') or {})]
+        parts = []
+        for title, label, groups in sections:
+            parts.append(render('section_title.html', title=title))
+            parts.append(stats_table(
+                [label, "Calls", "Mean ms", "Min ms", "p50 ms", "p90 ms", "p99 ms", "Max ms"],
+                ([name, stats.get('count', 0)] + [f"{stats.get(key, 0):.1f}" for key in
+                                                  ('mean_ms', 'min_ms', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms')]
+                 for name, stats in groups.items()),
+            ))
+        return "".join(parts)
+
+    def _generate_load_test_section(self, load):
+        """Generate throughput/latency section from the --api-load run"""
+        if not load:
+            return ""
+        total = load.get('total', {})
+        title = f"⚡ Load Test ({load.get('profile', {}).get('name', '')} profile, {load.get('target', '')})"
+        return "".join((
+            render('section_title.html', title=title),
+            summary_cards([
+                ("calls", total.get('requests', 0), "Requests"),
+                ("rate", f"{load.get('throughput_rps', 0):.1f}", "Throughput (req/s)"),
+                ("response", f"{total.get('p99_ms', 0):.1f}ms", "p99 Latency"),
+                ("failed", total.get('errors', 0) + total.get('invalid', 0), "Errors / Invalid"),
+            ]),
+            stats_table(
+                ["Endpoint", "Requests", "Failures", "Mean ms", "p50 ms", "p90 ms", "p99 ms", "p99.9 ms", "Max ms"],
+                ([name, stats.get('requests', 0), stats.get('errors', 0) + stats.get('invalid', 0)]
+                 + [f"{stats.get(key, 0):.1f}" for key in
+                    ('mean_ms', 'p50_ms', 'p90_ms', 'p99_ms', 'p99.9_ms', 'max_ms')]
+                 for name, stats in load.get('endpoints', {}).items()),
+            ),
+        ))
+
+    def _generate_transport_section(self, stats):
+        """Generate connection pool section from the shared transport counters"""
+        if not stats:
+            return ""
+        return render('section_title.html', title="🔌 Connection Pool") + summary_cards([
+            ("calls", stats.get('connections_opened', 0), "Connections Opened"),
+            ("passed", stats.get('connections_reused', 0), "Connections Reused"),
+            ("rate", f"{stats.get('reuse_rate', 0):.1f}%", "Reuse Rate"),
+            ("response", stats.get('pool_waits', 0), f"Pool Waits ({stats.get('pool_wait_ms', 0):.1f} ms)"),
+        ])
+
+    def _generate_cassette_section(self, stats):
+        """Generate cassette section from the record/replay counters"""
+        if not stats:
+            return ""
+        return render('section_title.html', title="📼 Cassette Replay") + summary_cards([
+            ("passed", stats.get('hits', 0), "Replayed"),
+            ("failed", stats.get('misses', 0), "Misses"),
+            ("rate", f"{stats.get('hit_rate', 0):.1f}%", "Hit Rate"),
+            ("calls", stats.get('recorded', 0), f"Recorded ({stats.get('live', 0)} always live)"),
+        ])
+
+    def _generate_cache_section(self, stats):
+        """Generate response cache section from the hit/miss counters"""
+        if not stats:
+            return ""
+        hits = stats.get('memory_hits', 0) + stats.get('disk_hits', 0)
+        return render('section_title.html', title="🗄️ Response Cache") + summary_cards([
+            ("passed", hits, f"Hits ({stats.get('disk_hits', 0)} from disk)"),
+            ("calls", stats.get('revalidated', 0), "Revalidated (304)"),
+            ("failed", stats.get('misses', 0), "Misses"),
+            ("rate", f"{stats.get('hit_rate', 0):.1f}%", "Hit Rate"),
+            ("response", f"{stats.get('bytes_saved', 0) / 1024:.1f} KB", "Body Bytes Saved"),
+        ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the API HTML report from a summary JSON file")
+    parser.add_argument("--results", default=os.path.join(SUITE_REPORTS_DIR, "api_test_execution_summary.json"),
+                        help="Summary JSON written by a test run")
+    parser.add_argument("--reqres-log-dir", help="request_response_logs directory to link each test to its exchange")
+    parser.add_argument("--output", help="Report path (default: a timestamped file next to --results)")
+    args = parser.parse_args()
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(args.results)),
+        f"beautiful_api_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html")
+    generator = APIHTMLReportGenerator(args.results, reqres_log_dir=args.reqres_log_dir)
+    report_path = generator.generate_beautiful_report(output)
     print(f"Beautiful API HTML report generated: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,16 @@
 """
 API Test Utilities for Automation Exercise API Testing
 """
-import json
 import logging
 import os
 from datetime import datetime
 from typing import Dict, Any, List
+from urllib.parse import urlparse
+
+from . import json_backend
+from .json_path import compile_path, compile_paths
+from .latency_stats import LatencyStats
+from .response_schema import ListOf, Schema
 
 
 class APITestLogger:
@@ -54,15 +59,8 @@ class APIResponseHandler:
     def save_request_response(test_name: str, method: str, url: str, 
                             request_data: Dict, response_data: Dict, 
                             status_code: int, save_dir: str = "request_response_logs"):
-        """Save API request and response for debugging"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{test_name}_{method}_{timestamp}.json"
-        filepath = os.path.join(save_dir, filename)
-        
-        # Create directory if it doesn't exist
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir)
-        
+        """Queue an API request and response for the batched log writer; returns the segment path"""
+        from .reqres_log_writer import get_log_writer
         log_data = {
             "test_name": test_name,
             "timestamp": datetime.now().isoformat(),
@@ -76,11 +74,7 @@ class APIResponseHandler:
                 "data": response_data
             }
         }
-        
-        with open(filepath, 'w') as f:
-            json.dump(log_data, f, indent=2)
-            
-        return filepath
+        return get_log_writer(save_dir).write(log_data)
     
     @staticmethod
     def validate_response_structure(response_data: Dict, expected_keys: List[str]) -> bool:
@@ -92,17 +86,17 @@ class APIResponseHandler:
     
     @staticmethod
     def extract_response_data(response_data: Dict, key_path: str):
-        """Extract data from nested response using dot notation"""
-        keys = key_path.split('.')
-        current_data = response_data
-        
-        for key in keys:
-            if isinstance(current_data, dict) and key in current_data:
-                current_data = current_data[key]
-            else:
-                return None
-                
-        return current_data
+        """Extract data from nested response using dot notation.
+
+        List indexes and wildcards are supported ('products.0.brand',
+        'products.*.price'); a wildcard path returns the list of matches.
+        """
+        return compile_path(key_path).get(response_data)
+
+    @staticmethod
+    def extract_many(response_data: Dict, key_paths: List[str]) -> Dict[str, Any]:
+        """Extract several paths in one traversal; returns path -> value as extract_response_data would"""
+        return compile_paths(tuple(key_paths)).extract(response_data)
 
 
 class APITestDataGenerator:
@@ -130,24 +124,93 @@ class APITestDataGenerator:
             "mobile_number": "+1-555-API-TEST"
         }
     
+    SEARCH_TERMS = [
+        "shirt", "dress", "jeans", "top", "tshirt",
+        "jacket", "pants", "blouse", "skirt", "sweater"
+    ]
+    SEARCH_MODIFIERS = [
+        "blue", "men", "women", "kids", "cotton",
+        "summer", "winter", "printed", "casual", "formal"
+    ]
+
     @staticmethod
-    def generate_search_terms() -> List[str]:
-        """Generate common search terms for testing"""
-        return [
-            "shirt", "dress", "jeans", "top", "tshirt",
-            "jacket", "pants", "blouse", "skirt", "sweater"
-        ]
+    def generate_search_terms(count: int = None) -> List[str]:
+        """Generate common search terms for testing.
+
+        With ``count``, returns that many distinct terms for search stress
+        runs: the common terms, then modifier + term pairs, then numbered
+        variants (which mostly match nothing, like real misspelt queries).
+        """
+        terms = list(APITestDataGenerator.SEARCH_TERMS)
+        if count is None:
+            return terms
+        terms += [f"{modifier} {term}" for modifier in APITestDataGenerator.SEARCH_MODIFIERS
+                  for term in APITestDataGenerator.SEARCH_TERMS]
+        base = len(terms)
+        for index in range(base, count):
+            terms.append(f"{terms[index % base]} {index // base}")
+        return terms[:count]
+
+
+class APIResultAggregator:
+    """Running pass/fail counts and latency statistics, overall and per route and method"""
+    def __init__(self):
+        self.total = 0
+        self.passed = 0
+        self.failed = 0
+        self.latency = LatencyStats()
+        self.by_endpoint: Dict[str, LatencyStats] = {}
+        self.by_method: Dict[str, LatencyStats] = {}
+
+    def add(self, result: Dict):
+        """Fold one test result into the aggregates"""
+        self.total += 1
+        if result.get("test_status") == "PASS":
+            self.passed += 1
+        elif result.get("test_status") == "FAIL":
+            self.failed += 1
+        response_time = result.get("response_time_ms") or 0
+        self.latency.add(response_time)
+        route = APIEndpoints.route_of(result.get("api_endpoint", ""))
+        self.by_endpoint.setdefault(route, LatencyStats()).add(response_time)
+        method = result.get("http_method", "")
+        self.by_method.setdefault(method, LatencyStats()).add(response_time)
+
+    def summary(self) -> Dict:
+        """Summary counters and latency breakdowns as stored in the API summary JSON"""
+        return {
+            "total_tests": self.total,
+            "passed": self.passed,
+            "failed": self.failed,
+            "total_api_calls": self.total,
+            "avg_response_time": self.latency.mean,
+            "latency": self.latency.as_dict(),
+            "latency_by_endpoint": {k: v.as_dict() for k, v in sorted(self.by_endpoint.items())},
+            "latency_by_method": {k: v.as_dict() for k, v in sorted(self.by_method.items())},
+        }
 
 
 class APITestReporter:
     def __init__(self, report_file: str = "reports/api_test_execution_summary.json"):
         self.report_file = report_file
+        # One result per line, for report generators that stream instead of loading the summary
+        self.results_file = os.path.splitext(report_file)[0] + "_results.jsonl"
         self.test_results = []
+        # Counts and latency percentiles kept up to date as results are added
+        self.aggregator = APIResultAggregator()
+        # Connection counters from the shared HTTP transport, if one was used
+        self.transport_stats = None
+        # Throughput/latency outcome of the --api-load run, if one was made
+        self.load_test = None
+        # Replay counters of the --api-cassette layer, if one was used
+        self.cassette_stats = None
+        # Hit/miss counters of the --api-cache layer, if one was used
+        self.cache_stats = None
         
     def add_test_result(self, test_name: str, api_endpoint: str, method: str,
                        status_code: int, response_time: float, status: str, 
                        details: str = "", request_data: Dict = None, 
-                       response_data: Dict = None):
+                       response_data: Dict = None, log_name: str = None):
         """Add API test result to report"""
         result = {
             "test_name": test_name,
@@ -161,7 +224,15 @@ class APITestReporter:
             "request_data": request_data or {},
             "response_data": response_data or {}
         }
+        if log_name:
+            # Key of the matching exchange in the request/response log segments
+            result["log_name"] = log_name
+        self.add_result(result)
+
+    def add_result(self, result: Dict):
+        """Add an already built result, e.g. one merged from a worker shard"""
         self.test_results.append(result)
+        self.aggregator.add(result)
         
     def generate_report(self):
         """Generate final API test report"""
@@ -169,25 +240,37 @@ class APITestReporter:
             report_dir = os.path.dirname(self.report_file)
             if not os.path.exists(report_dir):
                 os.makedirs(report_dir)
-            summary = {
-                "total_tests": len(self.test_results),
-                "passed": len([r for r in self.test_results if r["test_status"] == "PASS"]),
-                "failed": len([r for r in self.test_results if r["test_status"] == "FAIL"]),
-                "total_api_calls": len(self.test_results),
-                "avg_response_time": sum(r["response_time_ms"] for r in self.test_results) / len(self.test_results) if self.test_results else 0,
-                "execution_time": datetime.now().isoformat(),
-                "test_results": self.test_results
-            }
+            summary = self.aggregator.summary()
+            summary["execution_time"] = datetime.now().isoformat()
+            summary["test_results"] = self.test_results
+            if self.transport_stats:
+                summary["transport_stats"] = self.transport_stats
+            if self.load_test:
+                summary["load_test"] = self.load_test
+            if self.cassette_stats:
+                summary["cassette"] = self.cassette_stats
+            if self.cache_stats:
+                summary["http_cache"] = self.cache_stats
+            summary["results_file"] = self.results_file
             abs_path = os.path.abspath(self.report_file)
             print(f"[APITestReporter] Writing summary JSON to: {abs_path}")
-            with open(self.report_file, 'w') as f:
-                json.dump(summary, f, indent=2)
+            with open(self.report_file, 'w', encoding='utf-8') as f:
+                json_backend.dump(summary, f)
+            self.write_results_jsonl()
             return summary
         except Exception as e:
             print(f"[APITestReporter] ERROR writing report: {e}")
             raise
 
 
+    def write_results_jsonl(self):
+        """Write test results as JSON Lines to results_file"""
+        with open(self.results_file, 'w', encoding='utf-8') as f:
+            for result in self.test_results:
+                f.write(json_backend.dumps(result, pretty=False) + "\n")
+        return self.results_file
+
+
 class APIEndpoints:
     """API Endpoints for Automation Exercise"""
     BASE_URL = "https://automationexercise.com/api"
@@ -197,6 +280,7 @@ class APIEndpoints:
     CREATE_USER = "/createAccount"
     VERIFY_LOGIN = "/verifyLogin"
     DELETE_USER = "/deleteAccount"
+    UPDATE_USER = "/updateAccount"
     
     # Product Management
     GET_PRODUCTS_LIST = "/productsList"
@@ -208,70 +292,88 @@ class APIEndpoints:
         """Get full URL for an endpoint"""
         return cls.BASE_URL + endpoint
 
+    @classmethod
+    def route_of(cls, url: str) -> str:
+        """Route of a full URL relative to the API base, e.g. '/productsList'"""
+        path = urlparse(url).path or url
+        base_path = urlparse(cls.BASE_URL).path
+        if base_path and path.startswith(base_path):
+            path = path[len(base_path):]
+        return path or "/"
+
+
+# Response schemas per APIEndpoints route, compiled on first use
+PRODUCT_SCHEMA = {
+    "id": int,
+    "name": str,
+    "price": str,
+    "brand": str,
+    "category": {"usertype": {"usertype": str}, "category": str},
+}
+BRAND_SCHEMA = {"id": int, "brand": str}
+MESSAGE_SCHEMA = {"responseCode": int, "message": str}
+RESPONSE_SCHEMAS = {
+    APIEndpoints.GET_PRODUCTS_LIST: {"responseCode": int, "products": ListOf(PRODUCT_SCHEMA, min_items=1)},
+    APIEndpoints.GET_BRANDS_LIST: {"responseCode": int, "brands": ListOf(BRAND_SCHEMA)},
+    APIEndpoints.SEARCH_PRODUCT: {"responseCode": int, "products": ListOf(PRODUCT_SCHEMA)},
+    APIEndpoints.CREATE_USER: MESSAGE_SCHEMA,
+    APIEndpoints.UPDATE_USER: MESSAGE_SCHEMA,
+    APIEndpoints.DELETE_USER: MESSAGE_SCHEMA,
+    APIEndpoints.VERIFY_LOGIN: MESSAGE_SCHEMA,
+}
+_compiled_schemas: Dict[str, Schema] = {}
+
+
+def _search_text(value: str) -> str:
+    # 'T-Shirt' and 'tshirt' match each other
+    return "".join(ch for ch in value.lower() if ch.isalnum())
+
 
 class APITestValidator:
+    @staticmethod
+    def schema(endpoint: str) -> Schema:
+        """Compiled schema of an APIEndpoints route"""
+        schema = _compiled_schemas.get(endpoint)
+        if schema is None:
+            schema = _compiled_schemas[endpoint] = Schema(RESPONSE_SCHEMAS[endpoint])
+        return schema
+
+    @staticmethod
+    def violations(endpoint: str, response_data: Any) -> List[str]:
+        """Every schema violation of a response, as '<JSON path>: <problem>'"""
+        return APITestValidator.schema(endpoint).violations(response_data)
+
     @staticmethod
     def validate_user_creation_response(response_data: Dict) -> bool:
         """Validate user creation API response"""
-        required_fields = ["responseCode", "message"]
-        return APIResponseHandler.validate_response_structure(response_data, required_fields)
-    
+        return APITestValidator.schema(APIEndpoints.CREATE_USER).is_valid(response_data)
+
     @staticmethod
     def validate_products_list_response(response_data: Dict) -> bool:
-        """Validate products list API response"""
-        if "products" not in response_data:
-            return False
-        
-        # Check if products is a list and has items
-        products = response_data.get("products", [])
-        if not isinstance(products, list) or len(products) == 0:
-            return False
-            
-        # Validate first product structure
-        if products:
-            required_product_fields = ["id", "name", "price", "brand", "category"]
-            first_product = products[0]
-            for field in required_product_fields:
-                if field not in first_product:
-                    return False
-                    
-        return True
-    
+        """Validate products list API response: a non-empty list of well-formed products"""
+        return APITestValidator.schema(APIEndpoints.GET_PRODUCTS_LIST).is_valid(response_data)
+
+    @staticmethod
+    def search_violations(response_data: Any, search_term: str) -> List[str]:
+        """Schema violations plus products that do not mention the term in name, brand or category"""
+        violations = APITestValidator.violations(APIEndpoints.SEARCH_PRODUCT, response_data)
+        if violations:
+            return violations
+        term = _search_text(search_term)
+        for index, product in enumerate(response_data["products"]):
+            category = product["category"]
+            text = _search_text(" ".join((product["name"], product["brand"], category["category"],
+                                          category["usertype"]["usertype"])))
+            if term not in text:
+                violations.append(f"$.products[{index}]: does not match search term {search_term!r}")
+        return violations
+
     @staticmethod
     def validate_search_response(response_data: Dict, search_term: str) -> bool:
-        """Validate search API response"""
-        if "products" not in response_data:
-            return False
-            
-        products = response_data.get("products", [])
-        if not isinstance(products, list):
-            return False
-            
-        # Check if search results contain the search term
-        if products:
-            for product in products:
-                product_name = product.get("name", "").lower()
-                if search_term.lower() in product_name:
-                    return True
-                    
-        return True  # Empty results are also valid
-    
+        """Validate search API response; empty results are valid"""
+        return not APITestValidator.search_violations(response_data, search_term)
+
     @staticmethod
     def validate_brands_list_response(response_data: Dict) -> bool:
         """Validate brands list API response"""
-        if "brands" not in response_data:
-            return False
-            
-        brands = response_data.get("brands", [])
-        if not isinstance(brands, list):
-            return False
-            
-        # Validate brand structure
-        if brands:
-            required_brand_fields = ["id", "brand"]
-            first_brand = brands[0]
-            for field in required_brand_fields:
-                if field not in first_brand:
-                    return False
-                    
-        return True
+        return APITestValidator.schema(APIEndpoints.GET_BRANDS_LIST).is_valid(response_data)
@@ -0,0 +1,96 @@
+"""
+Asynchronous API client for running Automation Exercise API calls concurrently
+"""
+import asyncio
+from typing import Dict, Optional, Sequence
+
+import httpx
+import requests
+
+
+class APICall:
+    """A single API call scheduled through AsyncAPIClient"""
+    def __init__(self, name: str, method: str, url: str,
+                 data: Optional[Dict] = None, params: Optional[Dict] = None):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.data = data
+        self.params = params
+
+    def __repr__(self):
+        return f"APICall({self.name!r}, {self.method} {self.url})"
+
+
+class AsyncAPIClient:
+    """Runs independent calls concurrently over a pooled httpx.AsyncClient.
+
+    Calls inside a chain (e.g. create -> verify -> delete) run one after
+    another, while the chain itself runs alongside the independent calls.
+
+    With a ``transport`` (http_transport.SharedTransport) the calls go
+    through its sessions on worker threads instead, so they share its
+    connection pool, cassette, response cache and counters, and return
+    requests.Response objects.
+    """
+    # Errors that break a chain: httpx's own, or any requests error raised through a transport
+    ERRORS = (httpx.HTTPError, requests.RequestException)
+
+    def __init__(self, concurrency: int = 10, max_connections: int = 20,
+                 max_keepalive_connections: int = 10, timeout: float = 30.0,
+                 headers: Optional[Dict] = None, transport=None):
+        self.concurrency = concurrency
+        self.transport = transport
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.timeout = timeout
+        self.headers = headers or {'User-Agent': 'API-Test-Suite/1.0'}
+
+    async def _send(self, client: Optional[httpx.AsyncClient], semaphore: asyncio.Semaphore, call: APICall):
+        async with semaphore:
+            if client is None:
+                # One session per call: sessions are not thread-safe, the transport's pool is
+                session = self.transport.new_session(self.headers)
+                return await asyncio.to_thread(session.request, call.method, call.url, data=call.data,
+                                               params=call.params, timeout=self.timeout)
+            return await client.request(call.method, call.url, data=call.data, params=call.params)
+
+    async def _run_chain(self, client, semaphore, chain: Sequence[APICall], results: Dict):
+        for call in chain:
+            try:
+                results[call.name] = await self._send(client, semaphore, call)
+            except self.ERRORS as e:
+                # A broken link in the chain fails every call after it
+                for remaining in chain[chain.index(call):]:
+                    results[remaining.name] = e
+                return
+
+    async def run_plan(self, independent: Sequence[APICall],
+                       chains: Sequence[Sequence[APICall]] = ()) -> Dict[str, object]:
+        """Execute a plan and return name -> response (or the raised exception)"""
+        if self.transport is not None:
+            return await self._gather(None, independent, chains)
+        async with httpx.AsyncClient(limits=self.limits, timeout=self.timeout, headers=self.headers) as client:
+            return await self._gather(client, independent, chains)
+
+    async def _gather(self, client, independent: Sequence[APICall], chains: Sequence[Sequence[APICall]]):
+        results: Dict[str, object] = {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        calls = list(independent)
+        outcomes = asyncio.gather(
+            *(self._send(client, semaphore, call) for call in calls),
+            return_exceptions=True,
+        )
+        chain_runs = asyncio.gather(*(self._run_chain(client, semaphore, chain, results) for chain in chains))
+        responses, _ = await asyncio.gather(outcomes, chain_runs)
+        for call, response in zip(calls, responses):
+            results[call.name] = response
+        return results
+
+    def run(self, independent: Sequence[APICall],
+            chains: Sequence[Sequence[APICall]] = ()) -> Dict[str, object]:
+        """Blocking wrapper around run_plan for use from sync tests and fixtures"""
+        return asyncio.run(self.run_plan(independent, chains))
+
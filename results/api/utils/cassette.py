@@ -0,0 +1,242 @@
+"""
+Record-and-replay cassettes for the shared API transport
+
+A cassette is a directory of JSON Lines segments, one per recording
+process, holding one exchange per line: method, URL, normalized body,
+response status, headers and body, and the live response time. Loading
+builds an in-memory index from a request key (method, route with sorted
+query, normalized body) to the recorded responses, so replaying is one
+dict lookup with no network. Requests with the same key replay their
+recordings in order (e.g. a login before and after account creation) and
+then keep returning the last one.
+
+Endpoints whose side effects matter (account creation, update and
+deletion by default) always go to the live server.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from . import json_backend
+from .api_test_utils import APIEndpoints
+
+
+CASSETTES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cassettes")
+MODES = ("off", "record", "replay", "once")
+# Routes that must reach the live server in every mode
+DEFAULT_LIVE_ROUTES = (APIEndpoints.CREATE_USER, APIEndpoints.UPDATE_USER, APIEndpoints.DELETE_USER)
+# Response headers that only describe the original connection
+CONNECTION_HEADERS = {"content-encoding", "transfer-encoding", "connection", "keep-alive", "content-length"}
+
+
+class CassetteMiss(requests.ConnectionError):
+    """No recording for a request in replay mode"""
+
+
+def _normalize_url(url: str) -> str:
+    """Route and sorted query; the host is left out so live and stand-in recordings are interchangeable"""
+    query = urlencode(sorted(parse_qsl(urlparse(url).query, keep_blank_values=True)))
+    return f"{APIEndpoints.route_of(url)}?{query}" if query else APIEndpoints.route_of(url)
+
+
+def normalize_body(body, content_type: str = "") -> str:
+    """Canonical request body: sorted form fields or sorted-key JSON, else the raw text"""
+    if body is None:
+        return ""
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    if "json" in content_type:
+        try:
+            return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"))
+        except ValueError:
+            return body
+    if "x-www-form-urlencoded" in content_type:
+        return urlencode(sorted(parse_qsl(body, keep_blank_values=True)))
+    return body
+
+
+def request_key(method: str, url: str, body: str) -> str:
+    return hashlib.sha256(f"{method.upper()} {_normalize_url(url)}\n{body}".encode("utf-8")).hexdigest()
+
+
+def stored_entry(response: requests.Response) -> Dict:
+    """Status, reason, headers and body of a live response, in the form stored_response() reads"""
+    return {
+        "status": response.status_code,
+        "reason": response.reason,
+        "headers": {k: v for k, v in response.headers.items() if k.lower() not in CONNECTION_HEADERS},
+        "content": response.content.decode("utf-8", errors="replace"),
+    }
+
+
+def stored_response(request, entry: Dict, connection) -> requests.Response:
+    """requests.Response rebuilt from a stored entry, as if ``connection`` had received it"""
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.reason = entry.get("reason")
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response._content = entry["content"].encode("utf-8")
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = request.url
+    response.request = request
+    response.connection = connection
+    return response
+
+
+class CassetteStats:
+    """Thread-safe replay counters"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self.live = 0
+
+    def record(self, hits: int = 0, misses: int = 0, recorded: int = 0, live: int = 0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.recorded += recorded
+            self.live += live
+
+    def as_dict(self) -> Dict:
+        """Counters as stored in the API summary JSON"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "recorded": self.recorded, "live": self.live,
+                    "hit_rate": (self.hits / lookups * 100) if lookups else 0}
+
+
+def merge_cassette_stats(stats_dicts: List[Dict]) -> Dict:
+    """Sum CassetteStats.as_dict() counters from several processes"""
+    merged = {"hits": 0, "misses": 0, "recorded": 0, "live": 0}
+    for stats in stats_dicts:
+        for key in merged:
+            merged[key] += stats.get(key, 0)
+    lookups = merged["hits"] + merged["misses"]
+    merged["hit_rate"] = (merged["hits"] / lookups * 100) if lookups else 0
+    return merged
+
+
+class Cassette:
+    """Indexed recordings of one cassette directory.
+
+    ``mode`` is 'record' (always live, every exchange recorded), 'replay'
+    (recordings only; a miss raises CassetteMiss) or 'once' (replay what
+    is recorded, record the rest).
+    """
+    def __init__(self, directory: str, mode: str = "replay", live_routes: Iterable[str] = DEFAULT_LIVE_ROUTES,
+                 segment_name: str = "main"):
+        if mode not in MODES[1:]:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.live_routes = set(live_routes)
+        self.stats = CassetteStats()
+        self._lock = threading.Lock()
+        self._index: Dict[str, List[Dict]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._segment_path = os.path.join(
+            directory, f"{segment_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.jsonl")
+        self._segment = None
+        if mode != "record":
+            self.load()
+
+    def load(self):
+        """Index every segment of the directory; later recordings of a key follow earlier ones"""
+        if not os.path.isdir(self.directory):
+            return
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".jsonl"):
+                continue
+            with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json_backend.loads(line)
+                        self._index.setdefault(entry["key"], []).append(entry)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._index.values())
+
+    def is_live(self, url: str) -> bool:
+        return APIEndpoints.route_of(url) in self.live_routes
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """Next recording for the key, or None"""
+        with self._lock:
+            entries = self._index.get(key)
+            if not entries:
+                return None
+            position = self._cursors.get(key, 0)
+            self._cursors[key] = position + 1
+            return entries[min(position, len(entries) - 1)]
+
+    def append(self, entry: Dict):
+        line = json_backend.dumps(entry, pretty=False) + "\n"
+        with self._lock:
+            if self._segment is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._segment = open(self._segment_path, 'a', encoding='utf-8')
+            self._segment.write(line)
+            self._segment.flush()
+            self._index.setdefault(entry["key"], []).append(entry)
+            # Replaying in this process continues after what it has just recorded
+            self._cursors[entry["key"]] = len(self._index[entry["key"]])
+
+    def close(self):
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+
+
+class CassetteAdapter(BaseAdapter):
+    """Transport adapter that answers from a cassette and hands everything else to ``live_adapter``"""
+    def __init__(self, cassette: Cassette, live_adapter):
+        super().__init__()
+        self.cassette = cassette
+        self.live_adapter = live_adapter
+
+    def send(self, request, **kwargs):
+        cassette = self.cassette
+        if cassette.is_live(request.url):
+            cassette.stats.record(live=1)
+            return self.live_adapter.send(request, **kwargs)
+        body = normalize_body(request.body, request.headers.get("Content-Type", ""))
+        key = request_key(request.method, request.url, body)
+        if cassette.mode != "record":
+            entry = cassette.lookup(key)
+            if entry is not None:
+                cassette.stats.record(hits=1)
+                return self._build_response(request, entry)
+            cassette.stats.record(misses=1)
+            if cassette.mode == "replay":
+                raise CassetteMiss(f"No cassette recording for {request.method} {request.url}", request=request)
+        start = time.perf_counter()
+        response = self.live_adapter.send(request, **kwargs)
+        entry = stored_entry(response)
+        cassette.append(dict(
+            entry, key=key, method=request.method, url=request.url, body=body,
+            elapsed_ms=round((time.perf_counter() - start) * 1000, 3), recorded_at=datetime.now().isoformat(),
+        ))
+        cassette.stats.record(recorded=1)
+        return response
+
+    def _build_response(self, request, entry: Dict) -> requests.Response:
+        response = stored_response(request, entry, self)
+        # Live response time of the recording; Session.send sets elapsed to the replay time
+        response.recorded_elapsed_ms = entry.get("elapsed_ms")
+        return response
+
+    def close(self):
+        """Pools belong to the live adapter, which outlives the sessions"""
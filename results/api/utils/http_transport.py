@@ -0,0 +1,152 @@
+"""
+Shared pooled HTTP transport for the API test sessions
+"""
+import threading
+import time
+from typing import Dict, List
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+
+class TransportStats:
+    """Thread-safe connection counters for a SharedTransport"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.pool_waits = 0
+        self.pool_wait_ms = 0.0
+
+    def record(self, opened: int = 0, reused: int = 0, waits: int = 0, wait_ms: float = 0.0):
+        with self._lock:
+            self.connections_opened += opened
+            self.connections_reused += reused
+            self.pool_waits += waits
+            self.pool_wait_ms += wait_ms
+
+    def as_dict(self) -> Dict:
+        """Counters as stored in the API summary JSON"""
+        with self._lock:
+            acquired = self.connections_opened + self.connections_reused
+            return {
+                "connections_opened": self.connections_opened,
+                "connections_reused": self.connections_reused,
+                "reuse_rate": (self.connections_reused / acquired * 100) if acquired else 0,
+                "pool_waits": self.pool_waits,
+                "pool_wait_ms": round(self.pool_wait_ms, 3),
+            }
+
+
+def merge_transport_stats(stats_dicts: List[Dict]) -> Dict:
+    """Sum TransportStats.as_dict() counters from several processes"""
+    merged = {"connections_opened": 0, "connections_reused": 0, "pool_waits": 0, "pool_wait_ms": 0.0}
+    for stats in stats_dicts:
+        for key in merged:
+            merged[key] += stats.get(key, 0)
+    acquired = merged["connections_opened"] + merged["connections_reused"]
+    merged["reuse_rate"] = (merged["connections_reused"] / acquired * 100) if acquired else 0
+    merged["pool_wait_ms"] = round(merged["pool_wait_ms"], 3)
+    return merged
+
+
+def _counting_pool_class(base, stats: TransportStats):
+    """Subclass a urllib3 pool class so every connection checkout is counted"""
+    class CountingConnectionPool(base):
+        def _new_conn(self):
+            conn = super()._new_conn()
+            conn._transport_fresh = True
+            stats.record(opened=1)
+            return conn
+
+        def _get_conn(self, timeout=None):
+            pool = self.pool
+            # A non-blocking pool opens an extra connection instead of waiting when it is empty
+            waited = self.block and pool is not None and pool.empty()
+            start = time.perf_counter()
+            conn = super()._get_conn(timeout)
+            if waited:
+                stats.record(waits=1, wait_ms=(time.perf_counter() - start) * 1000)
+            if getattr(conn, "_transport_fresh", False):
+                conn._transport_fresh = False
+            else:
+                stats.record(reused=1)
+            return conn
+
+    return CountingConnectionPool
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report into TransportStats"""
+    def __init__(self, stats: TransportStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool_class(HTTPConnectionPool, self.stats),
+            "https": _counting_pool_class(HTTPSConnectionPool, self.stats),
+        }
+
+    def close(self):
+        """Sessions sharing this adapter must not tear down the shared pools"""
+
+    def close_pools(self):
+        super().close()
+
+
+class SharedTransport:
+    """One pooled transport shared by every requests.Session in the API suite.
+
+    ``pool_maxsize`` is the per-host connection limit; with ``pool_block`` set,
+    callers wait for a free connection instead of opening extra ones.
+    """
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = False,
+                 max_retries: int = 3, backoff_factor: float = 0.3, keep_alive: bool = True, cassette=None,
+                 cache=None):
+        self.keep_alive = keep_alive
+        # Optional cassette.Cassette answering recorded calls without the network
+        self.cassette = cassette
+        # Optional response_cache.ResponseCache in front of everything else
+        self.cache = cache
+        self.stats = TransportStats()
+        retries = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            raise_on_status=False,
+        )
+        self.adapter = PooledHTTPAdapter(
+            self.stats,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=retries,
+        )
+
+    def new_session(self, headers: Dict = None) -> requests.Session:
+        """Create a session with its own cookies that borrows connections from the shared pool"""
+        session = requests.Session()
+        adapter = self.adapter
+        if self.cassette is not None:
+            from .cassette import CassetteAdapter
+            adapter = CassetteAdapter(self.cassette, self.adapter)
+        if self.cache is not None:
+            from .response_cache import CachingAdapter
+            adapter = CachingAdapter(self.cache, adapter)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+        if headers:
+            session.headers.update(headers)
+        return session
+
+    def close(self):
+        """Close every pooled connection and the cassette segment being recorded"""
+        self.adapter.close_pools()
+        if self.cassette is not None:
+            self.cassette.close()
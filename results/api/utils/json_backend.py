@@ -0,0 +1,105 @@
+"""
+Pluggable JSON backend for the API suite
+
+Response bodies, summary JSON, result and exchange logs, shards and the
+HTML report data go through loads()/dumps() here. These use orjson, or
+ujson when only that is installed, and the standard library otherwise.
+Output is compact unless pretty printing is asked for, per call or for the
+whole run (--api-json-pretty). A value a fast backend refuses (e.g. an
+integer over 64 bits) is serialized by the standard library instead.
+"""
+import json
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+BACKENDS = ("auto", "orjson", "ujson", "json")
+
+_backend = "json"
+_pretty = False
+
+
+def configure(backend: str = "auto", pretty: bool = False):
+    """Select the backend ('auto' picks the fastest installed one) and the default output style"""
+    global _backend, _pretty
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {backend}")
+    if backend == "auto":
+        backend = "orjson" if orjson is not None else "ujson" if ujson is not None else "json"
+    elif backend == "orjson" and orjson is None:
+        raise ImportError("The orjson JSON backend requires the 'orjson' package")
+    elif backend == "ujson" and ujson is None:
+        raise ImportError("The ujson JSON backend requires the 'ujson' package")
+    _backend = backend
+    _pretty = pretty
+
+
+def backend() -> str:
+    return _backend
+
+
+def loads(data):
+    """Parse a str or bytes JSON document"""
+    if _backend == "orjson":
+        return orjson.loads(data)
+    if _backend == "ujson":
+        return ujson.loads(data)
+    return json.loads(data)
+
+
+def _stdlib_dumps(obj: Any, pretty: bool, sort_keys: bool, default: Optional[Callable]) -> str:
+    if pretty:
+        return json.dumps(obj, indent=2, sort_keys=sort_keys, default=default, ensure_ascii=False)
+    return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys, default=default, ensure_ascii=False)
+
+
+def dumps(obj: Any, pretty: Optional[bool] = None, sort_keys: bool = False,
+          default: Optional[Callable] = str) -> str:
+    """Serialize to str; compact unless ``pretty`` (default: the configured run-wide style)"""
+    if pretty is None:
+        pretty = _pretty
+    if _backend == "orjson":
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=default, option=option).decode("utf-8")
+        except TypeError:
+            pass
+    elif _backend == "ujson":
+        try:
+            return ujson.dumps(obj, indent=2 if pretty else 0, sort_keys=sort_keys, default=default,
+                               ensure_ascii=False, escape_forward_slashes=False)
+        except (TypeError, OverflowError):
+            pass
+    return _stdlib_dumps(obj, pretty, sort_keys, default)
+
+
+def load(f):
+    """Parse an open text or binary file"""
+    return loads(f.read())
+
+
+def dump(obj: Any, f, pretty: Optional[bool] = None, sort_keys: bool = False,
+         default: Optional[Callable] = str):
+    """Serialize into an open text file"""
+    f.write(dumps(obj, pretty=pretty, sort_keys=sort_keys, default=default))
+
+
+def response_json(response):
+    """Body of a requests or httpx response, parsed from the raw bytes"""
+    return loads(response.content)
+
+
+configure()
@@ -0,0 +1,173 @@
+"""
+Compiled dot-notation paths into decoded JSON responses
+
+    brands.0.brand                         key, then list index (negative counts from the end)
+    products.*.category.usertype.usertype  '*' matches every list element or object value
+    products[3].name, products[*].price    bracket form of the same segments
+
+A path is parsed once (compile_path is memoized) into a tuple of segments;
+a malformed one (empty, empty segment, unbalanced brackets) raises ValueError.
+Without a wildcard get() returns the value or None; with one it returns the
+list of every matched value. A PathSet merges many paths into a prefix tree
+and generates one function of nested ifs and for loops from it, so
+extracting the name, price and category of every product walks the
+products array once instead of once per path.
+"""
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+WILDCARD = "*"
+_BRACKETS = re.compile(r"\[([^\]]*)\]")
+_MISSING = object()
+
+# (key, list index or None); the key alone is used on objects
+Segment = Tuple[str, Optional[int]]
+
+
+def _parse(path: str) -> Tuple[Segment, ...]:
+    dotted = _BRACKETS.sub(r".\1", path)
+    if path.startswith("["):
+        # '[0].name' indexes the top-level list
+        dotted = dotted[1:]
+    segments = []
+    for part in dotted.split("."):
+        if not part or "[" in part or "]" in part:
+            raise ValueError(f"Malformed JSON path: {path!r}")
+        try:
+            index = int(part)
+        except ValueError:
+            index = None
+        segments.append((part, index))
+    return tuple(segments)
+
+
+def _step(value: Any, segment: Segment) -> Any:
+    key, index = segment
+    if type(value) is dict:
+        return value.get(key, _MISSING)
+    if type(value) is list and index is not None:
+        try:
+            return value[index]
+        except IndexError:
+            return _MISSING
+    return _MISSING
+
+
+class _Node:
+    __slots__ = ("steps", "wildcard", "ends")
+
+    def __init__(self):
+        self.steps: Dict[Segment, "_Node"] = {}
+        self.wildcard: Optional["_Node"] = None
+        # Paths that end at this node
+        self.ends: List["JSONPath"] = []
+
+
+class JSONPath:
+    """A parsed path; use compile_path() to get the memoized instance"""
+    def __init__(self, path: str):
+        self.path = path
+        self.segments = _parse(path)
+        self.has_wildcard = any(key == WILDCARD for key, _ in self.segments)
+        self._tree = PathSet((self,)) if self.has_wildcard else None
+
+    def __repr__(self):
+        return f"JSONPath({self.path!r})"
+
+    def get(self, data: Any, default: Any = None) -> Any:
+        """Value at the path (``default`` if absent), or the list of matches for a wildcard path"""
+        if self._tree is not None:
+            return self._tree.extract(data)[self.path]
+        value = data
+        for segment in self.segments:
+            value = _step(value, segment)
+            if value is _MISSING:
+                return default
+        return value
+
+
+@lru_cache(maxsize=1024)
+def compile_path(path: str) -> JSONPath:
+    return JSONPath(path)
+
+
+class PathSet:
+    """Several paths extracted together in one traversal of the data"""
+    def __init__(self, paths: Iterable):
+        compiled = (path if isinstance(path, JSONPath) else compile_path(path) for path in paths)
+        self.paths = list(dict.fromkeys(compiled))
+        self._root = _Node()
+        for path in self.paths:
+            node = self._root
+            for segment in path.segments:
+                if segment[0] == WILDCARD:
+                    node.wildcard = node.wildcard or _Node()
+                    node = node.wildcard
+                else:
+                    node = node.steps.setdefault(segment, _Node())
+            node.ends.append(path)
+        self._extract = _Compiler(self.paths).compile(self._root)
+
+    def extract(self, data: Any) -> Dict[str, Any]:
+        """path -> value (None if absent), or the list of matches for wildcard paths"""
+        return self._extract(data)
+
+
+class _Compiler:
+    """Turns a path tree into one generated function with nested ifs and for loops"""
+    def __init__(self, paths: List[JSONPath]):
+        self.paths = paths
+        self.namespace: Dict[str, Any] = {"_MISSING": _MISSING, "_step": _step, "type": type,
+                                          "dict": dict, "list": list}
+        self.lines: List[str] = []
+        self._names = 0
+
+    def _name(self, prefix: str) -> str:
+        self._names += 1
+        return f"{prefix}{self._names}"
+
+    def _result(self, path: JSONPath) -> str:
+        return f"_r{self.paths.index(path)}"
+
+    def _emit(self, depth: int, line: str):
+        self.lines.append("    " * depth + line)
+
+    def _node(self, node: _Node, var: str, depth: int):
+        for path in node.ends:
+            if path.has_wildcard:
+                self._emit(depth, f"{self._result(path)}.append({var})")
+            else:
+                self._emit(depth, f"{self._result(path)} = {var}")
+        for segment, child in node.steps.items():
+            target = self._name("_v")
+            key, index = segment
+            if index is None:
+                self._emit(depth, f"{target} = {var}.get({key!r}, _MISSING) if type({var}) is dict else _MISSING")
+            else:
+                constant = self._name("_s")
+                self.namespace[constant] = segment
+                self._emit(depth, f"{target} = _step({var}, {constant})")
+            self._emit(depth, f"if {target} is not _MISSING:")
+            self._node(child, target, depth + 1)
+        if node.wildcard is not None:
+            item = self._name("_i")
+            self._emit(depth, f"for {item} in ({var} if type({var}) is list else {var}.values() "
+                              f"if type({var}) is dict else ()):")
+            self._node(node.wildcard, item, depth + 1)
+
+    def compile(self, root: _Node):
+        self._emit(0, "def extract(data):")
+        for path in self.paths:
+            self._emit(1, f"{self._result(path)} = {'[]' if path.has_wildcard else 'None'}")
+        self._node(root, "data", 1)
+        results = ", ".join(f"{path.path!r}: {self._result(path)}" for path in self.paths)
+        self._emit(1, f"return {{{results}}}")
+        exec(compile("\n".join(self.lines) + "\n", "<json path>", "exec"), self.namespace)
+        return self.namespace["extract"]
+
+
+@lru_cache(maxsize=256)
+def compile_paths(paths: Tuple[str, ...]) -> PathSet:
+    return PathSet(paths)
@@ -0,0 +1,178 @@
+"""
+Streaming latency statistics for API test results
+
+QuantileSketch keeps counts in logarithmic buckets so any percentile can be
+read back within a fixed relative error, using memory that depends on the
+range of values rather than on how many were added. HdrHistogram does the
+same for integer load-test latencies with a fixed number of significant
+digits.
+"""
+import math
+from typing import Dict, Iterable
+
+
+# Values at or below this (in ms) are counted in the zero bucket
+MIN_TRACKED_VALUE = 1e-3
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch (DDSketch-style) with bounded relative error"""
+    def __init__(self, relative_accuracy: float = 0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float):
+        self.count += 1
+        if value <= MIN_TRACKED_VALUE:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def quantile(self, q: float) -> float:
+        """Approximate value at quantile ``q`` (0..1); 0 when empty"""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Midpoint of the bucket (gamma^(i-1), gamma^i] in relative terms
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def merge(self, other: "QuantileSketch"):
+        """Fold another sketch with the same accuracy into this one"""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+
+class LatencyStats:
+    """Running count, mean, min, max and percentiles of response times in ms"""
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.sketch.add(value)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Approximate p-th percentile (0..100); min and max are exact"""
+        if self.count == 0:
+            return 0.0
+        if p <= 0:
+            return self.min
+        if p >= 100:
+            return self.max
+        return min(max(self.sketch.quantile(p / 100), self.min), self.max)
+
+    def merge(self, other: "LatencyStats"):
+        if other.count == 0:
+            return
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    def as_dict(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict:
+        """Statistics as stored in the API summary JSON"""
+        stats = {
+            "count": self.count,
+            "mean_ms": round(self.mean, 3),
+            "min_ms": round(self.min or 0, 3),
+            "max_ms": round(self.max or 0, 3),
+        }
+        for p in percentiles:
+            stats[f"p{p:g}_ms"] = round(self.percentile(p), 3)
+        return stats
+
+
+class HdrHistogram:
+    """HDR-style histogram of integer values (e.g. microseconds).
+
+    Values are grouped into power-of-two ranges, each split into linear
+    sub-buckets, so every recorded value is kept to ``significant_digits``
+    decimal digits of precision across the whole range.
+    """
+    def __init__(self, significant_digits: int = 3):
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits must be between 1 and 5")
+        self.significant_digits = significant_digits
+        self._sub_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _key(self, value: int) -> int:
+        shift = max(0, value.bit_length() - self._sub_bits)
+        return (shift << self._sub_bits) | (value >> shift)
+
+    def _bucket_value(self, key: int) -> int:
+        """Midpoint of the range of values stored under ``key``"""
+        shift = key >> self._sub_bits
+        sub = key & ((1 << self._sub_bits) - 1)
+        return (sub << shift) + ((1 << shift) >> 1)
+
+    def record(self, value: int, count: int = 1):
+        value = max(0, int(value))
+        key = self._key(value)
+        self.counts[key] = self.counts.get(key, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def value_at_percentile(self, p: float) -> int:
+        """Approximate value at or below which p percent (0..100) of recorded values fall"""
+        if self.count == 0:
+            return 0
+        target = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= target:
+                return min(max(self._bucket_value(key), self.min), self.max)
+        return self.max
+
+    def merge(self, other: "HdrHistogram"):
+        if other.significant_digits != self.significant_digits:
+            raise ValueError("Cannot merge histograms with different precision")
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
@@ -0,0 +1,194 @@
+"""
+Load generation for the Automation Exercise API endpoints
+
+Requests are sent open-loop on a schedule derived from a LoadProfile, so a
+slow server cannot lower the offered rate. Latency is measured from each
+request's scheduled send time and recorded in an HdrHistogram per route.
+"""
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from . import json_backend
+from .api_test_utils import APIEndpoints, APIResponseHandler, APITestDataGenerator, APITestValidator
+from .latency_stats import HdrHistogram
+
+
+LOAD_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LoadProfile:
+    """Offered request rate over time as stages of (duration_s, start_rps, end_rps)"""
+    def __init__(self, name: str, stages: Sequence[Tuple[float, float, float]]):
+        self.name = name
+        self.stages = list(stages)
+
+    @classmethod
+    def steady(cls, rps: float, duration: float) -> "LoadProfile":
+        return cls("steady", [(duration, rps, rps)])
+
+    @classmethod
+    def ramp(cls, rps: float, duration: float) -> "LoadProfile":
+        """Linear ramp from 10% to 100% of ``rps``"""
+        return cls("ramp", [(duration, rps * 0.1, rps)])
+
+    @classmethod
+    def spike(cls, rps: float, duration: float) -> "LoadProfile":
+        """Baseline at 20% of ``rps`` with a burst at full rate in the middle fifth"""
+        base = rps * 0.2
+        return cls("spike", [(duration * 0.4, base, base), (duration * 0.2, rps, rps),
+                             (duration * 0.4, base, base)])
+
+    @classmethod
+    def named(cls, name: str, rps: float, duration: float) -> "LoadProfile":
+        builders = {"steady": cls.steady, "ramp": cls.ramp, "spike": cls.spike}
+        if name not in builders:
+            raise ValueError(f"Unknown load profile: {name}")
+        return builders[name](rps, duration)
+
+    @property
+    def duration(self) -> float:
+        return sum(stage[0] for stage in self.stages)
+
+    def send_offsets(self) -> List[float]:
+        """Seconds from the start of the run at which each request is due"""
+        offsets = []
+        stage_start = 0.0
+        for duration, start_rps, end_rps in self.stages:
+            t = 0.0
+            while t < duration:
+                rate = start_rps + (end_rps - start_rps) * t / duration
+                if rate <= 0:
+                    break
+                offsets.append(stage_start + t)
+                t += 1.0 / rate
+            stage_start += duration
+        return offsets
+
+    def as_dict(self) -> Dict:
+        return {"name": self.name, "duration_s": round(self.duration, 3),
+                "stages": [{"duration_s": round(d, 3), "start_rps": round(a, 3), "end_rps": round(b, 3)}
+                           for d, a, b in self.stages]}
+
+
+class LoadScenario:
+    """One endpoint call of the load mix and the validator applied to its response"""
+    def __init__(self, name: str, method: str, endpoint: str,
+                 data: Optional[Callable[[int], Dict]] = None,
+                 validate: Optional[Callable[[Dict, Dict], bool]] = None):
+        self.name = name
+        self.method = method
+        self.endpoint = endpoint
+        self.data = data
+        self.validate = validate
+
+
+def default_scenarios() -> List[LoadScenario]:
+    """productsList, searchProduct and verifyLogin checked with the suite's validators"""
+    terms = APITestDataGenerator.generate_search_terms()
+    return [
+        LoadScenario("productsList", "GET", APIEndpoints.GET_PRODUCTS_LIST,
+                     validate=lambda body, data: APITestValidator.validate_products_list_response(body)),
+        LoadScenario("searchProduct", "POST", APIEndpoints.SEARCH_PRODUCT,
+                     data=lambda i: {"search_product": terms[i % len(terms)]},
+                     validate=lambda body, data: APITestValidator.validate_search_response(
+                         body, data["search_product"])),
+        LoadScenario("verifyLogin", "POST", APIEndpoints.VERIFY_LOGIN,
+                     data=lambda i: {"email": f"load{i}@example.com", "password": "wrongpassword"},
+                     validate=lambda body, data: APIResponseHandler.validate_response_structure(
+                         body, ["responseCode", "message"])),
+    ]
+
+
+class EndpointLoadStats:
+    """Latency histogram (microseconds) and outcome counts for one route"""
+    def __init__(self):
+        self.histogram = HdrHistogram()
+        self.errors = 0
+        self.invalid = 0
+
+    def as_dict(self) -> Dict:
+        h = self.histogram
+        stats = {
+            "requests": h.count,
+            "errors": self.errors,
+            "invalid": self.invalid,
+            "mean_ms": round(h.mean / 1000, 3),
+            "max_ms": round((h.max or 0) / 1000, 3),
+        }
+        for p in LOAD_PERCENTILES:
+            stats[f"p{p:g}_ms"] = round(h.value_at_percentile(p) / 1000, 3)
+        return stats
+
+
+class LoadGenerator:
+    """Drives a LoadProfile against ``base_url`` with at most ``concurrency`` requests in flight"""
+    def __init__(self, base_url: str, profile: LoadProfile, concurrency: int = 50,
+                 scenarios: Optional[Sequence[LoadScenario]] = None, timeout: float = 30.0):
+        self.base_url = base_url
+        self.profile = profile
+        self.concurrency = concurrency
+        self.scenarios = list(scenarios or default_scenarios())
+        self.timeout = timeout
+        self.stats: Dict[str, EndpointLoadStats] = {s.name: EndpointLoadStats() for s in self.scenarios}
+        self.total = EndpointLoadStats()
+        self.elapsed = 0.0
+
+    async def _fire(self, client, semaphore, scenario: LoadScenario, index: int, due: float):
+        data = scenario.data(index) if scenario.data else None
+        stats = self.stats[scenario.name]
+        ok = valid = False
+        async with semaphore:
+            try:
+                response = await client.request(scenario.method, self.base_url + scenario.endpoint, data=data)
+                ok = response.status_code == 200
+                if ok and scenario.validate:
+                    valid = scenario.validate(json_backend.response_json(response), data)
+                else:
+                    valid = ok
+            except (httpx.HTTPError, ValueError):
+                ok = False
+        # Measured from the scheduled send time so queueing delay is not hidden
+        latency_us = (time.perf_counter() - due) * 1_000_000
+        for target in (stats, self.total):
+            target.histogram.record(latency_us)
+            if not ok:
+                target.errors += 1
+            elif not valid:
+                target.invalid += 1
+
+    async def run_async(self) -> Dict:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout) as client:
+            start = time.perf_counter()
+            tasks = []
+            for index, offset in enumerate(self.profile.send_offsets()):
+                due = start + offset
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                scenario = self.scenarios[index % len(self.scenarios)]
+                tasks.append(asyncio.create_task(self._fire(client, semaphore, scenario, index, due)))
+            await asyncio.gather(*tasks)
+            self.elapsed = time.perf_counter() - start
+        return self.result()
+
+    def run(self) -> Dict:
+        """Blocking wrapper around run_async"""
+        return asyncio.run(self.run_async())
+
+    def result(self) -> Dict:
+        """Load test outcome as stored under "load_test" in the API summary JSON"""
+        total = self.total.as_dict()
+        return {
+            "target": self.base_url,
+            "profile": self.profile.as_dict(),
+            "concurrency": self.concurrency,
+            "elapsed_s": round(self.elapsed, 3),
+            "throughput_rps": round(total["requests"] / self.elapsed, 2) if self.elapsed else 0,
+            "total": total,
+            "endpoints": {name: stats.as_dict() for name, stats in self.stats.items()},
+        }
@@ -0,0 +1,242 @@
+"""
+Batched background writer and reader for API request/response logs
+
+Records are appended as compact JSON Lines to rotating segment files
+(optionally gzip or zstd compressed) by a single writer thread, so the
+test thread only pays for putting a dict on a queue.
+"""
+import atexit
+import glob
+import gzip
+import io
+import os
+import queue
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from . import json_backend
+
+
+SEGMENT_PREFIX = "reqres"
+COMPRESSION_SUFFIXES = {None: ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+# Defaults applied to writers created by get_log_writer (set from conftest options)
+_writer_defaults: Dict = {}
+_writers: Dict[str, "RequestResponseLogWriter"] = {}
+_writers_lock = threading.Lock()
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd compression requires the 'zstandard' package") from e
+    return zstandard
+
+
+def _open_segment(path: str, compression: Optional[str]):
+    """Open a segment for binary writing with the requested compression"""
+    if compression is None:
+        return open(path, 'ab')
+    if compression == "gzip":
+        return gzip.open(path, 'ab')
+    if compression == "zstd":
+        return _zstandard().ZstdCompressor().stream_writer(open(path, 'ab'), closefd=True)
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def _read_segment(path: str) -> io.TextIOBase:
+    """Open a segment for text reading, detecting compression from the suffix"""
+    if path.endswith(".gz"):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if path.endswith(".zst"):
+        return io.TextIOWrapper(_zstandard().ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True),
+                                encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+class RequestResponseLogWriter:
+    """Appends request/response records to rotating JSON Lines segments from a background thread.
+
+    If a write fails, the thread keeps draining the queue without writing
+    and the error is raised from the next write(), flush() or close().
+    """
+    def __init__(self, log_dir: str = "request_response_logs", compression: Optional[str] = None,
+                 max_segment_bytes: int = 16 * 1024 * 1024, batch_size: int = 256, run_id: Optional[str] = None):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.log_dir = log_dir
+        self.compression = compression
+        self.max_segment_bytes = max_segment_bytes
+        self.batch_size = batch_size
+        # Shared by the controller and its xdist workers so a report reads only this run's segments
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        worker = os.environ.get("PYTEST_XDIST_WORKER")
+        if worker:
+            # Parallel workers start in the same second; keep their segments apart
+            self.run_id += f"_{worker}"
+        self.records_written = 0
+        self._segment_index = 0
+        self._segment_bytes = 0
+        self._segment = None
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        os.makedirs(log_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="reqres-log-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def segment_path(self) -> str:
+        """Path of the segment currently being written"""
+        suffix = COMPRESSION_SUFFIXES[self.compression]
+        name = f"{SEGMENT_PREFIX}_{self.run_id}_{self._segment_index:04d}{suffix}"
+        return os.path.join(self.log_dir, name)
+
+    def write(self, record: Dict) -> str:
+        """Queue a record for writing and return the segment it is headed for"""
+        self._raise_error()
+        if self._closed:
+            raise RuntimeError("RequestResponseLogWriter is closed")
+        self._queue.put(record)
+        return self.segment_path
+
+    def flush(self):
+        """Block until every queued record has been written"""
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """Drain the queue, stop the writer thread and close the open segment"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # Drain whatever else is already queued into the same write
+            while item is not None and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+            stop = batch[-1] is None
+            records = [r for r in batch if r is not None]
+            try:
+                if records and self._error is None:
+                    self._write_batch(records)
+                if stop and self._segment is not None:
+                    self._segment.close()
+                    self._segment = None
+            except Exception as e:
+                if self._error is None:
+                    self._error = e
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, records: List[Dict]):
+        data = "".join(json_backend.dumps(r, pretty=False) + "\n" for r in records).encode('utf-8')
+        if self._segment is not None and self._segment_bytes + len(data) > self.max_segment_bytes:
+            self._segment.close()
+            self._segment = None
+            self._segment_index += 1
+            self._segment_bytes = 0
+        if self._segment is None:
+            self._segment = _open_segment(self.segment_path, self.compression)
+        self._segment.write(data)
+        # Keep the segment readable mid-run for uncompressed logs
+        self._segment.flush()
+        self._segment_bytes += len(data)
+        self.records_written += len(records)
+
+
+class RequestResponseLogReader:
+    """Reads records back from the JSON Lines segments of one run, or of every run"""
+    def __init__(self, log_dir: str = "request_response_logs", run_id: Optional[str] = None):
+        self.log_dir = log_dir
+        self.run_id = run_id
+
+    def segments(self) -> List[str]:
+        """Segment files of ``run_id`` (including its xdist workers' segments), or all of them; oldest first"""
+        if self.run_id is None:
+            return sorted(glob.glob(os.path.join(self.log_dir, f"{SEGMENT_PREFIX}_*.jsonl*")))
+        pattern = re.compile(rf"{SEGMENT_PREFIX}_{re.escape(self.run_id)}(_gw\d+)?_\d{{4}}\.jsonl")
+        candidates = glob.glob(os.path.join(self.log_dir, f"{SEGMENT_PREFIX}_{glob.escape(self.run_id)}_*"))
+        return sorted(path for path in candidates if pattern.match(os.path.basename(path)))
+
+    def iter_records(self, test_name: Optional[str] = None) -> Iterator[Dict]:
+        """Yield records in write order, optionally only those of one test"""
+        for path in self.segments():
+            with _read_segment(path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json_backend.loads(line)
+                    if test_name is None or record.get("test_name") == test_name:
+                        yield record
+
+    def find(self, test_name: str) -> List[Dict]:
+        """All exchanges recorded for a test"""
+        return list(self.iter_records(test_name))
+
+    def index(self) -> Dict[str, List[Dict]]:
+        """Group every record by test name in a single pass"""
+        grouped: Dict[str, List[Dict]] = {}
+        for record in self.iter_records():
+            grouped.setdefault(record.get("test_name"), []).append(record)
+        return grouped
+
+
+def configure_log_writers(**defaults):
+    """Set constructor defaults for writers created by get_log_writer.
+
+    Raises ImportError for zstd compression without the 'zstandard' package,
+    so a missing dependency stops the session before the first test.
+    """
+    if defaults.get("compression") == "zstd":
+        _zstandard()
+    _writer_defaults.update({k: v for k, v in defaults.items() if v is not None})
+
+
+def get_log_writer(log_dir: str = "request_response_logs") -> RequestResponseLogWriter:
+    """Process-wide writer for a log directory"""
+    key = os.path.abspath(log_dir)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = RequestResponseLogWriter(log_dir, **_writer_defaults)
+            _writers[key] = writer
+        return writer
+
+
+def close_log_writers():
+    """Flush and close every writer, then raise the first write error; called at the end of the test session"""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    errors = []
+    for writer in writers:
+        try:
+            writer.close()
+        except Exception as e:
+            errors.append(e)
+    if errors:
+        raise errors[0]
+
+
+atexit.register(close_log_writers)
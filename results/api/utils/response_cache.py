@@ -0,0 +1,199 @@
+"""
+HTTP response cache for the read-only API endpoints
+
+Responses of idempotent calls (GET productsList/brandsList and the POST
+searchProduct lookups) are kept in an in-memory LRU tier bounded by entry
+count and, optionally, an on-disk tier that survives between runs. A
+fresh entry (younger than the TTL) is answered without touching the
+network; a stale one with an ETag or Last-Modified validator is
+revalidated with a conditional request, and a 304 refreshes it without
+transferring the body again.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from . import json_backend
+from .api_test_utils import APIEndpoints
+from .cassette import normalize_body, request_key, stored_entry, stored_response
+
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "http_cache")
+# (method, route) pairs whose responses may be cached
+DEFAULT_CACHEABLE = (
+    ("GET", APIEndpoints.GET_PRODUCTS_LIST),
+    ("GET", APIEndpoints.GET_BRANDS_LIST),
+    ("POST", APIEndpoints.SEARCH_PRODUCT),
+)
+# Headers a 304 carries that replace the stored ones (RFC 9111 section 4.3.4)
+REVALIDATION_HEADERS = ("ETag", "Last-Modified", "Cache-Control", "Expires", "Date")
+
+
+class CacheStats:
+    """Thread-safe cache counters"""
+    FIELDS = ("memory_hits", "disk_hits", "revalidated", "misses", "stored", "evictions", "bytes_saved")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def record(self, **counts):
+        with self._lock:
+            for field, value in counts.items():
+                self._counts[field] += value
+
+    def as_dict(self) -> Dict:
+        """Counters as stored in the API summary JSON"""
+        with self._lock:
+            return _with_hit_rate(dict(self._counts))
+
+
+def _with_hit_rate(counts: Dict) -> Dict:
+    # Revalidated entries still saved the body transfer, so they count as hits
+    hits = counts["memory_hits"] + counts["disk_hits"] + counts["revalidated"]
+    lookups = hits + counts["misses"]
+    counts["hit_rate"] = (hits / lookups * 100) if lookups else 0
+    return counts
+
+
+def merge_cache_stats(stats_dicts: List[Dict]) -> Dict:
+    """Sum CacheStats.as_dict() counters from several processes"""
+    merged = dict.fromkeys(CacheStats.FIELDS, 0)
+    for stats in stats_dicts:
+        for key in merged:
+            merged[key] += stats.get(key, 0)
+    return _with_hit_rate(merged)
+
+
+class ResponseCache:
+    """LRU + TTL memory tier over an optional on-disk tier, keyed like cassette recordings"""
+    def __init__(self, max_entries: int = 256, ttl_s: float = 300.0, disk_dir: Optional[str] = None,
+                 cacheable: Iterable = DEFAULT_CACHEABLE):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.disk_dir = disk_dir
+        self.cacheable = {(method.upper(), route) for method, route in cacheable}
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def is_cacheable(self, method: str, url: str) -> bool:
+        return (method.upper(), APIEndpoints.route_of(url)) in self.cacheable
+
+    @staticmethod
+    def key(request) -> str:
+        """Cassette request key plus scheme and host, so stand-in and live responses never mix.
+
+        The port is left out: the stand-in server listens on a new one every run.
+        """
+        origin = urlparse(request.url)
+        body = normalize_body(request.body, request.headers.get("Content-Type", ""))
+        return hashlib.sha256(f"{origin.scheme}://{origin.hostname} {request_key(request.method, request.url, body)}"
+                              .encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """(entry, 'memory' or 'disk'); a disk entry is promoted to memory. (None, None) if neither has it"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry, "memory"
+        if self.disk_dir is None:
+            return None, None
+        try:
+            with open(self._disk_path(key), 'r', encoding='utf-8') as f:
+                entry = json_backend.load(f)
+        except (OSError, ValueError):
+            return None, None
+        self._remember(key, entry)
+        return entry, "disk"
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return time.time() - entry["stored_at"] < self.ttl_s
+
+    def put(self, key: str, entry: Dict):
+        entry["stored_at"] = time.time()
+        self._remember(key, entry)
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json_backend.dump(entry, f, pretty=False)
+            os.replace(tmp_path, path)
+
+    def _remember(self, key: str, entry: Dict):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.stats.record(evictions=1)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+
+def revalidated_entry(entry: Dict, not_modified_headers) -> Dict:
+    """Copy of a stored entry with the validators and freshness headers of a 304 response"""
+    headers = CaseInsensitiveDict(entry["headers"])
+    for name in REVALIDATION_HEADERS:
+        if name in not_modified_headers:
+            headers[name] = not_modified_headers[name]
+    return dict(entry, headers=dict(headers))
+
+
+def _body_bytes(entry: Dict) -> int:
+    # Stored bodies are text; count what the server would have sent
+    return len(entry["content"].encode("utf-8"))
+
+
+class CachingAdapter(BaseAdapter):
+    """Transport adapter answering cacheable calls from a ResponseCache, the rest via ``live_adapter``"""
+    def __init__(self, cache: ResponseCache, live_adapter):
+        super().__init__()
+        self.cache = cache
+        self.live_adapter = live_adapter
+
+    def send(self, request, **kwargs):
+        cache = self.cache
+        if not cache.is_cacheable(request.method, request.url):
+            return self.live_adapter.send(request, **kwargs)
+        key = cache.key(request)
+        entry, tier = cache.get(key)
+        if entry is not None and cache.is_fresh(entry):
+            cache.stats.record(bytes_saved=_body_bytes(entry), **{f"{tier}_hits": 1})
+            return stored_response(request, entry, self)
+        if entry is not None:
+            # Stale: ask the server whether our copy is still current
+            headers = CaseInsensitiveDict(entry["headers"])
+            if headers.get("ETag"):
+                request.headers["If-None-Match"] = headers["ETag"]
+            if headers.get("Last-Modified"):
+                request.headers["If-Modified-Since"] = headers["Last-Modified"]
+        response = self.live_adapter.send(request, **kwargs)
+        if entry is not None and response.status_code == 304:
+            response.close()
+            entry = revalidated_entry(entry, response.headers)
+            cache.put(key, entry)
+            cache.stats.record(revalidated=1, bytes_saved=_body_bytes(entry))
+            return stored_response(request, entry, self)
+        cache.stats.record(misses=1)
+        if response.status_code == 200 and "no-store" not in response.headers.get("Cache-Control", ""):
+            cache.put(key, stored_entry(response))
+            cache.stats.record(stored=1)
+        return response
+
+    def close(self):
+        """Pools belong to the live adapter, which outlives the sessions"""
@@ -0,0 +1,124 @@
+"""
+Compiled schemas for API response payloads
+
+A schema is written as plain Python values:
+
+    {"id": int, "name": str, "category": {"category": str}}   object with required keys
+    ListOf(PRODUCT, min_items=1)                               list whose every element matches
+    int, str, float, bool, dict, list                          value of that type
+
+and compiled once into a Python function made of a single boolean
+expression (``type(v) is dict and "id" in v and type(v["id"]) is int ...``),
+so checking a 100k-element products list costs one generator pass with no
+per-field function calls. Only a payload that fails the compiled check is
+walked again to collect every violation with its JSON path, e.g.
+``$.products[41].category.usertype: missing key 'usertype'``.
+"""
+from typing import Any, Callable, Dict, List
+
+
+class ListOf:
+    """List schema: every element matches ``item``"""
+    def __init__(self, item: Any, min_items: int = 0):
+        self.item = item
+        self.min_items = min_items
+
+
+# bool is a subclass of int, so numbers are checked by exact type
+_EXACT_TYPES = {int: "int", str: "str", bool: "bool", dict: "dict", list: "list", type(None): "NoneType"}
+
+
+class _Compiler:
+    def __init__(self):
+        self.namespace: Dict[str, Any] = {"__builtins__": {"type": type, "len": len, "all": all,
+                                                           "isinstance": isinstance, "dict": dict, "list": list,
+                                                           "int": int, "float": float}}
+        self._names = 0
+
+    def _name(self, prefix: str) -> str:
+        self._names += 1
+        return f"{prefix}{self._names}"
+
+    def expr(self, spec: Any, var: str) -> str:
+        if isinstance(spec, dict):
+            parts = [f"type({var}) is dict"]
+            for key, value_spec in spec.items():
+                parts.append(f"{key!r} in {var}")
+                parts.append(self.expr(value_spec, f"{var}[{key!r}]"))
+            return "(" + " and ".join(parts) + ")"
+        if isinstance(spec, ListOf):
+            item = self._name("_i")
+            parts = [f"type({var}) is list"]
+            if spec.min_items:
+                parts.append(f"len({var}) >= {spec.min_items}")
+            parts.append(f"all({self.expr(spec.item, item)} for {item} in {var})")
+            return "(" + " and ".join(parts) + ")"
+        if spec in _EXACT_TYPES:
+            return f"(type({var}) is {self._bind(spec)})"
+        if spec is float:
+            # JSON numbers without a fraction arrive as int
+            return f"(type({var}) is float or type({var}) is int)"
+        if isinstance(spec, type):
+            return f"isinstance({var}, {self._bind(spec)})"
+        raise TypeError(f"Unsupported schema element: {spec!r}")
+
+    def _bind(self, value: Any) -> str:
+        name = self._name("_t")
+        self.namespace[name] = value
+        return name
+
+    def compile(self, spec: Any) -> Callable[[Any], bool]:
+        source = f"def check(v):\n    return {self.expr(spec, 'v')}\n"
+        exec(compile(source, "<response schema>", "exec"), self.namespace)
+        return self.namespace["check"]
+
+
+def _type_name(value: Any) -> str:
+    return "null" if value is None else type(value).__name__
+
+
+def _explain(spec: Any, value: Any, path: str, violations: List[str]):
+    """Walk a payload that failed the compiled check and record every violation"""
+    if isinstance(spec, dict):
+        if type(value) is not dict:
+            violations.append(f"{path}: expected object, got {_type_name(value)}")
+            return
+        for key, value_spec in spec.items():
+            if key not in value:
+                violations.append(f"{path}: missing key {key!r}")
+            else:
+                _explain(value_spec, value[key], f"{path}.{key}", violations)
+    elif isinstance(spec, ListOf):
+        if type(value) is not list:
+            violations.append(f"{path}: expected list, got {_type_name(value)}")
+            return
+        if len(value) < spec.min_items:
+            violations.append(f"{path}: expected at least {spec.min_items} items, got {len(value)}")
+        for index, item in enumerate(value):
+            _explain(spec.item, item, f"{path}[{index}]", violations)
+    elif spec is float:
+        if type(value) not in (float, int):
+            violations.append(f"{path}: expected float, got {_type_name(value)}")
+    elif spec in _EXACT_TYPES:
+        if type(value) is not spec:
+            violations.append(f"{path}: expected {_EXACT_TYPES[spec]}, got {_type_name(value)}")
+    elif not isinstance(value, spec):
+        violations.append(f"{path}: expected {spec.__name__}, got {_type_name(value)}")
+
+
+class Schema:
+    """A schema compiled to a checker function; violations are only collected for invalid payloads"""
+    def __init__(self, spec: Any):
+        self.spec = spec
+        self._check = _Compiler().compile(spec)
+
+    def is_valid(self, data: Any) -> bool:
+        return self._check(data)
+
+    def violations(self, data: Any) -> List[str]:
+        """Every mismatch as '<JSON path>: <problem>', empty for a valid payload"""
+        if self._check(data):
+            return []
+        violations: List[str] = []
+        _explain(self.spec, data, "$", violations)
+        return violations
@@ -0,0 +1,94 @@
+"""
+Concurrent fan-out of searchProduct calls over a list of search terms
+
+Every term is sent as its own POST with at most ``concurrency`` requests in
+flight, and each response is checked with
+APITestValidator.validate_search_response. The outcome keeps one entry per
+term (status, latency, number of products found) alongside the aggregate
+latency, so the ten common terms of the suite and thousands of generated
+ones for a stress run go through the same code.
+"""
+import asyncio
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+
+from . import json_backend
+from .api_test_utils import APIEndpoints, APITestValidator
+from .latency_stats import LatencyStats
+
+
+SEARCH_PERCENTILES = (50, 95, 99)
+
+
+class SearchFanOut:
+    """Sends one searchProduct call per term to ``base_url`` with bounded concurrency"""
+    def __init__(self, base_url: str, concurrency: int = 10, timeout: float = 30.0,
+                 headers: Optional[Dict] = None):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.headers = headers or {'User-Agent': 'API-Test-Suite/1.0'}
+        self.elapsed = 0.0
+
+    async def _search(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, term: str) -> Dict:
+        outcome = {"term": term, "status_code": None, "latency_ms": None, "result_count": 0,
+                   "valid": False, "error": None}
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.post(self.base_url + APIEndpoints.SEARCH_PRODUCT,
+                                             data={"search_product": term})
+            except httpx.HTTPError as e:
+                outcome["error"] = f"{type(e).__name__}: {e}"
+                return outcome
+            outcome["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        # Parsed and validated outside the semaphore so the next request can go out
+        outcome["status_code"] = response.status_code
+        try:
+            body = json_backend.response_json(response)
+        except ValueError:
+            outcome["error"] = "Response is not JSON"
+            return outcome
+        products = body.get("products") if isinstance(body, dict) else None
+        outcome["result_count"] = len(products) if isinstance(products, list) else 0
+        outcome["valid"] = response.status_code == 200 and APITestValidator.validate_search_response(body, term)
+        return outcome
+
+    async def run_async(self, terms: Sequence[str]) -> Dict:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout, headers=self.headers) as client:
+            start = time.perf_counter()
+            searches = await asyncio.gather(*(self._search(client, semaphore, term) for term in terms))
+            self.elapsed = time.perf_counter() - start
+        return self.result(searches)
+
+    def run(self, terms: Sequence[str]) -> Dict:
+        """Blocking wrapper around run_async for use from sync tests"""
+        return asyncio.run(self.run_async(terms))
+
+    def result(self, searches: List[Dict]) -> Dict:
+        """Per-term outcomes in term order, with aggregate latency and counts"""
+        latency = LatencyStats()
+        status_codes = Counter(search["status_code"] for search in searches if search["status_code"] is not None)
+        for search in searches:
+            if search["latency_ms"] is not None:
+                latency.add(search["latency_ms"])
+        return {
+            "target": self.base_url,
+            "terms": len(searches),
+            "concurrency": self.concurrency,
+            "elapsed_s": round(self.elapsed, 3),
+            "throughput_rps": round(len(searches) / self.elapsed, 2) if self.elapsed else 0,
+            "errors": sum(1 for search in searches if search["error"]),
+            "invalid": sum(1 for search in searches if not search["error"] and not search["valid"]),
+            "with_results": sum(1 for search in searches if search["result_count"]),
+            # Most frequent HTTP status; None when no request got a response
+            "status_code": status_codes.most_common(1)[0][0] if status_codes else None,
+            "status_codes": dict(status_codes),
+            "latency": latency.as_dict(SEARCH_PERCENTILES),
+            "searches": searches,
+        }
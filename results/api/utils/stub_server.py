@@ -0,0 +1,234 @@
+"""
+Local stand-in server for the Automation Exercise API routes
+
+Products and brands come from the recorded catalog fixture; accounts are
+kept in memory, so create, login, update, detail and delete behave like the
+live API within one server's lifetime.
+"""
+import hashlib
+import os
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import parse_qs, urlparse
+
+from . import json_backend
+from .api_test_utils import APIEndpoints
+
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fixtures", "catalog.json")
+USER_DETAIL_FIELDS = ("id", "name", "email", "title", "birth_day", "birth_month", "birth_year", "first_name",
+                      "last_name", "company", "address1", "address2", "country", "state", "city", "zipcode")
+# Accounts are stored under the createAccount form keys; the detail response renames these
+USER_FORM_KEYS = {"birth_day": "birth_date", "first_name": "firstname", "last_name": "lastname"}
+
+
+def load_catalog(catalog_file: str = CATALOG_FILE) -> Dict:
+    """Load the recorded products and brands served by the stand-in"""
+    with open(catalog_file, 'r', encoding='utf-8') as f:
+        return json_backend.load(f)
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep pooled connections alive between calls
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        """Silence the default per-request stderr logging"""
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _read_form(self) -> Dict[str, str]:
+        parsed = urlparse(self.path)
+        form = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length).decode("utf-8")
+            form.update({k: v[0] for k, v in parse_qs(body).items()})
+        return form
+
+    def _dispatch(self, method: str):
+        stub = self.server.stub
+        form = self._read_form()
+        route = urlparse(self.path).path
+        if route.startswith("/api"):
+            route = route[len("/api"):]
+        if stub.latency_ms:
+            time.sleep(stub.latency_ms / 1000.0)
+        payload = stub.handle(method, route, form)
+        self._send_json(payload, conditional=method == "GET")
+
+    def _send_json(self, payload: Dict, conditional: bool = False):
+        # The live API always answers HTTP 200 and puts the real code in "responseCode"
+        body = json_backend.dumps(payload, pretty=False).encode("utf-8")
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if conditional and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", self.server.stub.last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubAPIServer:
+    """In-process stand-in for https://automationexercise.com/api"""
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0,
+                 catalog_file: str = CATALOG_FILE):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        catalog = load_catalog(catalog_file)
+        self.products = catalog["products"]
+        self.brands = catalog["brands"]
+        # Validators for conditional GETs, as a caching client would see them on the live site
+        self.last_modified = formatdate(usegmt=True)
+        # Accounts created through the API, by email; shared by all handler threads
+        self.users: Dict[str, Dict[str, str]] = {}
+        self._users_lock = threading.Lock()
+        self._next_user_id = 1
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to use in place of APIEndpoints.BASE_URL"""
+        return f"http://{self.host}:{self.port}/api"
+
+    def start(self) -> "StubAPIServer":
+        """Start serving on a background thread"""
+        self._server = ThreadingHTTPServer((self.host, self.port), _StubRequestHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-api-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server and wait for the serving thread"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def reset(self):
+        """Forget every account created so far"""
+        with self._users_lock:
+            self.users.clear()
+            self._next_user_id = 1
+
+    def handle(self, method: str, route: str, form: Dict[str, str]) -> Dict:
+        """Build the JSON payload for a route the same way the live API does"""
+        if route == APIEndpoints.GET_PRODUCTS_LIST:
+            if method != "GET":
+                return {"responseCode": 405, "message": "This request method is not supported."}
+            return {"responseCode": 200, "products": self.products}
+        if route == APIEndpoints.GET_BRANDS_LIST:
+            if method != "GET":
+                return {"responseCode": 405, "message": "This request method is not supported."}
+            return {"responseCode": 200, "brands": self.brands}
+        if route == APIEndpoints.SEARCH_PRODUCT:
+            term = form.get("search_product")
+            if method != "POST" or term is None:
+                return {"responseCode": 400,
+                        "message": "Bad request, search_product parameter is missing in POST request."}
+            term = term.lower()
+            return {"responseCode": 200, "products": [
+                p for p in self.products
+                if term in p["name"].lower() or term in p["category"]["category"].lower()
+            ]}
+        if route == APIEndpoints.VERIFY_LOGIN:
+            return self._verify_login(method, form)
+        if route == APIEndpoints.CREATE_USER:
+            return self._create_user(method, form)
+        if route == APIEndpoints.UPDATE_USER:
+            return self._update_user(method, form)
+        if route == APIEndpoints.DELETE_USER:
+            return self._delete_user(method, form)
+        if route == APIEndpoints.GET_USER_LIST:
+            return self._user_detail(method, form)
+        return {"responseCode": 404, "message": "Not found"}
+
+    def _verify_login(self, method: str, form: Dict[str, str]) -> Dict:
+        if method == "DELETE":
+            return {"responseCode": 405, "message": "This request method is not supported."}
+        if method != "POST" or "email" not in form or "password" not in form:
+            return {"responseCode": 400,
+                    "message": "Bad request, email or password parameter is missing in POST request."}
+        with self._users_lock:
+            user = self.users.get(form["email"])
+            if user is not None and user["password"] == form["password"]:
+                return {"responseCode": 200, "message": "User exists!"}
+        return {"responseCode": 404, "message": "User not found!"}
+
+    def _create_user(self, method: str, form: Dict[str, str]) -> Dict:
+        if method != "POST":
+            return {"responseCode": 405, "message": "This request method is not supported."}
+        for field in ("name", "email", "password"):
+            if not form.get(field):
+                return {"responseCode": 400, "message": f"Bad request, {field} parameter is missing in POST request."}
+        with self._users_lock:
+            if form["email"] in self.users:
+                return {"responseCode": 400, "message": "Email already exists!"}
+            self.users[form["email"]] = dict(form, id=self._next_user_id)
+            self._next_user_id += 1
+        return {"responseCode": 201, "message": "User created!"}
+
+    def _update_user(self, method: str, form: Dict[str, str]) -> Dict:
+        if method != "PUT":
+            return {"responseCode": 405, "message": "This request method is not supported."}
+        with self._users_lock:
+            user = self.users.get(form.get("email"))
+            if user is None or user["password"] != form.get("password"):
+                return {"responseCode": 404, "message": "Account not found!"}
+            user.update(form)
+        return {"responseCode": 200, "message": "User updated!"}
+
+    def _delete_user(self, method: str, form: Dict[str, str]) -> Dict:
+        if method != "DELETE":
+            return {"responseCode": 405, "message": "This request method is not supported."}
+        with self._users_lock:
+            user = self.users.get(form.get("email"))
+            if user is None or user["password"] != form.get("password"):
+                return {"responseCode": 404, "message": "Account not found!"}
+            del self.users[form["email"]]
+        return {"responseCode": 200, "message": "Account deleted!"}
+
+    def _user_detail(self, method: str, form: Dict[str, str]) -> Dict:
+        if method != "GET" or "email" not in form:
+            return {"responseCode": 400, "message": "Bad request, email parameter is missing in GET request."}
+        with self._users_lock:
+            user = self.users.get(form["email"])
+            if user is None:
+                return {"responseCode": 404, "message": "Account not found with this email, try another email!"}
+            # Same fields as the live API; the password is never returned
+            return {"responseCode": 200,
+                    "user": {field: user.get(USER_FORM_KEYS.get(field, field), "") for field in USER_DETAIL_FIELDS}}
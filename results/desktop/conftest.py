@@ -1,7 +1,20 @@
+import glob
+import os
+import shutil
 import pytest
 import logging
-from utils.test_utils import DesktopLogger, DesktopReporter, STATIC_LOG_FILE, STATIC_HTML_FILE
+from utils.test_utils import (DesktopLogger, DesktopReporter, STATIC_LOG_FILE, STATIC_HTML_FILE, SHARDS_DIR,
+                              HISTORY_DIR, TREND_DASHBOARD_FILE, SCHEDULE_REPORT_FILE)
 from utils.html_report_generator import HTMLReportGenerator
+from utils.browser_pool import BrowserPoolStats
+from utils.request_blocker import RequestBlockerStats
+from utils.screenshot_service import configure_screenshot_service, close_screenshot_service
+from utils.screenshot_store import ScreenshotStore
+from utils.report_engine import (DEFAULT_DB_PATH, DurationScheduler, ResultShards, ResultStore, compute_trends,
+                                 is_xdist_controller, new_run_id, render_dashboard, results_plugin, worker_id)
+
+# Key under which the controller passes the shard run id to its workers
+SHARD_RUN_KEY = "desktop_shard_run"
 
 
 # Attach shared logger and reporter to pytest config
@@ -26,22 +39,131 @@ def desktop_reporter(request):
 
 # Generate reports at the end of the session
 
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    # Tell each pytest-xdist worker where to write its result shard
+    node.workerinput[SHARD_RUN_KEY] = node.config._desktop_shard_run
+
+
+def _request_blocking_stats(config):
+    # Routing counters of this process, tagged with the blocking mode
+    blocker = getattr(config, '_request_blocker', None)
+    if blocker is None:
+        return None
+    return {"mode": blocker.mode, **blocker.stats.as_dict()}
+
+
+def _merge_worker_shards(config):
+    # Fold every worker shard of this run into the controller's reporter
+    shards = ResultShards(SHARDS_DIR, config._desktop_shard_run)
+    reporter = config._desktop_reporter
+    pool_stats = []
+    blocking_stats = []
+    for shard in shards.read_all():
+        for result in shard.get("test_results", []):
+            reporter.add_result(result)
+        if shard.get("browser_pool"):
+            pool_stats.append(shard["browser_pool"])
+        if shard.get("request_blocking"):
+            blocking_stats.append(shard["request_blocking"])
+    if pool_stats:
+        reporter.browser_pool_stats = BrowserPoolStats.merge_dicts(pool_stats)
+    if blocking_stats:
+        mode = blocking_stats[0].pop("mode", None)
+        for stats in blocking_stats[1:]:
+            stats.pop("mode", None)
+        reporter.request_blocking_stats = {"mode": mode, **RequestBlockerStats.merge_dicts(blocking_stats)}
+    shards.cleanup()
+    return reporter
+
+
+def _compare_with_baselines(config, store):
+    # Runs once in the controller, after every worker has saved its store manifest
+    from utils.visual_regression import VisualComparator, load_masks
+    skip_distance = config.getoption("--visual-hash-skip-distance")
+    comparator = VisualComparator(
+        threshold=config.getoption("--visual-threshold"),
+        pixel_tolerance=config.getoption("--visual-pixel-tolerance"),
+        masks=load_masks(config.getoption("--visual-masks")),
+        phash_skip_distance=skip_distance if skip_distance >= 0 else None,
+        update_baselines=config.getoption("--visual-update-baselines"),
+    )
+    return comparator.compare_all(store.run_steps())
+
+
+def _record_run(config, summary, summary_file, db_path, screenshot_store):
+    """Add the run to the SQLite result store and re-render the trend dashboard"""
+    run_key = config._desktop_shard_run
+    # Keep this run's summary; summaries copied in from other machines are ingested with it
+    os.makedirs(HISTORY_DIR, exist_ok=True)
+    shutil.copyfile(summary_file, os.path.join(HISTORY_DIR, f"{run_key}.json"))
+    with ResultStore(db_path) as store:
+        # Screenshots are recorded by their store object
+        store.record_desktop_summary(summary, run_key=run_key,
+                                     resolve=screenshot_store.resolve if screenshot_store else None)
+        store.ingest_summaries("desktop", glob.glob(os.path.join(HISTORY_DIR, "*.json")))
+        trend_runs = config.getoption("--trend-runs")
+        if trend_runs:
+            return render_dashboard(compute_trends(store, "desktop", trend_runs), TREND_DASHBOARD_FILE)
+    return None
+
+
 def pytest_sessionfinish(session, exitstatus):
+    # Every queued screenshot must be on disk (and in the store manifest) before results are reported
+    screenshots = close_screenshot_service()
+    if session.config.option.collectonly:
+        return
+    worker = worker_id(session.config)
+    if worker is not None:
+        # Workers only hand their results to the controller, which renders the reports
+        reporter = session.config._desktop_reporter
+        pool = getattr(session.config, '_browser_pool', None)
+        ResultShards(SHARDS_DIR, session.config.workerinput[SHARD_RUN_KEY]).write(
+            worker, {"worker": worker, "test_results": reporter.test_results,
+                     "browser_pool": pool.stats.as_dict() if pool is not None else None,
+                     "request_blocking": _request_blocking_stats(session.config)}
+        )
+        return
+    if is_xdist_controller(session.config):
+        _merge_worker_shards(session.config)
+    elif getattr(session.config, '_desktop_reporter', None):
+        reporter = session.config._desktop_reporter
+        pool = getattr(session.config, '_browser_pool', None)
+        if pool is not None:
+            reporter.browser_pool_stats = pool.stats.as_dict()
+        reporter.request_blocking_stats = _request_blocking_stats(session.config)
+    if screenshots is not None and session.config.getoption("--visual-regression"):
+        session.config._desktop_reporter.visual_regression = _compare_with_baselines(session.config, screenshots.store)
     # Generate JSON report
     reporter = getattr(session.config, '_desktop_reporter', None)
     html_path = None
+    trend_path = None
     if reporter:
         summary = reporter.generate_report()
         # Only generate HTML if there are results
         if summary and summary.get('total_tests', 0) > 0:
-            generator = HTMLReportGenerator()
+            generator = HTMLReportGenerator(screenshot_store=screenshots.store if screenshots else None,
+                                            thumbnails=session.config.getoption("--report-thumbnails"))
             html_path = generator.generate_beautiful_report()
+        db_path = session.config.getoption("--results-db")
+        if summary and summary.get('total_tests', 0) > 0 and db_path != "off":
+            trend_path = _record_run(session.config, summary, reporter.report_file, db_path or DEFAULT_DB_PATH,
+                                     screenshots.store if screenshots else None)
+    if screenshots is not None:
+        # Workers have finished writing, so old runs can be pruned safely
+        max_mb = session.config.getoption("--screenshot-store-max-mb")
+        screenshots.store.apply_retention(
+            keep_runs=session.config.getoption("--screenshot-keep-runs"),
+            max_bytes=int(max_mb * 1024 * 1024) if max_mb else None,
+        )
     print("\n==============================")
     print(f"Log file: {STATIC_LOG_FILE}")
     if html_path:
         print(f"HTML report generated: {html_path}")
     else:
         print("HTML report was not generated.")
+    if trend_path:
+        print(f"Trend dashboard generated: {trend_path}")
     print("==============================\n")
 
 @pytest.hookimpl(tryfirst=True)
@@ -49,6 +171,35 @@ def pytest_configure(config):
     # Attach reporter to config for sessionfinish
     if not hasattr(config, '_desktop_reporter'):
         config._desktop_reporter = DesktopReporter()
+    worker = worker_id(config)
+    if worker is None:
+        # Shard run id handed to pytest-xdist workers in pytest_configure_node
+        config._desktop_shard_run = new_run_id()
+        run_id = config._desktop_shard_run
+    else:
+        run_id = config.workerinput[SHARD_RUN_KEY]
+    db_path = config.getoption("--results-db")
+    if db_path != "off":
+        suite_dir = os.path.dirname(os.path.abspath(__file__))
+        scheduler = config.pluginmanager.get_plugin("duration_scheduler")
+        if scheduler is not None:
+            # Collected together with the API suite: one scheduler plans both
+            scheduler.add_suite("desktop", run_id if worker is None else None, root=suite_dir)
+        else:
+            config.pluginmanager.register(DurationScheduler(
+                config, "desktop", db_path or DEFAULT_DB_PATH, run_id if worker is None else None,
+                mode=config.getoption("--schedule"), scope=config.getoption("--schedule-scope"),
+                history_runs=config.getoption("--schedule-history-runs"), report_path=SCHEDULE_REPORT_FILE,
+                root=suite_dir,
+            ), "duration_scheduler")
+    configure_screenshot_service(
+        # All workers of a run share one manifest directory in the store
+        store=ScreenshotStore(run_id=run_id, worker=worker or "main"),
+        image_format=config.getoption("--screenshot-format"),
+        quality=config.getoption("--screenshot-quality"),
+        full_page=config.getoption("--screenshot-full-page"),
+        workers=config.getoption("--screenshot-workers"),
+    )
 """
 Pytest Configuration for Desktop Web Automation
 """
@@ -57,23 +208,173 @@ from playwright.sync_api import sync_playwright
 import os
 
 
+def pytest_addoption(parser, pluginmanager):
+    """Command line options for the desktop browser pool"""
+    # --results-db, --trend-runs and the --schedule options are shared with the API suite
+    results_plugin.register(pluginmanager)
+    group = parser.getgroup("desktop", "Desktop browser pool")
+    group.addoption(
+        "--browser-pool-size", type=int, default=1,
+        help="Browsers pre-launched per process (per worker under pytest-xdist)"
+    )
+    group.addoption(
+        "--context-max-uses", type=int, default=1,
+        help="Tests served by one browser context before it is recycled"
+    )
+    group.addoption(
+        "--desktop-headed", action="store_true", default=False,
+        help="Launch pooled browsers headed instead of headless"
+    )
+    group.addoption(
+        "--request-blocking", choices=["on", "observe", "off"], default="on",
+        help="Block ads, analytics, fonts and media ('observe' only records response sizes)"
+    )
+    group.addoption(
+        "--block-pattern", action="append", default=[],
+        help="Extra URL glob to block, e.g. '*cdn.example.com*' (repeatable)"
+    )
+    group.addoption(
+        "--block-resource-type", action="append", default=[],
+        help="Extra resource type to block, e.g. 'image' (repeatable)"
+    )
+    group.addoption(
+        "--screenshot-format", choices=["png", "jpeg", "webp"], default="png",
+        help="Image format for step screenshots (webp needs Pillow)"
+    )
+    group.addoption(
+        "--screenshot-quality", type=int, default=80,
+        help="JPEG/WebP screenshot quality (0-100)"
+    )
+    group.addoption(
+        "--screenshot-full-page", action="store_true", default=False,
+        help="Capture the full scrollable page instead of the viewport"
+    )
+    group.addoption(
+        "--screenshot-workers", type=int, default=2,
+        help="Threads encoding and writing screenshots off the test thread"
+    )
+    group.addoption(
+        "--screenshot-keep-runs", type=int, default=20,
+        help="Runs whose screenshots are kept in the screenshot store"
+    )
+    group.addoption(
+        "--screenshot-store-max-mb", type=float, default=None,
+        help="Size budget of the screenshot store; older runs beyond it are pruned"
+    )
+    group.addoption(
+        "--report-thumbnails", choices=["files", "sprite", "off"], default="files",
+        help="Screenshot gallery in the HTML report: thumbnail files, one sprite sheet, or full images"
+    )
+    group.addoption(
+        "--visual-regression", action="store_true", default=False,
+        help="Compare step screenshots with their baselines (needs numpy and Pillow)"
+    )
+    group.addoption(
+        "--visual-update-baselines", action="store_true", default=False,
+        help="Accept this run's step screenshots as the new baselines"
+    )
+    group.addoption(
+        "--visual-threshold", type=float, default=0.001,
+        help="Fraction of unmasked pixels that may differ before a step counts as changed"
+    )
+    group.addoption(
+        "--visual-pixel-tolerance", type=int, default=16,
+        help="Per-channel difference (0-255) below which a pixel counts as unchanged"
+    )
+    group.addoption(
+        "--visual-masks", default=None,
+        help="JSON file of regions to ignore: {\"step\": [[x, y, w, h]], \"*\": [...]}"
+    )
+    group.addoption(
+        "--visual-hash-skip-distance", type=int, default=2,
+        help="Treat steps within this perceptual-hash distance as unchanged without a pixel diff (-1 = off)"
+    )
+    group.addoption(
+        "--auth-state-ttl", type=float, default=3600,
+        help="Seconds a cached logged-in storage state stays valid"
+    )
+
+
 @pytest.fixture(scope="session")
-def browser_context():
-    """Browser context fixture"""
+def request_blocker(request):
+    """Route policy applied to every context handed out by the browser pool"""
+    from utils.request_blocker import (RequestBlocker, RoutePolicy, DEFAULT_BLOCK_PATTERNS,
+                                       DEFAULT_BLOCK_RESOURCE_TYPES)
+    config = request.config
+    policy = RoutePolicy(
+        block_patterns=DEFAULT_BLOCK_PATTERNS + tuple(config.getoption("--block-pattern")),
+        block_resource_types=DEFAULT_BLOCK_RESOURCE_TYPES + tuple(config.getoption("--block-resource-type")),
+    )
+    blocker = RequestBlocker(policy, mode=config.getoption("--request-blocking"))
+    # Kept on config so pytest_sessionfinish can put the counters in the report
+    config._request_blocker = blocker
+    yield blocker
+    blocker.save_sizes()
+
+
+@pytest.fixture(scope="session")
+def browser_pool(request, request_blocker):
+    """Pre-launched browsers handing out pre-warmed contexts"""
+    from utils.browser_pool import BrowserPool
+    config = request.config
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        context = browser.new_context(
-            viewport={"width": 1280, "height": 720}
+        pool = BrowserPool(
+            p,
+            size=config.getoption("--browser-pool-size"),
+            headless=not config.getoption("--desktop-headed"),
+            max_context_uses=config.getoption("--context-max-uses"),
+            context_options={"viewport": {"width": 1280, "height": 720}},
+            context_setup=request_blocker.install,
         )
-        yield context
-        browser.close()
+        # Kept on config so pytest_sessionfinish can put the counters in the report
+        config._browser_pool = pool
+        yield pool
+        pool.close()
+
+
+@pytest.fixture
+def pooled_context(browser_pool):
+    """Isolated context from the pool, returned to it after the test"""
+    pooled = browser_pool.acquire()
+    yield pooled
+    browser_pool.release(pooled)
+
+
+@pytest.fixture(scope="session")
+def storage_state_cache(request):
+    """Logged-in storage states keyed by user profile"""
+    from utils.auth_state import StorageStateCache
+    return StorageStateCache(ttl_seconds=request.config.getoption("--auth-state-ttl"))
+
+
+@pytest.fixture
+def cached_user():
+    """Stable user profile whose logged-in session is cached"""
+    from utils.test_utils import TestDataGenerator
+    return TestDataGenerator.generate_cached_user_data()
+
+
+@pytest.fixture
+def authenticated_page(browser_pool, storage_state_cache, cached_user):
+    """Page in a context that starts already logged in as cached_user"""
+    from utils.auth_state import login_and_save_state
+    state = storage_state_cache.get_or_create(
+        cached_user, lambda profile, path: login_and_save_state(browser_pool, profile, path)
+    )
+    pooled = browser_pool.acquire(storage_state=state)
+    yield pooled.page
+    browser_pool.release(pooled)
+
+
+@pytest.fixture
+def browser_context(pooled_context):
+    """Browser context fixture"""
+    return pooled_context.context
 
 
 @pytest.fixture
-def page(browser_context):
+def page(pooled_context):
     """Page fixture"""
-    page = browser_context.new_page()
-    yield page
-    page.close()
+    return pooled_context.page
 
 
@@ -1,101 +1,14 @@
 
-import json
 import os
-from datetime import datetime
+
+from utils.html_report_generator import HTMLReportGenerator
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 REPORTS_DIR = os.path.join(BASE_DIR, 'reports')
-LOGS_DIR = os.path.join(BASE_DIR, 'logs')
-SCREENSHOTS_DIR = os.path.join(BASE_DIR, 'screenshots')
 
-# Read test results (static filename)
+# Read test results (static filename) and render them with the shared report templates
 json_path = os.path.join(REPORTS_DIR, 'test_execution_summary.json')
-with open(json_path, 'r') as f:
-    data = json.load(f)
-
-passed_tests = data.get('passed', 0)
-failed_tests = data.get('failed', 0)
-total_tests = data.get('total_tests', 0)
-pass_rate = (passed_tests / total_tests * 100) if total_tests > 0 else 0
-
-html_content = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Desktop Web Automation Test Report</title>
-    <style>
-        body {{ font-family: 'Segoe UI', sans-serif; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); min-height: 100vh; padding: 20px; }}
-        .container {{ max-width: 1200px; margin: 0 auto; background: white; border-radius: 15px; box-shadow: 0 20px 40px rgba(0,0,0,0.1); overflow: hidden; }}
-        .header {{ background: linear-gradient(135deg, #2c3e50 0%, #34495e 100%); color: white; padding: 30px; text-align: center; }}
-        .header h1 {{ font-size: 2.5em; margin-bottom: 10px; }}
-        .summary {{ padding: 30px; background: #f8f9fa; }}
-        .summary-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 20px; margin-bottom: 30px; }}
-        .summary-card {{ background: white; padding: 25px; border-radius: 10px; text-align: center; box-shadow: 0 5px 15px rgba(0,0,0,0.08); border-left: 4px solid; }}
-        .summary-card.total {{ border-left-color: #3498db; }}
-        .summary-card.passed {{ border-left-color: #27ae60; }}
-        .summary-card.failed {{ border-left-color: #e74c3c; }}
-        .summary-card.rate {{ border-left-color: #f39c12; }}
-        .summary-card h3 {{ font-size: 2.5em; margin-bottom: 10px; color: #2c3e50; }}
-        .test-results {{ padding: 30px; }}
-        .test-item {{ background: white; margin-bottom: 20px; border-radius: 10px; box-shadow: 0 5px 15px rgba(0,0,0,0.08); border-left: 4px solid #27ae60; }}
-        .test-header {{ padding: 20px; background: #f8f9fa; display: flex; justify-content: space-between; align-items: center; }}
-        .test-status {{ padding: 5px 15px; border-radius: 20px; background: #27ae60; color: white; font-weight: 600; }}
-        .footer {{ background: #2c3e50; color: white; text-align: center; padding: 20px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🚀 Desktop Web Automation Report</h1>
-            <p>Automation Exercise - Test Execution Results</p>
-            <p>Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
-        </div>
-        
-        <div class="summary">
-            <div class="summary-grid">
-                <div class="summary-card total"><h3>{total_tests}</h3><p>Total Tests</p></div>
-                <div class="summary-card passed"><h3>{passed_tests}</h3><p>Passed</p></div>
-                <div class="summary-card failed"><h3>{failed_tests}</h3><p>Failed</p></div>
-                <div class="summary-card rate"><h3>{pass_rate:.1f}%</h3><p>Pass Rate</p></div>
-            </div>
-        </div>
-        
-        <div class="test-results">
-            <h2>📋 Test Execution Details</h2>
-"""
-
-for test in data.get('test_results', []):
-    html_content += f"""
-            <div class="test-item">
-                <div class="test-header">
-                    <div class="test-name"><strong>{test['test_name']}</strong></div>
-                    <div class="test-status">{test['status']}</div>
-                </div>
-                <div style="padding: 20px;">
-                    <p><strong>Duration:</strong> {test['duration']:.2f} seconds</p>
-                    <p><strong>Details:</strong> {test['details']}</p>
-                    <p><strong>Screenshots:</strong> {len(test.get('screenshots', []))} captured</p>
-                </div>
-            </div>
-"""
-
-html_content += """
-        </div>
-        
-        <div class="footer">
-            <p>🤖 Generated by Desktop Web Automation Framework</p>
-            <p>Powered by Playwright & Python</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
-
-# Write HTML report (static filename)
 html_path = os.path.join(REPORTS_DIR, 'beautiful_desktop_report.html')
-with open(html_path, 'w', encoding='utf-8') as f:
-    f.write(html_content)
+HTMLReportGenerator(json_path).generate_beautiful_report(output_path=html_path)
 
 print(f"Beautiful HTML report generated: {html_path}")
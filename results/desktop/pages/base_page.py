@@ -2,11 +2,10 @@
 Base Page Object Model class for common page functionality
 """
 from playwright.sync_api import Page
-import os
-from datetime import datetime
 
 
 from utils.test_utils import SCREENSHOTS_DIR
+from utils.screenshot_service import get_screenshot_service
 
 class BasePage:
     def __init__(self, page: Page):
@@ -29,14 +28,9 @@ class BasePage:
         """Select an option from dropdown"""
         self.page.select_option(selector, value)
         
-    def take_screenshot(self, name: str):
-        """Take a screenshot"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{name}_{timestamp}.png"
-        filepath = os.path.join(self.screenshot_dir, filename)
-        os.makedirs(self.screenshot_dir, exist_ok=True)
-        self.page.screenshot(path=filepath)
-        return filepath
+    def take_screenshot(self, name: str, clip: dict = None, full_page: bool = None):
+        """Take a screenshot; encoding and the disk write happen off the test thread"""
+        return get_screenshot_service().capture(self.page, name, clip=clip, full_page=full_page)
         
     def get_text(self, selector: str) -> str:
         """Get text from an element"""
@@ -0,0 +1,47 @@
+"""
+Unit tests for the storage-state cache behind the authenticated_page fixture
+"""
+import os
+import time
+
+from utils.auth_state import StorageStateCache
+from utils import test_utils
+
+
+def _save_state(calls):
+    def create(profile, path):
+        calls.append(profile["email"])
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{"cookies": [], "origins": []}')
+    return create
+
+
+def test_storage_state_is_reused_until_it_expires(tmp_path):
+    cache = StorageStateCache(cache_dir=str(tmp_path), ttl_seconds=60)
+    profile = test_utils.TestDataGenerator.generate_cached_user_data()
+    calls = []
+
+    first = cache.get_or_create(profile, _save_state(calls))
+    second = cache.get_or_create(profile, _save_state(calls))
+    assert first == second and os.path.exists(first)
+    assert calls == [profile["email"]]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Age the saved state past the TTL: the next lookup drops it and logs in again
+    expired = time.time() - 120
+    os.utime(first, (expired, expired))
+    assert cache.get(profile) is None
+    assert not os.path.exists(first)
+    cache.get_or_create(profile, _save_state(calls))
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_storage_state_is_keyed_by_profile(tmp_path):
+    cache = StorageStateCache(cache_dir=str(tmp_path), ttl_seconds=60)
+    calls = []
+    default = cache.get_or_create(test_utils.TestDataGenerator.generate_cached_user_data(), _save_state(calls))
+    admin = cache.get_or_create(test_utils.TestDataGenerator.generate_cached_user_data("admin"), _save_state(calls))
+    assert default != admin
+    assert len(calls) == 2
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
@@ -1,6 +1,7 @@
 """
 Desktop Web Automation Tests for https://automationexercise.com/
 Test Case 1: Register User
+Test Case 2: Logged-in Session from Cached Storage State
 Test Case 4: Search Product
 """
 import pytest
@@ -125,6 +126,45 @@ class TestDesktopWebAutomation:
             desktop_reporter.add_test_result(test_name, "FAIL", duration, error_msg, screenshots)
             raise
     
+    def test_authenticated_session(self, authenticated_page, cached_user, desktop_logger, desktop_reporter):
+        """Test Case 2: Logged-in Session from Cached Storage State"""
+        start_time = time.time()
+        test_name = "Test Case 2: Logged-in Session from Cached Storage State"
+        screenshots = []
+        
+        try:
+            desktop_logger.info(f"Starting {test_name}")
+            
+            # The context was restored from the cached storage state; no login form is used
+            home_page = HomePage(authenticated_page)
+            home_page.navigate_to_home()
+            
+            assert home_page.is_home_page_visible(), "Home page is not visible"
+            assert home_page.is_user_logged_in(), "Cached session is not logged in"
+            logged_in_as = home_page.get_logged_in_user()
+            assert cached_user["name"] in logged_in_as, f"Logged in as the wrong user: {logged_in_as}"
+            desktop_logger.info(f"Cached session verified: {logged_in_as}")
+            screenshot = home_page.take_screenshot("05b_cached_session_home")
+            screenshots.append(screenshot)
+            
+            end_time = time.time()
+            duration = end_time - start_time
+            
+            desktop_reporter.add_test_result(
+                test_name, "PASS", duration,
+                f"Started logged in as {cached_user['name']} from the cached storage state",
+                screenshots
+            )
+            desktop_logger.info(f"{test_name} completed successfully in {duration:.2f} seconds")
+            
+        except Exception as e:
+            end_time = time.time()
+            duration = end_time - start_time
+            error_msg = f"Test failed with error: {str(e)}"
+            desktop_logger.error(error_msg)
+            desktop_reporter.add_test_result(test_name, "FAIL", duration, error_msg, screenshots)
+            raise
+    
     def test_search_product(self, page, desktop_logger, desktop_reporter):
         """Test Case 4: Search Product"""
         start_time = time.time()
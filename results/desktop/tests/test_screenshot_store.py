@@ -0,0 +1,124 @@
+"""
+Unit tests for the content-addressed screenshot store and its retention
+"""
+import os
+
+from utils.screenshot_store import ScreenshotStore
+
+
+def _run(root, run_id, images):
+    """Store {step: bytes} as a finished run and return the store"""
+    store = ScreenshotStore(root=str(root), run_id=run_id)
+    for step, data in images.items():
+        store.put(step, data)
+    store.save_manifest()
+    return store
+
+
+def _objects(store):
+    return sorted(name for _, _, names in os.walk(store.objects_dir) for name in names)
+
+
+def _age_objects(store, seconds=3600):
+    """Backdate every object, as if earlier runs wrote them long before this one started"""
+    for dirpath, _, names in os.walk(store.objects_dir):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            old = os.path.getmtime(path) - seconds
+            os.utime(path, (old, old))
+
+
+def test_identical_images_are_stored_once(tmp_path):
+    store = ScreenshotStore(root=str(tmp_path), run_id="run1")
+    first = store.put("home", b"same image")
+    second = store.put("cart", b"same image")
+    third = store.put("home", b"other image")
+
+    assert first == second != third
+    assert len(_objects(store)) == 2
+    assert store.stats() == {"steps": 3, "objects_written": 2, "duplicates": 1}
+    # A step captured again keeps both images under numbered names
+    store.save_manifest()
+    assert dict((step, path) for step, path, _ in store.run_steps()) == {
+        "cart": first, "home": first, "home (2)": third}
+
+
+def test_images_from_an_earlier_run_are_not_written_again(tmp_path):
+    _run(tmp_path, "run1", {"home": b"home"})
+    store = ScreenshotStore(root=str(tmp_path), run_id="run2")
+    store.put("home", b"home")
+    assert store.stats()["objects_written"] == 0
+    assert store.stats()["duplicates"] == 1
+
+
+def test_run_count_limit_drops_old_runs_and_their_objects(tmp_path):
+    for number in range(1, 4):
+        _run(tmp_path, f"run{number}", {"shared": b"shared", "own": f"run {number}".encode()})
+    store = ScreenshotStore(root=str(tmp_path), run_id="run4")
+    _age_objects(store)
+
+    result = store.apply_retention(keep_runs=2)
+
+    assert (result["runs_kept"], result["runs_removed"], result["objects_removed"]) == (2, 1, 1)
+    assert sorted(os.listdir(store.manifests_dir)) == ["run2", "run3"]
+    assert store.digest(b"run 1") + ".png" not in _objects(store)
+    assert store.digest(b"shared") + ".png" in _objects(store)
+
+
+def test_size_budget_keeps_the_newest_runs_that_fit(tmp_path):
+    for number in range(1, 4):
+        _run(tmp_path, f"run{number}", {"page": bytes([number]) * 100})
+    store = ScreenshotStore(root=str(tmp_path), run_id="run4")
+    _age_objects(store)
+
+    result = store.apply_retention(keep_runs=10, max_bytes=250)
+
+    assert sorted(os.listdir(store.manifests_dir)) == ["run2", "run3"]
+    assert result["bytes_referenced"] == 200
+    assert len(_objects(store)) == 2
+
+
+def test_size_budget_always_keeps_the_newest_run(tmp_path):
+    _run(tmp_path, "run1", {"page": b"x" * 500})
+    store = ScreenshotStore(root=str(tmp_path), run_id="run2")
+    _age_objects(store)
+    assert store.apply_retention(keep_runs=10, max_bytes=100)["runs_kept"] == 1
+    assert len(_objects(store)) == 1
+
+
+def test_retention_keeps_in_flight_and_concurrent_objects(tmp_path):
+    _run(tmp_path, "run1", {"page": b"old"})
+    store = ScreenshotStore(root=str(tmp_path), run_id="run2")
+    # Unreferenced leftovers from before this run
+    stale = store.object_path(store.digest(b"stale"), "png")
+    os.makedirs(os.path.dirname(stale), exist_ok=True)
+    with open(stale, 'wb') as f:
+        f.write(b"stale")
+    _age_objects(store)
+    # A concurrent run mid-write, and an object it has finished but not yet put in a manifest
+    in_flight = store.object_path(store.digest(b"new"), "png") + ".123.456.tmp"
+    os.makedirs(os.path.dirname(in_flight), exist_ok=True)
+    with open(in_flight, 'wb') as f:
+        f.write(b"partial")
+    concurrent = ScreenshotStore(root=str(tmp_path), run_id="run3")
+    fresh = concurrent.put("page", b"concurrent")
+    # ...and the same run reusing an old object, which refreshes its modification time
+    reused = concurrent.put("home", b"old")
+
+    result = store.apply_retention(keep_runs=0)
+
+    assert result["objects_removed"] == 1
+    assert not os.path.exists(stale)
+    assert os.path.exists(in_flight) and os.path.exists(fresh) and os.path.exists(reused)
+
+
+def test_retention_keeps_objects_of_the_current_run_before_its_manifest_is_saved(tmp_path):
+    _run(tmp_path, "run1", {"page": b"page"})
+    store = ScreenshotStore(root=str(tmp_path), run_id="run2")
+    _age_objects(store)
+    path = store.put("page", b"page")
+    _age_objects(store)
+
+    store.apply_retention(keep_runs=0)
+
+    assert os.path.exists(path)
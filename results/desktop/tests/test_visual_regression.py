@@ -0,0 +1,125 @@
+"""
+Unit tests for the baseline comparison behind --visual-regression
+"""
+import hashlib
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from utils.visual_regression import VisualBaselines, VisualComparator  # noqa: E402
+
+
+def _screenshot(directory, name, pixels):
+    path = os.path.join(str(directory), f"{name}.png")
+    Image.fromarray(pixels.astype(np.uint8)).save(path)
+    with open(path, 'rb') as f:
+        return path, hashlib.sha256(f.read()).hexdigest()
+
+
+def _page(width=64, height=48):
+    """Horizontal gradient with a dark block, so the perceptual hash has some structure"""
+    pixels = np.zeros((height, width, 3), dtype=np.int16)
+    pixels[:, :, :] = np.linspace(40, 220, width, dtype=np.int16)[None, :, None]
+    pixels[10:30, 8:24] = (20, 60, 120)
+    return pixels
+
+
+def _comparator(tmp_path, **options):
+    baselines = VisualBaselines(baseline_dir=str(tmp_path / "baselines"))
+    return VisualComparator(baselines=baselines, diff_dir=str(tmp_path / "diffs"), **options)
+
+
+def _with_baseline(tmp_path, pixels, **options):
+    comparator = _comparator(tmp_path, **options)
+    path, content_hash = _screenshot(tmp_path, "baseline_run", pixels)
+    assert comparator.compare("home", path, content_hash)["status"] == "new"
+    comparator.baselines.save()
+    return _comparator(tmp_path, **options)
+
+
+def test_missing_baseline_is_recorded_as_new(tmp_path):
+    comparator = _comparator(tmp_path)
+    path, content_hash = _screenshot(tmp_path, "home", _page())
+
+    summary = comparator.compare_all([("home", path, content_hash)])
+
+    assert summary["counts"] == {"new": 1}
+    assert VisualBaselines(str(tmp_path / "baselines")).get("home")["sha256"] == content_hash
+
+
+def test_baseline_file_deleted_from_the_index_is_recorded_again(tmp_path):
+    comparator = _with_baseline(tmp_path, _page())
+    os.remove(comparator.baselines.path_of(comparator.baselines.index["home"]))
+    path, content_hash = _screenshot(tmp_path, "home", _page())
+
+    assert comparator.compare("home", path, content_hash)["status"] == "new"
+
+
+def test_identical_image_matches_by_content_hash(tmp_path):
+    comparator = _with_baseline(tmp_path, _page())
+    path, content_hash = _screenshot(tmp_path, "home", _page())
+
+    result = comparator.compare("home", path, content_hash)
+
+    assert result["status"] == "match"
+    assert (result["diff_ratio"], result["hash_distance"], result["diff_image"]) == (0.0, 0, None)
+
+
+def test_change_below_threshold_matches_without_a_diff_image(tmp_path):
+    comparator = _with_baseline(tmp_path, _page(), threshold=0.01, phash_skip_distance=None)
+    pixels = _page()
+    pixels[0, 0:10] = (255, 0, 0)  # 10 of 3072 pixels
+    path, content_hash = _screenshot(tmp_path, "home", pixels)
+
+    result = comparator.compare("home", path, content_hash)
+
+    assert result["status"] == "match"
+    assert 0 < result["diff_ratio"] <= 0.01
+    assert result["diff_image"] is None
+
+
+def test_change_above_threshold_fails_and_writes_a_diff(tmp_path):
+    comparator = _with_baseline(tmp_path, _page(), threshold=0.01, phash_skip_distance=None)
+    pixels = _page()
+    pixels[30:48, 30:64] = (255, 0, 0)
+    path, content_hash = _screenshot(tmp_path, "home", pixels)
+
+    result = comparator.compare("home", path, content_hash)
+
+    assert result["status"] == "changed"
+    assert result["diff_ratio"] > 0.01
+    assert os.path.exists(result["diff_image"])
+
+
+def test_masked_changes_are_ignored(tmp_path):
+    comparator = _with_baseline(tmp_path, _page(), threshold=0.0, phash_skip_distance=None,
+                                masks={"home": [[30, 30, 34, 18]]})
+    pixels = _page()
+    pixels[30:48, 30:64] = (255, 0, 0)
+    path, content_hash = _screenshot(tmp_path, "home", pixels)
+
+    assert comparator.compare("home", path, content_hash)["status"] == "match"
+
+
+def test_size_mismatch_is_reported_without_a_pixel_diff(tmp_path):
+    comparator = _with_baseline(tmp_path, _page(), phash_skip_distance=None)
+    path, content_hash = _screenshot(tmp_path, "home", _page(width=80))
+
+    result = comparator.compare("home", path, content_hash)
+
+    assert result["status"] == "size_changed"
+    assert result["diff_ratio"] == 1.0
+    assert result["diff_image"] is None
+
+
+def test_update_baselines_replaces_the_stored_image(tmp_path):
+    comparator = _with_baseline(tmp_path, _page(), update_baselines=True)
+    pixels = _page()
+    pixels[30:48, 30:64] = (255, 0, 0)
+    path, content_hash = _screenshot(tmp_path, "home", pixels)
+
+    assert comparator.compare("home", path, content_hash)["status"] == "updated"
+    assert comparator.baselines.get("home")["sha256"] == content_hash
@@ -0,0 +1,114 @@
+"""
+Authenticated storage-state cache for the desktop suite
+
+A logged-in Playwright storage state (cookies and local storage) is saved
+once per user profile and reused by later tests until it expires, so tests
+that only need a logged-in user skip the signup/login UI flow.
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from utils.test_utils import REPORTS_DIR
+
+
+AUTH_STATE_DIR = os.path.join(REPORTS_DIR, 'auth_state')
+CREATE_ACCOUNT_URL = "https://automationexercise.com/api/createAccount"
+
+
+class StorageStateCache:
+    """Saved storage states keyed by a hash of the user profile, valid for ``ttl_seconds``"""
+    def __init__(self, cache_dir: str = AUTH_STATE_DIR, ttl_seconds: float = 3600):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(profile: Dict) -> str:
+        """Stable key for a user profile; any change to the profile gives a new entry"""
+        return hashlib.sha256(json.dumps(profile, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    def path_for(self, profile: Dict) -> str:
+        return os.path.join(self.cache_dir, f"{self.key_for(profile)}.json")
+
+    def get(self, profile: Dict) -> Optional[str]:
+        """Path of a fresh storage state for the profile, or None"""
+        path = self.path_for(profile)
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            return None
+        if age > self.ttl_seconds:
+            self.invalidate(profile)
+            return None
+        return path
+
+    def get_or_create(self, profile: Dict, create: Callable[[Dict, str], None]) -> str:
+        """Return a fresh storage state, calling ``create(profile, path)`` to save one on a miss"""
+        path = self.get(profile)
+        if path is not None:
+            self.hits += 1
+            return path
+        self.misses += 1
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(profile)
+        # Parallel workers may create the same entry; the last complete write wins
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        create(profile, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def invalidate(self, profile: Dict):
+        """Drop the cached state, e.g. after the account was deleted"""
+        try:
+            os.remove(self.path_for(profile))
+        except OSError:
+            pass
+
+
+def create_account_via_api(context, profile: Dict) -> Dict:
+    """Register the profile through the createAccount API route; an existing account is fine"""
+    response = context.request.post(CREATE_ACCOUNT_URL, form={
+        "name": profile["name"],
+        "email": profile["email"],
+        "password": profile["password"],
+        "title": "Mr",
+        "birth_date": "15",
+        "birth_month": "5",
+        "birth_year": "1990",
+        "firstname": profile["first_name"],
+        "lastname": profile["last_name"],
+        "company": profile["company"],
+        "address1": profile["address1"],
+        "address2": profile["address2"],
+        "country": profile["country"],
+        "zipcode": profile["zipcode"],
+        "state": profile["state"],
+        "city": profile["city"],
+        "mobile_number": profile["mobile"],
+    })
+    return json.loads(response.text())
+
+
+def login_and_save_state(browser_pool, profile: Dict, path: str):
+    """Create the account if needed, log in through the UI once and save the storage state"""
+    from pages.home_page import HomePage
+    from pages.signup_login_page import SignupLoginPage
+    _, context = browser_pool.new_context()
+    try:
+        create_account_via_api(context, profile)
+        page = context.new_page()
+        home_page = HomePage(page)
+        home_page.navigate_to_home()
+        home_page.click_signup_login()
+        signup_page = SignupLoginPage(page)
+        signup_page.fill_login_details(profile["email"], profile["password"])
+        signup_page.click_login_button()
+        if not home_page.is_user_logged_in():
+            raise RuntimeError(f"Login failed for cached user {profile['email']}")
+        context.storage_state(path=path)
+    finally:
+        context.close()
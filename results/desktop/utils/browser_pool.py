@@ -0,0 +1,154 @@
+"""
+Browser pool for the desktop Playwright suite
+
+Browsers are launched once per process; each test is handed an isolated,
+pre-warmed context (with a blank page already open) and the replacement
+context is prepared while the previous test tears down.
+"""
+import time
+from collections import deque
+from typing import Callable, Dict, List
+
+
+class BrowserPoolStats:
+    """Context hand-out counters for a BrowserPool"""
+    def __init__(self):
+        self.browsers = 0
+        self.acquisitions = 0
+        self.contexts_created = 0
+        self.contexts_reused = 0
+        self.contexts_recycled = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def record_wait(self, wait_ms: float):
+        self.acquisitions += 1
+        self.wait_ms_total += wait_ms
+        self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def as_dict(self) -> Dict:
+        """Counters as stored in the desktop summary JSON"""
+        return {
+            "browsers": self.browsers,
+            "acquisitions": self.acquisitions,
+            "contexts_created": self.contexts_created,
+            "contexts_reused": self.contexts_reused,
+            "contexts_recycled": self.contexts_recycled,
+            "wait_ms_total": round(self.wait_ms_total, 3),
+            "wait_ms_avg": round(self.wait_ms_total / self.acquisitions, 3) if self.acquisitions else 0,
+            "wait_ms_max": round(self.wait_ms_max, 3),
+        }
+
+    @staticmethod
+    def merge_dicts(stats_dicts: List[Dict]) -> Dict:
+        """Combine as_dict() counters from several pytest-xdist workers"""
+        merged = BrowserPoolStats()
+        for stats in stats_dicts:
+            merged.browsers += stats.get("browsers", 0)
+            merged.acquisitions += stats.get("acquisitions", 0)
+            merged.contexts_created += stats.get("contexts_created", 0)
+            merged.contexts_reused += stats.get("contexts_reused", 0)
+            merged.contexts_recycled += stats.get("contexts_recycled", 0)
+            merged.wait_ms_total += stats.get("wait_ms_total", 0)
+            merged.wait_ms_max = max(merged.wait_ms_max, stats.get("wait_ms_max", 0))
+        return merged.as_dict()
+
+
+class PooledContext:
+    """A browser context handed out by the pool together with its pre-opened page"""
+    def __init__(self, browser, context, page, dedicated: bool = False):
+        self.browser = browser
+        self.context = context
+        self.page = page
+        self.uses = 0
+        # Created for one test (e.g. from a storage state) and closed on release
+        self.dedicated = dedicated
+
+
+class BrowserPool:
+    """Pre-launches ``size`` browsers and keeps one warm context ready per browser.
+
+    A context is closed and replaced after ``max_context_uses`` tests; with
+    more than one use its cookies and the current origin's storage are
+    cleared between tests.
+    """
+    def __init__(self, playwright, size: int = 1, headless: bool = True, max_context_uses: int = 1,
+                 context_options: Dict = None, browser_type: str = "chromium", launch_options: Dict = None,
+                 context_setup: Callable = None):
+        if size < 1 or max_context_uses < 1:
+            raise ValueError("size and max_context_uses must be at least 1")
+        self.max_context_uses = max_context_uses
+        self.context_options = context_options or {}
+        # Called with every new context, e.g. to install request routing
+        self.context_setup = context_setup
+        self.stats = BrowserPoolStats()
+        launcher = getattr(playwright, browser_type)
+        self._browsers = [launcher.launch(headless=headless, **(launch_options or {})) for _ in range(size)]
+        self.stats.browsers = size
+        self._next_browser = 0
+        self._idle = deque(self._new_context() for _ in range(size))
+
+    def new_context(self, **options):
+        """Plain context on the next pooled browser, with the pool's context options applied"""
+        browser = self._browsers[self._next_browser % len(self._browsers)]
+        self._next_browser += 1
+        context = browser.new_context(**{**self.context_options, **options})
+        if self.context_setup is not None:
+            self.context_setup(context)
+        self.stats.contexts_created += 1
+        return browser, context
+
+    def _new_context(self, dedicated: bool = False, **options) -> PooledContext:
+        browser, context = self.new_context(**options)
+        return PooledContext(browser, context, context.new_page(), dedicated=dedicated)
+
+    def acquire(self, storage_state: str = None) -> PooledContext:
+        """Hand out a warm context, creating one only if none is ready.
+
+        With ``storage_state`` a dedicated context is started from that saved
+        session instead, so the test begins already logged in.
+        """
+        start = time.perf_counter()
+        if storage_state is not None:
+            pooled = self._new_context(dedicated=True, storage_state=storage_state)
+        else:
+            pooled = self._idle.popleft() if self._idle else self._new_context()
+        if pooled.page.is_closed():
+            pooled.page = pooled.context.new_page()
+        pooled.uses += 1
+        self.stats.record_wait((time.perf_counter() - start) * 1000)
+        return pooled
+
+    def release(self, pooled: PooledContext):
+        """Take a context back and get the next warm context ready"""
+        if pooled.dedicated:
+            pooled.context.close()
+            return
+        if pooled.uses >= self.max_context_uses:
+            pooled.context.close()
+            self.stats.contexts_recycled += 1
+            self._idle.append(self._new_context())
+            return
+        self._reset(pooled)
+        self.stats.contexts_reused += 1
+        self._idle.append(pooled)
+
+    def _reset(self, pooled: PooledContext):
+        # Storage is per origin, so clear it before leaving the test's last page
+        if not pooled.page.is_closed():
+            pooled.page.evaluate("() => { try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} }")
+        pooled.context.clear_cookies()
+        for extra in pooled.context.pages:
+            if extra is not pooled.page:
+                extra.close()
+        if pooled.page.is_closed():
+            pooled.page = pooled.context.new_page()
+        else:
+            pooled.page.goto("about:blank")
+
+    def close(self):
+        """Close every idle context and browser"""
+        while self._idle:
+            self._idle.popleft().context.close()
+        for browser in self._browsers:
+            browser.close()
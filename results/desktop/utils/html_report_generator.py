@@ -7,363 +7,199 @@ from datetime import datetime
 
 
 from utils.test_utils import STATIC_JSON_FILE, STATIC_HTML_FILE
+from utils.thumbnails import ThumbnailBuilder, thumbnails_available
+from utils.report_engine import (REPORT_CSS, ReportWriter, get_template, render, summary_cards,
+                                 write_static_assets)
+
+# Items beyond this index share the last fade-in delay
+MAX_ANIMATED_ITEMS = 20
 
 class HTMLReportGenerator:
-    def __init__(self, test_results_file: str = STATIC_JSON_FILE):
+    def __init__(self, test_results_file: str = STATIC_JSON_FILE, screenshot_store=None, thumbnails: str = "files"):
         self.test_results_file = test_results_file
-        
-    def generate_beautiful_report(self):
+        # ScreenshotStore whose run manifest maps stored images back to step names
+        self.screenshot_store = screenshot_store
+        # 'files' (one small JPEG per screenshot), 'sprite' (one sheet for all) or 'off' (full images)
+        self.thumbnails = thumbnails
+        self.report_path = STATIC_HTML_FILE
+        self._thumbs = {}
+        self._sprite = None
+        self._sprite_positions = {}
+
+    def generate_beautiful_report(self, output_path: str = None):
         """Generate a beautiful HTML report"""
         # Read test results
         if not os.path.exists(self.test_results_file):
             return "No test results found"
-            
+
         with open(self.test_results_file, 'r') as f:
             data = json.load(f)
-            
-        html_content = self._create_html_template(data)
-        
-        # Save HTML report
-        report_path = STATIC_HTML_FILE
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        return report_path
-        
+
+        if output_path is not None:
+            self.report_path = output_path
+        self._prepare_thumbnails(data)
+
+        # Save HTML report next to the shared stylesheet
+        write_static_assets(os.path.dirname(self.report_path))
+        with ReportWriter(self.report_path) as writer:
+            self._write_report(writer.write, data)
+        return self.report_path
+
+    def _prepare_thumbnails(self, data):
+        """Build thumbnails for every resolvable screenshot up front, in one worker pool"""
+        if self.thumbnails == "off" or not thumbnails_available():
+            return
+        images = []
+        for test in data.get('test_results', []):
+            for screenshot in test.get('screenshots', []):
+                if screenshot:
+                    _, image_path = self._resolve(screenshot)
+                    if image_path is not None:
+                        images.append(image_path)
+        builder = ThumbnailBuilder()
+        self._thumbs = builder.build_all(images)
+        if self.thumbnails == "sprite":
+            self._sprite, self._sprite_positions = builder.build_sprite(self._thumbs)
+
     def _create_html_template(self, data):
         """Create HTML template with test results"""
+        chunks = []
+        self._write_report(chunks.append, data)
+        return "".join(chunks)
+
+    def _write_report(self, write, data):
+        """Render the page chunk by chunk, one test item at a time"""
         passed_tests = data.get('passed', 0)
-        failed_tests = data.get('failed', 0)
         total_tests = data.get('total_tests', 0)
         pass_rate = (passed_tests / total_tests * 100) if total_tests > 0 else 0
-        
-        html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Desktop Web Automation Test Report</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }}
-        
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 15px;
-            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }}
-        
-        .header {{
-            background: linear-gradient(135deg, #2c3e50 0%, #34495e 100%);
-            color: white;
-            padding: 30px;
-            text-align: center;
-        }}
-        
-        .header h1 {{
-            font-size: 2.5em;
-            margin-bottom: 10px;
-        }}
-        
-        .header p {{
-            font-size: 1.2em;
-            opacity: 0.9;
-        }}
-        
-        .summary {{
-            padding: 30px;
-            background: #f8f9fa;
-        }}
-        
-        .summary-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }}
-        
-        .summary-card {{
-            background: white;
-            padding: 25px;
-            border-radius: 10px;
-            text-align: center;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.08);
-            border-left: 4px solid;
-        }}
-        
-        .summary-card.total {{ border-left-color: #3498db; }}
-        .summary-card.passed {{ border-left-color: #27ae60; }}
-        .summary-card.failed {{ border-left-color: #e74c3c; }}
-        .summary-card.rate {{ border-left-color: #f39c12; }}
-        
-        .summary-card h3 {{
-            font-size: 2.5em;
-            margin-bottom: 10px;
-            color: #2c3e50;
-        }}
-        
-        .summary-card p {{
-            color: #7f8c8d;
-            font-weight: 600;
-        }}
-        
-        .progress-bar {{
-            width: 100%;
-            height: 10px;
-            background: #ecf0f1;
-            border-radius: 5px;
-            overflow: hidden;
-            margin: 20px 0;
-        }}
-        
-        .progress-fill {{
-            height: 100%;
-            background: linear-gradient(90deg, #27ae60, #2ecc71);
-            width: {pass_rate}%;
-            transition: width 0.5s ease;
-        }}
-        
-        .test-results {{
-            padding: 30px;
-        }}
-        
-        .test-results h2 {{
-            color: #2c3e50;
-            margin-bottom: 25px;
-            font-size: 1.8em;
-        }}
-        
-        .test-item {{
-            background: white;
-            margin-bottom: 20px;
-            border-radius: 10px;
-            overflow: hidden;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.08);
-            border-left: 4px solid;
-        }}
-        
-        .test-item.passed {{ border-left-color: #27ae60; }}
-        .test-item.failed {{ border-left-color: #e74c3c; }}
-        
-        .test-header {{
-            padding: 20px;
-            background: #f8f9fa;
-            cursor: pointer;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-        
-        .test-name {{
-            font-weight: 600;
-            color: #2c3e50;
-        }}
-        
-        .test-status {{
-            padding: 5px 15px;
-            border-radius: 20px;
-            color: white;
-            font-weight: 600;
-            font-size: 0.9em;
-        }}
-        
-        .test-status.passed {{ background: #27ae60; }}
-        .test-status.failed {{ background: #e74c3c; }}
-        
-        .test-details {{
-            padding: 20px;
-            display: none;
-        }}
-        
-        .test-details.show {{
-            display: block;
-        }}
-        
-        .test-meta {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 15px;
-            margin-bottom: 15px;
-        }}
-        
-        .meta-item {{
-            background: #f8f9fa;
-            padding: 10px;
-            border-radius: 5px;
-        }}
-        
-        .meta-label {{
-            font-weight: 600;
-            color: #7f8c8d;
-            font-size: 0.9em;
-        }}
-        
-        .meta-value {{
-            color: #2c3e50;
-            margin-top: 5px;
-        }}
-        
-        .screenshots {{
-            margin-top: 20px;
-        }}
-        
-        .screenshot-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(150px, 1fr));
-            gap: 10px;
-            margin-top: 10px;
-        }}
-        
-        .screenshot-item {{
-            background: #f8f9fa;
-            padding: 10px;
-            border-radius: 5px;
-            text-align: center;
-            font-size: 0.9em;
-            color: #7f8c8d;
-        }}
-        
-        .footer {{
-            background: #2c3e50;
-            color: white;
-            text-align: center;
-            padding: 20px;
-        }}
-        
-        @keyframes fadeIn {{
-            from {{ opacity: 0; transform: translateY(20px); }}
-            to {{ opacity: 1; transform: translateY(0); }}
-        }}
-        
-        .test-item {{
-            animation: fadeIn 0.5s ease forwards;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🚀 Desktop Web Automation Report</h1>
-            <p>Automation Exercise - Test Execution Results</p>
-            <p>Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
-        </div>
-        
-        <div class="summary">
-            <div class="summary-grid">
-                <div class="summary-card total">
-                    <h3>{total_tests}</h3>
-                    <p>Total Tests</p>
-                </div>
-                <div class="summary-card passed">
-                    <h3>{passed_tests}</h3>
-                    <p>Passed</p>
-                </div>
-                <div class="summary-card failed">
-                    <h3>{failed_tests}</h3>
-                    <p>Failed</p>
-                </div>
-                <div class="summary-card rate">
-                    <h3>{pass_rate:.1f}%</h3>
-                    <p>Pass Rate</p>
-                </div>
-            </div>
-            
-            <div class="progress-bar">
-                <div class="progress-fill"></div>
-            </div>
-        </div>
-        
-        <div class="test-results">
-            <h2>📋 Test Execution Details</h2>
-"""
-        
+        cards = summary_cards([
+            ("total", total_tests, "Total Tests"),
+            ("passed", passed_tests, "Passed"),
+            ("failed", data.get('failed', 0), "Failed"),
+            ("rate", f"{pass_rate:.1f}%", "Pass Rate"),
+        ])
+        sections = (self._generate_browser_pool_section(data.get('browser_pool'))
+                    + self._generate_request_blocking_section(data.get('request_blocking'))
+                    + self._generate_visual_regression_section(data.get('visual_regression')))
+        write(render('page_head.html', title="Desktop Web Automation Test Report", stylesheet=REPORT_CSS,
+                     body_class="desktop"))
+        write(render('page_header.html', heading="🚀 Desktop Web Automation Report",
+                     subtitle="Automation Exercise - Test Execution Results",
+                     generated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        write(render('summary.html', cards=cards, pass_rate=pass_rate, sections=sections,
+                     results_title="📋 Test Execution Details"))
+
         # Add test results
         for i, test in enumerate(data.get('test_results', [])):
-            status_class = test['status'].lower()
-            html += f"""
-            <div class="test-item {status_class}" style="animation-delay: {i * 0.1}s;">
-                <div class="test-header" onclick="toggleDetails({i})">
-                    <div class="test-name">{test['test_name']}</div>
-                    <div class="test-status {status_class}">{test['status']}</div>
-                </div>
-                <div class="test-details" id="details-{i}">
-                    <div class="test-meta">
-                        <div class="meta-item">
-                            <div class="meta-label">Duration</div>
-                            <div class="meta-value">{test['duration']:.2f} seconds</div>
-                        </div>
-                        <div class="meta-item">
-                            <div class="meta-label">Timestamp</div>
-                            <div class="meta-value">{test['timestamp']}</div>
-                        </div>
-                        <div class="meta-item">
-                            <div class="meta-label">Screenshots</div>
-                            <div class="meta-value">{len(test.get('screenshots', []))} captured</div>
-                        </div>
-                    </div>
-                    
-                    {f'<div class="meta-item"><div class="meta-label">Details</div><div class="meta-value">{test["details"]}</div></div>' if test.get('details') else ''}
-                    
-                    {self._generate_screenshots_section(test.get('screenshots', []))}
-                </div>
-            </div>
-"""
-        
-        html += """
-        </div>
-        
-        <div class="footer">
-            <p>🤖 Generated by Desktop Web Automation Framework</p>
-            <p>Powered by Playwright & Python</p>
-        </div>
-    </div>
-    
-    <script>
-        function toggleDetails(index) {
-            const details = document.getElementById(`details-${index}`);
-            details.classList.toggle('show');
-        }
-    </script>
-</body>
-</html>
-"""
+            write(self._render_test_item(i, test))
+
+        write(render('page_tail.html', footer="🤖 Generated by Desktop Web Automation Framework",
+                     powered_by="Powered by Playwright & Python"))
+
+    def _render_test_item(self, i, test):
+        """Render a single test result"""
+        details = ""
+        if test.get('details'):
+            details = render('meta_item.html', label="Details", value=test['details'])
+        return get_template('desktop_test_item.html').render({
+            "index": i,
+            "status_class": test['status'].lower(),
+            "status": test['status'],
+            "test_name": test['test_name'],
+            "delay": min(i, MAX_ANIMATED_ITEMS) * 0.1,
+            "duration": test['duration'],
+            "timestamp": test['timestamp'],
+            "screenshot_count": len(test.get('screenshots', [])),
+            "details": details,
+            "screenshots": self._generate_screenshots_section(test.get('screenshots', [])),
+        })
+
+    def _generate_browser_pool_section(self, stats):
+        """Generate browser pool section from the pool counters"""
+        if not stats:
+            return ""
+        return summary_cards([
+            ("total", stats.get('browsers', 0), "Pooled Browsers"),
+            ("passed", stats.get('contexts_created', 0),
+             f"Contexts Created ({stats.get('contexts_reused', 0)} reused)"),
+            ("rate", f"{stats.get('wait_ms_avg', 0):.1f}ms",
+             f"Avg Pool Wait (max {stats.get('wait_ms_max', 0):.1f} ms)"),
+        ])
+
+    def _generate_request_blocking_section(self, stats):
+        """Generate request blocking section from the route policy counters"""
+        if not stats:
+            return ""
+        label = "Would Block" if stats.get('mode') == "observe" else "Blocked"
+        return summary_cards([
+            ("failed", stats.get('requests_blocked', 0) + stats.get('requests_stubbed', 0),
+             f"Requests {label} (of {stats.get('requests_seen', 0)})"),
+            ("passed", f"{stats.get('bytes_saved', 0) / 1024:.0f} KB",
+             f"Bytes Saved ({stats.get('blocked_unknown_size', 0)} unsized)"),
+        ])
+
+    def _generate_visual_regression_section(self, visual):
+        """Generate visual regression section: counts plus a diff image per changed step"""
+        if not visual:
+            return ""
+        counts = visual.get('counts', {})
+        changed = counts.get('changed', 0) + counts.get('size_changed', 0)
+        html = summary_cards([
+            ("passed", counts.get('match', 0), "Steps Matching Baseline"),
+            ("failed", changed, f"Visual Changes (>{visual.get('threshold', 0) * 100:.2f}% pixels)"),
+            ("total", counts.get('new', 0) + counts.get('updated', 0), "New / Updated Baselines"),
+        ])
+        item = get_template('visual_diff_item.html')
+        items = "".join(
+            item.render({"href": self._report_href(result.get('diff_image') or result.get('image')),
+                         "step": result['step'], "status": result['status'].replace('_', ' '),
+                         "ratio": result.get('diff_ratio', 0) * 100})
+            for result in visual.get('results', []) if result.get('status') in ("changed", "size_changed")
+        )
+        if items:
+            html += render('visual_diffs.html', items=items)
         return html
-        
+
     def _generate_screenshots_section(self, screenshots):
         """Generate screenshots section"""
         if not screenshots:
             return ""
-            
-        html = """
-        <div class="screenshots">
-            <div class="meta-label">Screenshots</div>
-            <div class="screenshot-grid">
-"""
-        for screenshot in screenshots:
-            filename = os.path.basename(screenshot) if screenshot else "No screenshot"
-            html += f"""
-                <div class="screenshot-item">
-                    📷 {filename}
-                </div>
-"""
-        html += """
-            </div>
-        </div>
-"""
-        return html
+        return render('desktop_screenshots.html',
+                      items="".join(self._generate_screenshot_item(screenshot) for screenshot in screenshots))
+
+    def _generate_screenshot_item(self, screenshot):
+        """One screenshot, resolved through the store manifest to its step name and image"""
+        item = get_template('desktop_screenshot_item.html')
+        if not screenshot:
+            return item.render({"image": "", "label": "No screenshot"})
+        step, image_path = self._resolve(screenshot)
+        label = step or os.path.basename(screenshot)
+        if image_path is None:
+            return item.render({"image": "", "label": label})
+        image = render('desktop_screenshot_link.html', href=self._report_href(image_path),
+                       thumbnail=self._generate_thumbnail(image_path, label))
+        return item.render({"image": image, "label": label})
+
+    def _resolve(self, screenshot):
+        """(step name, image path) via the store manifest; without a store, the recorded file if it exists"""
+        if self.screenshot_store is not None:
+            return self.screenshot_store.resolve(screenshot)
+        return None, screenshot if os.path.exists(screenshot) else None
+
+    def _generate_thumbnail(self, image_path, label):
+        """Sprite cell, thumbnail or (without Pillow) the full image, loaded lazily"""
+        if image_path in self._sprite_positions:
+            x, y, width, height = self._sprite_positions[image_path]
+            return render('desktop_sprite_thumb.html', label=label, width=width, height=height,
+                          sprite=self._report_href(self._sprite), x=x, y=y)
+        if image_path in self._thumbs:
+            thumb, (width, height) = self._thumbs[image_path]
+            return render('desktop_thumb.html', src=self._report_href(thumb), width=width, height=height,
+                          label=label)
+        return render('desktop_image.html', src=self._report_href(image_path), label=label)
+
+    def _report_href(self, path):
+        return os.path.relpath(path, os.path.dirname(self.report_path)).replace(os.sep, '/')
 
 
 if __name__ == "__main__":
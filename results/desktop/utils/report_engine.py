@@ -0,0 +1,21 @@
+"""
+Shared report rendering engine, result store, trend dashboard, test scheduler, xdist result shards
+and pytest options (results/reporting) for the desktop suite
+
+The desktop suite runs with its own directory as the import root, so the
+repository root is appended to the path to reach the shared package.
+"""
+import os
+import sys
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from results.reporting import (REPORT_CSS, ReportWriter, Template, escape, get_template, render,  # noqa: E402
+                               stats_table, summary_cards, write_static_assets)
+from results.reporting.result_store import DEFAULT_DB_PATH, ResultStore  # noqa: E402
+from results.reporting.trends import compute_trends, render_dashboard, update_dashboard  # noqa: E402
+from results.reporting.duration_scheduler import DurationScheduler  # noqa: E402
+from results.reporting import pytest_plugin as results_plugin  # noqa: E402
+from results.reporting.worker_shards import ResultShards, is_xdist_controller, new_run_id, worker_id  # noqa: E402
@@ -0,0 +1,181 @@
+"""
+Request blocking and routing for desktop page loads
+
+A RoutePolicy decides for every request a context makes whether it is
+passed through, aborted or answered with an empty stub. RequestBlocker
+installs the policy with ``context.route`` and counts what was saved.
+Bytes saved come from response sizes learned in ``observe`` runs, which
+let everything through and record each URL's body size.
+"""
+import fnmatch
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from utils.test_utils import REPORTS_DIR
+
+
+RESOURCE_SIZES_FILE = os.path.join(REPORTS_DIR, 'resource_sizes.json')
+
+FIRST_PARTY_HOSTS = ("automationexercise.com", "www.automationexercise.com")
+# Ads, analytics and tracking hosts the site pulls in
+DEFAULT_BLOCK_PATTERNS = (
+    "*googlesyndication.com*", "*doubleclick.net*", "*google-analytics.com*",
+    "*googletagmanager.com*", "*googletagservices.com*", "*adservice.google.*",
+    "*fundingchoicesmessages.google.com*", "*facebook.net*", "*facebook.com/tr*",
+    "*amazon-adsystem.com*", "*adsbygoogle*",
+)
+DEFAULT_BLOCK_RESOURCE_TYPES = ("media", "font")
+# Third-party scripts are answered with an empty script so callers do not wait on a failed load
+STUB_CONTENT_TYPES = {"script": "application/javascript", "stylesheet": "text/css"}
+
+
+def _compile_patterns(patterns: Iterable[str]) -> Optional[re.Pattern]:
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns), re.IGNORECASE)
+
+
+class RoutePolicy:
+    """Which requests to block, stub or let through"""
+    def __init__(self, block_patterns: Iterable[str] = DEFAULT_BLOCK_PATTERNS,
+                 block_resource_types: Iterable[str] = DEFAULT_BLOCK_RESOURCE_TYPES,
+                 block_third_party_images: bool = True,
+                 first_party_hosts: Iterable[str] = FIRST_PARTY_HOSTS):
+        self._block_re = _compile_patterns(block_patterns)
+        self.block_resource_types = frozenset(block_resource_types)
+        self.block_third_party_images = block_third_party_images
+        self.first_party_hosts = frozenset(first_party_hosts)
+
+    def is_first_party(self, host: str) -> bool:
+        return host in self.first_party_hosts
+
+    def decide(self, url: str, resource_type: str) -> str:
+        """'allow', 'block' or 'stub' for a request"""
+        host = urlparse(url).hostname or ""
+        if self._block_re is not None and self._block_re.match(url):
+            return "stub" if resource_type in STUB_CONTENT_TYPES else "block"
+        if resource_type in self.block_resource_types:
+            return "block"
+        if resource_type == "image" and self.block_third_party_images and not self.is_first_party(host):
+            return "block"
+        return "allow"
+
+
+class RequestBlockerStats:
+    """Per-run counters of requests routed by a RequestBlocker"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests_seen = 0
+        self.requests_allowed = 0
+        self.requests_blocked = 0
+        self.requests_stubbed = 0
+        self.bytes_saved = 0
+        self.blocked_unknown_size = 0
+        self.blocked_by_type: Dict[str, int] = {}
+
+    def record(self, action: str, resource_type: str, size: Optional[int]):
+        with self._lock:
+            self.requests_seen += 1
+            if action == "allow":
+                self.requests_allowed += 1
+                return
+            if action == "stub":
+                self.requests_stubbed += 1
+            else:
+                self.requests_blocked += 1
+            self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+            if size is None:
+                self.blocked_unknown_size += 1
+            else:
+                self.bytes_saved += size
+
+    def as_dict(self) -> Dict:
+        """Counters as stored in the desktop summary JSON"""
+        with self._lock:
+            return {
+                "requests_seen": self.requests_seen,
+                "requests_allowed": self.requests_allowed,
+                "requests_blocked": self.requests_blocked,
+                "requests_stubbed": self.requests_stubbed,
+                "bytes_saved": self.bytes_saved,
+                "blocked_unknown_size": self.blocked_unknown_size,
+                "blocked_by_type": dict(sorted(self.blocked_by_type.items())),
+            }
+
+    @staticmethod
+    def merge_dicts(stats_dicts: List[Dict]) -> Dict:
+        """Combine as_dict() counters from several pytest-xdist workers"""
+        merged: Dict = {}
+        for stats in stats_dicts:
+            for key, value in stats.items():
+                if isinstance(value, dict):
+                    bucket = merged.setdefault(key, {})
+                    for sub_key, count in value.items():
+                        bucket[sub_key] = bucket.get(sub_key, 0) + count
+                else:
+                    merged[key] = merged.get(key, 0) + value
+        return merged
+
+
+class RequestBlocker:
+    """Applies a RoutePolicy to browser contexts; ``mode`` is 'on', 'observe' or 'off'"""
+    def __init__(self, policy: RoutePolicy = None, mode: str = "on", sizes_file: str = RESOURCE_SIZES_FILE):
+        if mode not in ("on", "observe", "off"):
+            raise ValueError(f"Unknown request blocking mode: {mode}")
+        self.policy = policy or RoutePolicy()
+        self.mode = mode
+        self.sizes_file = sizes_file
+        self.stats = RequestBlockerStats()
+        self._sizes = self._load_sizes()
+        self._sizes_lock = threading.Lock()
+
+    def _load_sizes(self) -> Dict[str, int]:
+        try:
+            with open(self.sizes_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def install(self, context):
+        """Route every request of ``context`` through the policy"""
+        if self.mode == "on":
+            context.route("**/*", self._handle)
+        elif self.mode == "observe":
+            context.on("requestfinished", self._observe)
+
+    def _handle(self, route):
+        request = route.request
+        action = self.policy.decide(request.url, request.resource_type)
+        self.stats.record(action, request.resource_type, self._sizes.get(request.url))
+        if action == "block":
+            route.abort()
+        elif action == "stub":
+            route.fulfill(status=200, body="", content_type=STUB_CONTENT_TYPES[request.resource_type])
+        else:
+            route.continue_()
+
+    def _observe(self, request):
+        action = self.policy.decide(request.url, request.resource_type)
+        try:
+            size = request.sizes()["responseBodySize"]
+        except Exception:
+            size = None
+        if size is not None:
+            with self._sizes_lock:
+                self._sizes[request.url] = size
+        # What the policy would have saved had it been on
+        self.stats.record(action, request.resource_type, size)
+
+    def save_sizes(self):
+        """Persist response sizes learned in observe mode"""
+        if self.mode != "observe":
+            return
+        os.makedirs(os.path.dirname(self.sizes_file), exist_ok=True)
+        with self._sizes_lock:
+            with open(self.sizes_file, 'w') as f:
+                json.dump(self._sizes, f)
@@ -0,0 +1,139 @@
+"""
+Off-thread screenshot capture for the desktop suite
+
+Only the browser grab runs on the test thread; converting (for WebP) and
+writing the image happen on a small worker pool. Images go to a
+content-addressed ScreenshotStore, so identical frames are written once.
+Paths are returned immediately and the files are guaranteed on disk after
+``flush()``.
+"""
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from utils.screenshot_store import ScreenshotStore
+
+
+SCREENSHOT_FORMATS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+
+class ScreenshotService:
+    """Captures screenshots as bytes and encodes/writes them on worker threads.
+
+    ``image_format`` is 'png', 'jpeg' or 'webp'; ``quality`` (0-100) applies
+    to JPEG and WebP. ``full_page`` False captures only the viewport.
+    """
+    def __init__(self, store: ScreenshotStore = None, image_format: str = "png", quality: int = 80,
+                 full_page: bool = False, workers: int = 2):
+        if image_format not in SCREENSHOT_FORMATS:
+            raise ValueError(f"Unsupported screenshot format: {image_format}")
+        if image_format == "webp":
+            try:
+                import PIL  # noqa: F401
+            except ImportError as e:
+                raise ImportError("WebP screenshots require the 'Pillow' package") from e
+        self.store = store or ScreenshotStore()
+        self.image_format = image_format
+        self.quality = quality
+        self.full_page = full_page
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="screenshot-writer")
+        self._pending: List = []
+        self._lock = threading.Lock()
+        self.captured = 0
+        self.capture_ms = 0.0
+        self.write_ms = 0.0
+
+    def capture(self, page, name: str, clip: Optional[Dict] = None, full_page: Optional[bool] = None) -> str:
+        """Grab a screenshot of ``page`` (or the ``clip`` region) for step ``name`` and queue it for writing.
+
+        Returns the store path; a frame already in the store is not written again.
+        """
+        start = time.perf_counter()
+        options = {"full_page": self.full_page if full_page is None else full_page}
+        if clip is not None:
+            options["clip"] = clip
+            options["full_page"] = False
+        if self.image_format == "jpeg":
+            # The browser encodes JPEG itself, so there is nothing left to do off-thread but write
+            options.update(type="jpeg", quality=self.quality)
+        else:
+            options["type"] = "png"
+        data = page.screenshot(**options)
+        # Keyed by the captured bytes, so the hash is known before any WebP encoding
+        path, needs_write = self.store.record(name, self.store.digest(data),
+                                              SCREENSHOT_FORMATS[self.image_format], len(data))
+        with self._lock:
+            if needs_write:
+                self._pending.append(self._executor.submit(self._write, data, path))
+            self.captured += 1
+            self.capture_ms += (time.perf_counter() - start) * 1000
+        return path
+
+    def _write(self, data: bytes, path: str):
+        start = time.perf_counter()
+        if self.image_format == "webp":
+            from PIL import Image
+            buffer = io.BytesIO()
+            Image.open(io.BytesIO(data)).save(buffer, format="WEBP", quality=self.quality)
+            data = buffer.getvalue()
+        self.store.write_object(path, data)
+        with self._lock:
+            self.write_ms += (time.perf_counter() - start) * 1000
+
+    def flush(self):
+        """Wait until every queued screenshot is on disk; re-raises the first write error"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def close(self):
+        """Flush pending writes and save this process's store manifest"""
+        self.flush()
+        self._executor.shutdown(wait=True)
+        self.store.save_manifest()
+
+    def stats(self) -> Dict:
+        """Time spent on the test thread vs. on the writer threads"""
+        with self._lock:
+            return {
+                "captured": self.captured,
+                "capture_ms_total": round(self.capture_ms, 3),
+                "write_ms_total": round(self.write_ms, 3),
+                **self.store.stats(),
+            }
+
+
+_service: Optional[ScreenshotService] = None
+_service_lock = threading.Lock()
+
+
+def configure_screenshot_service(**options) -> ScreenshotService:
+    """Replace the process-wide service used by BasePage.take_screenshot"""
+    global _service
+    with _service_lock:
+        if _service is not None:
+            _service.close()
+        _service = ScreenshotService(**options)
+        return _service
+
+
+def get_screenshot_service() -> ScreenshotService:
+    """Process-wide screenshot service, created with defaults on first use"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ScreenshotService()
+        return _service
+
+
+def close_screenshot_service() -> Optional[ScreenshotService]:
+    """Flush and shut down the process-wide service; called at session end"""
+    global _service
+    with _service_lock:
+        service, _service = _service, None
+    if service is not None:
+        service.close()
+    return service
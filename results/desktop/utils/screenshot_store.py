@@ -0,0 +1,211 @@
+"""
+Content-addressed screenshot store for the desktop suite
+
+Images are stored once under the SHA-256 of their bytes, so identical
+frames (e.g. the homepage captured by several tests or runs) share one
+file. Each run writes a manifest mapping step name -> hash; retention
+keeps the newest runs within a size budget and deletes objects no kept
+manifest refers to. Reusing an object refreshes its modification time, so
+retention can leave alone anything written or reused since the run
+started, including by a concurrent run that has not saved its manifest.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from utils.test_utils import SCREENSHOTS_DIR
+
+
+STORE_DIR = os.path.join(SCREENSHOTS_DIR, 'store')
+
+
+def _touch(path: str) -> bool:
+    """Refresh an existing object's modification time; False if it does not exist"""
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+class ScreenshotStore:
+    """Deduplicating image store with per-run manifests under ``root``"""
+    def __init__(self, root: str = STORE_DIR, run_id: Optional[str] = None, worker: str = "main"):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.manifests_dir = os.path.join(root, 'manifests')
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.worker = worker
+        # Objects modified after this are in use by a run still in progress
+        self.started_at = time.time()
+        self.steps: Dict[str, Dict] = {}
+        self.objects_written = 0
+        self.duplicates = 0
+        self._known = set()
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Dict]] = None
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def object_path(self, digest: str, ext: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.{ext}")
+
+    def record(self, step: str, digest: str, ext: str, size: int) -> Tuple[str, bool]:
+        """Add a step to this run's manifest; returns (object path, whether it must be written)"""
+        path = self.object_path(digest, ext)
+        with self._lock:
+            # A step name captured again in the same run gets a counter instead of replacing the first image
+            key, count = step, 1
+            while key in self.steps:
+                count += 1
+                key = f"{step} ({count})"
+            self.steps[key] = {"hash": digest, "file": os.path.relpath(path, self.root), "bytes": size,
+                                "captured_at": datetime.now().isoformat()}
+            # Objects queued but not yet written count as present too
+            exists = path in self._known or _touch(path)
+            self._known.add(path)
+            if exists:
+                self.duplicates += 1
+            return path, not exists
+
+    def write_object(self, path: str, data: bytes):
+        """Write an object atomically; parallel writers of the same content are harmless"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.objects_written += 1
+
+    def put(self, step: str, data: bytes, ext: str = "png") -> str:
+        """Store ``data`` for ``step`` (deduplicated) and return the object path"""
+        path, needs_write = self.record(step, self.digest(data), ext, len(data))
+        if needs_write:
+            self.write_object(path, data)
+        return path
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"steps": len(self.steps), "objects_written": self.objects_written,
+                    "duplicates": self.duplicates}
+
+    def save_manifest(self) -> Optional[str]:
+        """Write this process's manifest for the run"""
+        with self._lock:
+            if not self.steps:
+                return None
+            manifest = {"run_id": self.run_id, "worker": self.worker,
+                        "created_at": datetime.now().isoformat(), "steps": dict(self.steps)}
+        run_dir = os.path.join(self.manifests_dir, self.run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        path = os.path.join(run_dir, f"{self.worker}.json")
+        with open(path + ".tmp", 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + ".tmp", path)
+        self._index = None
+        return path
+
+    def _runs(self):
+        if not os.path.isdir(self.manifests_dir):
+            return []
+        return sorted(d for d in os.listdir(self.manifests_dir)
+                      if os.path.isdir(os.path.join(self.manifests_dir, d)))
+
+    def _load_run(self, run_id: str):
+        run_dir = os.path.join(self.manifests_dir, run_id)
+        for name in sorted(os.listdir(run_dir)):
+            if name.endswith(".json"):
+                with open(os.path.join(run_dir, name), 'r') as f:
+                    yield json.load(f)
+
+    def index(self, run_id: Optional[str] = None) -> Dict[str, Dict]:
+        """Map object hash -> {"steps": [...], "file": ...} for one run (default: this run)"""
+        run_id = run_id or self.run_id
+        if self._index is not None and run_id == self.run_id:
+            return self._index
+        index: Dict[str, Dict] = {}
+        if os.path.isdir(os.path.join(self.manifests_dir, run_id)):
+            for manifest in self._load_run(run_id):
+                for step, entry in manifest.get("steps", {}).items():
+                    item = index.setdefault(entry["hash"], {"steps": [], "file": entry["file"]})
+                    item["steps"].append(step)
+        if run_id == self.run_id:
+            self._index = index
+        return index
+
+    def run_steps(self, run_id: Optional[str] = None):
+        """(step name, object path, hash) for every step recorded in a run"""
+        for digest, entry in sorted(self.index(run_id).items(), key=lambda item: min(item[1]["steps"])):
+            for step in sorted(entry["steps"]):
+                yield step, os.path.join(self.root, entry["file"]), digest
+
+    def resolve(self, screenshot: str) -> Tuple[Optional[str], Optional[str]]:
+        """(step name, object path) for a path returned by put(), via the run manifest"""
+        digest = os.path.splitext(os.path.basename(screenshot))[0]
+        entry = self.index().get(digest)
+        if entry is None:
+            return None, screenshot if os.path.exists(screenshot) else None
+        return ", ".join(sorted(entry["steps"])), os.path.join(self.root, entry["file"])
+
+    def apply_retention(self, keep_runs: int = 20, max_bytes: Optional[int] = None) -> Dict:
+        """Drop manifests of old runs, then delete objects no remaining manifest references.
+
+        Only finished objects last modified before this store was created are
+        deleted: in-flight '.tmp' files and objects a concurrent run has
+        written or reused since then are kept.
+        """
+        runs = self._runs()
+        kept = runs[-keep_runs:] if keep_runs > 0 else []
+        referenced: Dict[str, int] = {}
+        run_refs = []
+        for run_id in reversed(kept):
+            files = {}
+            for manifest in self._load_run(run_id):
+                for entry in manifest.get("steps", {}).values():
+                    files[entry["file"]] = entry.get("bytes", 0)
+            run_refs.append((run_id, files))
+        # Newest runs first: stop keeping runs once the size budget is used up
+        total = 0
+        keep = set()
+        for position, (run_id, files) in enumerate(run_refs):
+            new_bytes = sum(size for f, size in files.items() if f not in referenced)
+            if max_bytes is not None and position > 0 and total + new_bytes > max_bytes:
+                break
+            keep.add(run_id)
+            total += new_bytes
+            for f, size in files.items():
+                referenced.setdefault(f, size)
+        removed_runs = [r for r in runs if r not in keep and r != self.run_id]
+        for run_id in removed_runs:
+            shutil.rmtree(os.path.join(self.manifests_dir, run_id), ignore_errors=True)
+        removed_objects = 0
+        if self.run_id in runs:
+            for manifest in self._load_run(self.run_id):
+                for entry in manifest.get("steps", {}).values():
+                    referenced.setdefault(entry["file"], entry.get("bytes", 0))
+        with self._lock:
+            for entry in self.steps.values():
+                referenced.setdefault(entry["file"], entry["bytes"])
+        if os.path.isdir(self.objects_dir):
+            for dirpath, _, filenames in os.walk(self.objects_dir):
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    if name.endswith(".tmp") or os.path.relpath(path, self.root) in referenced:
+                        continue
+                    try:
+                        if os.path.getmtime(path) >= self.started_at:
+                            continue
+                        os.remove(path)
+                    except FileNotFoundError:
+                        continue
+                    removed_objects += 1
+        return {"runs_kept": len(runs) - len(removed_runs), "runs_removed": len(removed_runs),
+                "objects_removed": removed_objects, "bytes_referenced": total}
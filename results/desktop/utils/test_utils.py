@@ -4,6 +4,7 @@ Test Utilities for Desktop Web Automation
 import os
 import json
 import logging
+import uuid
 from datetime import datetime
 from typing import Dict, Any
 
@@ -18,6 +19,10 @@ SCREENSHOTS_DIR = os.path.join(BASE_DIR, 'screenshots')
 STATIC_LOG_FILE = os.path.join(LOGS_DIR, 'execution_log_network_{ts}.txt'.format(ts=datetime.now().strftime('%Y%m%d_%H%M%S')))
 STATIC_JSON_FILE = os.path.join(REPORTS_DIR, 'test_execution_summary.json')
 STATIC_HTML_FILE = os.path.join(REPORTS_DIR, 'beautiful_desktop_report.html')
+SHARDS_DIR = os.path.join(REPORTS_DIR, 'shards')
+HISTORY_DIR = os.path.join(REPORTS_DIR, 'history')
+TREND_DASHBOARD_FILE = os.path.join(REPORTS_DIR, 'trend_dashboard.html')
+SCHEDULE_REPORT_FILE = os.path.join(REPORTS_DIR, 'schedule_report.json')
 
 class DesktopLogger:
     _instance = None
@@ -78,6 +83,27 @@ class TestDataGenerator:
             "mobile": "+1-555-123-4567"
         }
 
+    @staticmethod
+    def generate_cached_user_data(profile: str = "default") -> Dict[str, str]:
+        """Stable user data for a named profile, reused across runs by the storage-state cache"""
+        # Unique per machine so separate checkouts do not share one account
+        suffix = f"{uuid.getnode():x}"
+        return {
+            "name": f"Cached{profile.title()}User",
+            "email": f"cached_{profile}_{suffix}@example.com",
+            "password": "TestPassword123!",
+            "first_name": "Cached",
+            "last_name": "User",
+            "company": "Test Company",
+            "address1": "123 Test Street",
+            "address2": "Apt 456",
+            "country": "United States",
+            "state": "California",
+            "city": "Los Angeles",
+            "zipcode": "90210",
+            "mobile": "+1-555-123-4567"
+        }
+
 
 
 class DesktopReporter:
@@ -87,6 +113,12 @@ class DesktopReporter:
             cls._instance = super().__new__(cls)
             cls._instance.report_file = STATIC_JSON_FILE
             cls._instance.test_results = []
+            # Context hand-out counters from the browser pool, if one was used
+            cls._instance.browser_pool_stats = None
+            # Requests blocked/stubbed by the route policy, if one was used
+            cls._instance.request_blocking_stats = None
+            # Step screenshots compared with their baselines, if visual regression ran
+            cls._instance.visual_regression = None
         return cls._instance
 
     def add_test_result(self, test_name: str, status: str, duration: float, details: str = "", screenshots: list = None):
@@ -98,6 +130,10 @@ class DesktopReporter:
             "screenshots": screenshots or [],
             "timestamp": datetime.now().isoformat()
         }
+        self.add_result(result)
+
+    def add_result(self, result: Dict[str, Any]):
+        """Add an already built result, e.g. one merged from a worker shard"""
         self.test_results.append(result)
 
     def generate_report(self):
@@ -109,6 +145,12 @@ class DesktopReporter:
             "execution_time": datetime.now().isoformat(),
             "test_results": self.test_results
         }
+        if self.browser_pool_stats:
+            summary["browser_pool"] = self.browser_pool_stats
+        if self.request_blocking_stats:
+            summary["request_blocking"] = self.request_blocking_stats
+        if self.visual_regression:
+            summary["visual_regression"] = self.visual_regression
         with open(self.report_file, 'w') as f:
             json.dump(summary, f, indent=2)
         return summary
@@ -0,0 +1,95 @@
+"""
+Report thumbnails for step screenshots
+
+Full-size screenshots are shrunk to small JPEGs on a thread pool (Pillow
+releases the GIL while decoding and resizing) and cached by source file,
+so the HTML report only pulls a few KB per image. Optionally all
+thumbnails are packed into one sprite sheet, one request for the gallery.
+
+Needs the optional 'Pillow' package; without it the report falls back to
+lazily loaded full-size images.
+"""
+import hashlib
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+from utils.test_utils import REPORTS_DIR
+
+
+THUMBNAILS_DIR = os.path.join(REPORTS_DIR, 'thumbnails')
+SPRITE_COLUMNS = 10
+
+
+def thumbnails_available() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class ThumbnailBuilder:
+    """Builds ``size`` (width, height bound) thumbnails for many images at once"""
+    def __init__(self, thumb_dir: str = THUMBNAILS_DIR, size: Tuple[int, int] = (320, 200), quality: int = 70,
+                 workers: int = 4):
+        self.thumb_dir = thumb_dir
+        self.size = size
+        self.quality = quality
+        self.workers = workers
+
+    def thumb_path(self, source: str) -> str:
+        """Cache path keyed by the source path and its modification time"""
+        stat = os.stat(source)
+        key = hashlib.sha256(f"{os.path.abspath(source)}:{stat.st_mtime_ns}:{stat.st_size}:{self.size}".encode())
+        return os.path.join(self.thumb_dir, f"{key.hexdigest()[:32]}.jpg")
+
+    def _build(self, source: str) -> Optional[Tuple[str, Tuple[int, int]]]:
+        from PIL import Image
+        try:
+            path = self.thumb_path(source)
+            if os.path.exists(path):
+                with Image.open(path) as thumb:
+                    return path, thumb.size
+            with Image.open(source) as image:
+                image.draft("RGB", self.size)
+                image = image.convert("RGB")
+                image.thumbnail(self.size)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                image.save(tmp_path, format="JPEG", quality=self.quality)
+                os.replace(tmp_path, path)
+                return path, image.size
+        except OSError:
+            # Missing or unreadable source: the report shows its label only
+            return None
+
+    def build_all(self, sources: Iterable[str]) -> Dict[str, Tuple[str, Tuple[int, int]]]:
+        """source path -> (thumbnail path, (width, height)) for every image that could be read"""
+        sources = list(dict.fromkeys(sources))
+        if not sources:
+            return {}
+        os.makedirs(self.thumb_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="thumbnailer") as executor:
+            built = executor.map(self._build, sources)
+            return {source: thumb for source, thumb in zip(sources, built) if thumb is not None}
+
+    def build_sprite(self, thumbnails: Dict[str, Tuple[str, Tuple[int, int]]],
+                     name: str = "sprite.jpg") -> Tuple[Optional[str], Dict[str, Tuple[int, int, int, int]]]:
+        """Pack thumbnails into one sheet of fixed cells; returns (sheet path, source -> (x, y, w, h))"""
+        from PIL import Image
+        if not thumbnails:
+            return None, {}
+        cell_width, cell_height = self.size
+        columns = min(SPRITE_COLUMNS, len(thumbnails))
+        rows = math.ceil(len(thumbnails) / columns)
+        sheet = Image.new("RGB", (columns * cell_width, rows * cell_height), "white")
+        positions = {}
+        for position, (source, (thumb, (width, height))) in enumerate(thumbnails.items()):
+            x, y = (position % columns) * cell_width, (position // columns) * cell_height
+            with Image.open(thumb) as image:
+                sheet.paste(image, (x, y))
+            positions[source] = (x, y, width, height)
+        path = os.path.join(self.thumb_dir, name)
+        sheet.save(path, format="JPEG", quality=self.quality)
+        return path, positions
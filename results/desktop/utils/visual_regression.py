@@ -0,0 +1,196 @@
+"""
+Visual regression checks for step screenshots
+
+Every named step screenshot of a run is compared with the baseline saved
+for that step name. Cheap checks run first: an identical content hash (the
+store object name) settles a step without opening the image, and a
+perceptual hash within a couple of bits passes near-identical ones. Only
+the rest get a NumPy pixel comparison, which honours per-step masks and
+writes a diff image for the report. Each screenshot is decoded at most
+once for both checks.
+
+Needs the optional 'numpy' and 'Pillow' packages.
+"""
+import json
+import os
+import shutil
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from utils.test_utils import REPORTS_DIR
+
+
+BASELINES_DIR = os.path.join(REPORTS_DIR, 'visual_baselines')
+DIFFS_DIR = os.path.join(REPORTS_DIR, 'visual_diffs')
+HASH_SIZE = 8
+# Perceptual-hash bits two screenshots may differ by and still pass without a pixel diff
+PHASH_SKIP_DISTANCE = 2
+
+
+def _require_imaging():
+    try:
+        import numpy  # noqa: F401
+        from PIL import Image  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Visual regression requires the 'numpy' and 'Pillow' packages") from e
+
+
+def _open_rgb(path: str):
+    """Decoded RGB image, closed on return"""
+    from PIL import Image
+    with Image.open(path) as image:
+        return image.convert("RGB")
+
+
+def _pixels(image):
+    import numpy as np
+    return np.asarray(image, dtype=np.int16)
+
+
+def perceptual_hash(image) -> int:
+    """64-bit difference hash: brightness gradients of a 9x8 grayscale thumbnail.
+
+    ``image`` is a file path or an already decoded PIL image.
+    """
+    import numpy as np
+    from PIL import Image
+    if isinstance(image, str):
+        image = _open_rgb(image)
+    small = np.asarray(image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.BILINEAR), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hash_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def load_masks(path: Optional[str]) -> Dict[str, List[Sequence[int]]]:
+    """Masks file: {"step_name": [[x, y, width, height], ...], "*": [...]} ('*' applies to every step)"""
+    if not path:
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+class VisualBaselines:
+    """Baseline image per step name, with its content and perceptual hashes cached in an index"""
+    def __init__(self, baseline_dir: str = BASELINES_DIR):
+        self.baseline_dir = baseline_dir
+        self.index_file = os.path.join(baseline_dir, 'index.json')
+        try:
+            with open(self.index_file, 'r') as f:
+                self.index: Dict[str, Dict] = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def get(self, step: str) -> Optional[Dict]:
+        entry = self.index.get(step)
+        if entry is None or not os.path.exists(os.path.join(self.baseline_dir, entry["file"])):
+            return None
+        return entry
+
+    def path_of(self, entry: Dict) -> str:
+        return os.path.join(self.baseline_dir, entry["file"])
+
+    def update(self, step: str, image_path: str, content_hash: str, phash: int):
+        os.makedirs(self.baseline_dir, exist_ok=True)
+        file_name = f"{step}{os.path.splitext(image_path)[1]}"
+        shutil.copyfile(image_path, os.path.join(self.baseline_dir, file_name))
+        self.index[step] = {"file": file_name, "sha256": content_hash, "phash": f"{phash:016x}"}
+
+    def save(self):
+        os.makedirs(self.baseline_dir, exist_ok=True)
+        with open(self.index_file, 'w') as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+
+
+class VisualComparator:
+    """Compares step screenshots with their baselines.
+
+    A step fails when more than ``threshold`` of its unmasked pixels differ
+    by more than ``pixel_tolerance`` in any channel. Perceptual hashes
+    within ``phash_skip_distance`` bits are treated as unchanged without a
+    pixel comparison; None turns the pre-filter off. The small default
+    passes re-encoded or anti-aliasing-only changes, while layout and
+    colour changes still reach the pixel diff.
+    """
+    def __init__(self, baselines: VisualBaselines = None, threshold: float = 0.001, pixel_tolerance: int = 16,
+                 masks: Dict[str, List[Sequence[int]]] = None, phash_skip_distance: Optional[int] = PHASH_SKIP_DISTANCE,
+                 diff_dir: str = DIFFS_DIR, update_baselines: bool = False):
+        _require_imaging()
+        self.baselines = baselines or VisualBaselines()
+        self.threshold = threshold
+        self.pixel_tolerance = pixel_tolerance
+        self.masks = masks or {}
+        self.phash_skip_distance = phash_skip_distance
+        self.diff_dir = diff_dir
+        self.update_baselines = update_baselines
+
+    def _mask_for(self, step: str, shape):
+        import numpy as np
+        mask = np.zeros(shape[:2], dtype=bool)
+        for x, y, width, height in self.masks.get("*", []) + self.masks.get(step, []):
+            mask[max(y, 0):y + height, max(x, 0):x + width] = True
+        return mask
+
+    def compare(self, step: str, image_path: str, content_hash: str) -> Dict:
+        """Result dict for one step: status is 'new', 'updated', 'match', 'changed' or 'size_changed'"""
+        result = {"step": step, "image": image_path, "diff_ratio": 0.0, "hash_distance": 0, "diff_image": None}
+        baseline = self.baselines.get(step)
+        if baseline is None or self.update_baselines:
+            self.baselines.update(step, image_path, content_hash, perceptual_hash(image_path))
+            result["status"] = "new" if baseline is None else "updated"
+            return result
+        result["baseline"] = self.baselines.path_of(baseline)
+        if baseline["sha256"] == content_hash:
+            result["status"] = "match"
+            return result
+        # Decoded once here, for the hash and, if needed, the pixel comparison
+        image = _open_rgb(image_path)
+        distance = hash_distance(int(baseline["phash"], 16), perceptual_hash(image))
+        result["hash_distance"] = distance
+        if self.phash_skip_distance is not None and distance <= self.phash_skip_distance:
+            result["status"] = "match"
+            return result
+        return self._pixel_compare(step, image, result)
+
+    def _pixel_compare(self, step: str, image, result: Dict) -> Dict:
+        import numpy as np
+        current = _pixels(image)
+        baseline = _pixels(_open_rgb(result["baseline"]))
+        if current.shape != baseline.shape:
+            result.update(status="size_changed", diff_ratio=1.0)
+            return result
+        mask = self._mask_for(step, current.shape)
+        changed = (np.abs(current - baseline) > self.pixel_tolerance).any(axis=2) & ~mask
+        considered = mask.size - int(mask.sum())
+        ratio = float(changed.sum()) / considered if considered else 0.0
+        result["diff_ratio"] = round(ratio, 6)
+        if ratio <= self.threshold:
+            result["status"] = "match"
+            return result
+        result["status"] = "changed"
+        result["diff_image"] = self._write_diff(step, baseline, changed, mask)
+        return result
+
+    def _write_diff(self, step: str, baseline, changed, mask) -> str:
+        """Faded baseline with changed pixels in red and masked areas in grey"""
+        import numpy as np
+        from PIL import Image
+        diff = (baseline.mean(axis=2, keepdims=True) * 0.3 + 178).repeat(3, axis=2)
+        diff[mask] = (128, 128, 128)
+        diff[changed] = (230, 30, 30)
+        os.makedirs(self.diff_dir, exist_ok=True)
+        path = os.path.join(self.diff_dir, f"{step}_diff.png")
+        Image.fromarray(diff.astype(np.uint8)).save(path)
+        return path
+
+    def compare_all(self, steps: Iterable) -> Dict:
+        """Compare (step, image path, content hash) triples and save the baseline index"""
+        results = [self.compare(step, path, content_hash) for step, path, content_hash in steps]
+        self.baselines.save()
+        counts: Dict[str, int] = {}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        return {"threshold": self.threshold, "pixel_tolerance": self.pixel_tolerance,
+                "counts": counts, "results": results}
@@ -0,0 +1,4 @@
+# Shared HTML report rendering and result store for the API, desktop and android suites
+from .engine import (Template, ReportWriter, escape, get_template, render, stats_table, summary_cards,
+                     write_static_assets, REPORT_CSS)
+from .result_store import DEFAULT_DB_PATH, ResultStore
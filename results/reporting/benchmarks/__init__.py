@@ -0,0 +1 @@
+# Offline benchmarks for the shared report rendering engine
@@ -0,0 +1,114 @@
+"""
+Benchmark: template engine vs. f-string concatenation on large result sets
+
+Renders N synthetic desktop-style results twice: once the way the
+generators used to (one f-string per item appended with ``+=`` to a
+single string, then written), once with the compiled templates and
+ReportWriter. Reports time and peak Python memory for each. From the
+repository root:
+
+    python -m results.reporting.benchmarks.bench_render --sizes 10000 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from ..engine import ReportWriter, get_template
+
+
+def synthetic_results(count: int):
+    return [{
+        "test_name": f"synthetic_{i}",
+        "status": "FAIL" if i % 17 == 0 else "PASS",
+        "duration": 1.0 + i % 50 / 10,
+        "details": f"Step {i} & <checked>",
+        "timestamp": "2025-01-01T00:00:00",
+    } for i in range(count)]
+
+
+def render_concatenated(results, output_path):
+    """The previous approach: an f-string per item appended to one growing string"""
+    html = "<html><body>"
+    for i, test in enumerate(results):
+        status_class = test['status'].lower()
+        html += f"""
+            <div class="test-item {status_class}" style="animation-delay: {min(i, 20) * 0.1:.1f}s;">
+                <div class="test-header" onclick="toggleDetails({i})">
+                    <div class="test-name">{test['test_name']}</div>
+                    <div class="test-status {status_class}">{test['status']}</div>
+                </div>
+                <div class="test-details" id="details-{i}">
+                    <div class="test-meta">
+                        <div class="meta-item">
+                            <div class="meta-label">Duration</div>
+                            <div class="meta-value ">{test['duration']:.2f} seconds</div>
+                        </div>
+                        <div class="meta-item">
+                            <div class="meta-label">Timestamp</div>
+                            <div class="meta-value ">{test['timestamp']}</div>
+                        </div>
+                        <div class="meta-item">
+                            <div class="meta-label">Screenshots</div>
+                            <div class="meta-value ">0 captured</div>
+                        </div>
+                    </div>
+                    <div class="meta-item">
+                        <div class="meta-label">Details</div>
+                        <div class="meta-value ">{test['details']}</div>
+                    </div>
+                </div>
+            </div>
+"""
+    html += "</body></html>"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(html)
+
+
+def render_templates(results, output_path):
+    """Compiled templates (with escaping) written through a ReportWriter"""
+    item = get_template('desktop_test_item.html')
+    meta = get_template('meta_item.html')
+    with ReportWriter(output_path) as writer:
+        writer.write("<html><body>")
+        for i, test in enumerate(results):
+            writer.write(item.render({
+                "index": i, "status_class": test['status'].lower(), "status": test['status'],
+                "test_name": test['test_name'], "delay": min(i, 20) * 0.1, "duration": test['duration'],
+                "timestamp": test['timestamp'], "screenshot_count": 0,
+                "details": meta.render({"label": "Details", "value": test['details']}),
+                "screenshots": "",
+            }))
+        writer.write("</body></html>")
+
+
+def measure(render, results, output_path):
+    """Return (seconds, peak traced bytes) for one render"""
+    start = time.perf_counter()
+    render(results, output_path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    render(results, output_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'results':>10} {'renderer':>12} {'total s':>9} {'us/result':>10} {'peak MiB':>9}")
+        for size in args.sizes:
+            results = synthetic_results(size)
+            for name, render in (("concat", render_concatenated), ("templates", render_templates)):
+                output_path = os.path.join(tmp, f"{name}_{size}.html")
+                elapsed, peak = measure(render, results, output_path)
+                print(f"{size:>10} {name:>12} {elapsed:>9.2f} {elapsed / size * 1e6:>10.1f} {peak / 2 ** 20:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Duration-based test scheduling (longest processing time first)
+
+Every run records how long each test took (setup + call + teardown) in the
+result store. With ``--schedule lpt`` the next run uses the median of the
+recent durations to order tests longest first and, under pytest-xdist, to
+pack them into one group per worker: each unit goes to the worker with the
+least predicted load so far. The groups are pinned to workers through
+xdist's loadgroup mode, so a slow UI flow is no longer the last thing to
+start on a worker. Predicted and actual makespan are printed at the end of
+the run and written to a JSON report.
+
+Tests that depend on running in order (e.g. create, verify and delete a
+user) are kept together by scheduling whole classes or modules
+(``scope``, ``class`` by default), in their collected order.
+
+When the API and desktop suites run in one session, one scheduler plans
+both. Each suite is added with its directory. Durations are stored per
+suite, keyed by node ids relative to that directory, so the history of a
+combined run and of a run started inside one suite is the same.
+"""
+import heapq
+import json
+import os
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from .result_store import ResultStore
+
+
+# Keys under which the controller hands the estimates to its pytest-xdist workers
+ESTIMATES_KEY = "schedule_estimates"
+WORKERS_KEY = "schedule_workers"
+GROUP_PREFIX = "lpt"
+DEFAULT_SCOPE = "class"
+# Seconds assumed for a test without history when nothing else is known
+DEFAULT_ESTIMATE_S = 1.0
+
+
+def unit_of(nodeid: str, scope: str) -> str:
+    """Scheduling unit of a test: the test itself, its class or its module"""
+    if scope == "module":
+        return nodeid.split("::", 1)[0]
+    if scope == "class":
+        parts = nodeid.split("::")
+        return "::".join(parts[:2]) if len(parts) > 2 else parts[0]
+    return nodeid
+
+
+def lpt_schedule(units: Dict[str, float], workers: int) -> List[Tuple[float, List[str]]]:
+    """Pack units longest first onto the least loaded worker; returns (predicted load, units) per worker"""
+    bins: List[Tuple[float, List[str]]] = [(0.0, []) for _ in range(max(workers, 1))]
+    heap = [(0.0, index) for index in range(len(bins))]
+    for unit, estimate in sorted(units.items(), key=lambda item: (-item[1], item[0])):
+        load, index = heapq.heappop(heap)
+        bins[index][1].append(unit)
+        bins[index] = (load + estimate, bins[index][1])
+        heapq.heappush(heap, (load + estimate, index))
+    return bins
+
+
+def _base_nodeid(nodeid: str) -> str:
+    # xdist's loadgroup mode appends '@<group>' to node ids
+    return nodeid.split("@", 1)[0]
+
+
+def _nodeid_prefix(root: Optional[str], rootpath) -> str:
+    """Node id prefix of the tests under ``root`` in a session rooted at ``rootpath``"""
+    if root is None:
+        return ""
+    relative = os.path.relpath(root, str(rootpath))
+    if relative == "." or relative.startswith(".."):
+        return ""
+    return relative.replace(os.sep, "/") + "/"
+
+
+class DurationScheduler:
+    """pytest plugin: records item durations and, in 'lpt' mode, schedules by them"""
+    def __init__(self, config, suite: str, db_path: str, run_key: Optional[str], mode: str = "off",
+                 scope: str = DEFAULT_SCOPE, history_runs: int = 10,
+                 report_path: str = "reports/schedule_report.json", root: Optional[str] = None):
+        self.config = config
+        self.db_path = db_path
+        self.mode = mode
+        self.scope = scope
+        self.history_runs = history_runs
+        self.report_path = report_path
+        # (node id prefix, suite, run key), longest prefix first
+        self.suites: List[Tuple[str, str, Optional[str]]] = []
+        self.estimates: Dict[str, float] = {}
+        workerinput = getattr(config, "workerinput", None)
+        self.is_worker = workerinput is not None
+        if self.is_worker:
+            self.estimates = workerinput.get(ESTIMATES_KEY) or {}
+            self.workers = workerinput.get(WORKERS_KEY) or 1
+            if mode == "lpt" and self.workers > 1:
+                # Workers parse the original command line; make xdist tag the groups we assign
+                config.option.loadgroup = True
+        else:
+            self.workers = len(config.getoption("tx", None) or []) if config.getoption("dist", "no") != "no" else 1
+            if mode == "lpt" and self.workers > 1:
+                config.option.dist = "loadgroup"
+        self.add_suite(suite, run_key, root)
+        self.plan: List[Tuple[float, List[str]]] = []
+        self.durations: Dict[str, float] = {}
+        self.busy: Dict[str, float] = {}
+        self.first_start: Optional[float] = None
+        self.last_finish: Optional[float] = None
+        self.report: Optional[Dict] = None
+
+    @property
+    def suite(self) -> str:
+        return "+".join(suite for _, suite, _ in sorted(self.suites, key=lambda entry: entry[1]))
+
+    def add_suite(self, suite: str, run_key: Optional[str], root: Optional[str] = None):
+        """Schedule and record the tests under ``root`` (a suite directory) as ``suite``"""
+        prefix = _nodeid_prefix(root, self.config.rootpath)
+        self.suites.append((prefix, suite, run_key))
+        self.suites.sort(key=lambda entry: -len(entry[0]))
+        if self.mode == "lpt" and not self.is_worker:
+            with ResultStore(self.db_path) as store:
+                self.estimates.update({prefix + nodeid: ms / 1000 for nodeid, ms in
+                                       store.duration_estimates(suite, self.history_runs).items()})
+
+    def suite_of(self, nodeid: str) -> Tuple[str, str, Optional[str]]:
+        """(prefix, suite, run key) of the suite a node id belongs to"""
+        for entry in self.suites:
+            if nodeid.startswith(entry[0]):
+                return entry
+        return self.suites[-1]
+
+    def estimate(self, nodeid: str) -> float:
+        if nodeid in self.estimates:
+            return self.estimates[nodeid]
+        # New tests are assumed to be typical for the suite
+        return statistics.median(self.estimates.values()) if self.estimates else DEFAULT_ESTIMATE_S
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node):
+        node.workerinput[ESTIMATES_KEY] = self.estimates
+        node.workerinput[WORKERS_KEY] = self.workers
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collection_modifyitems(self, session, config, items):
+        """Reorder items by the LPT plan and tag each worker's share as one xdist group"""
+        if self.mode != "lpt" or not items:
+            return
+        units: Dict[str, List] = {}
+        for item in items:
+            units.setdefault(unit_of(item.nodeid, self.scope), []).append(item)
+        estimates = {unit: sum(self.estimate(item.nodeid) for item in unit_items)
+                     for unit, unit_items in units.items()}
+        self.plan = lpt_schedule(estimates, self.workers)
+        ordered = []
+        # Heaviest worker share first, so its first test starts as early as possible
+        for index, (_, bin_units) in sorted(enumerate(self.plan), key=lambda entry: -entry[1][0]):
+            for unit in bin_units:
+                for item in units[unit]:
+                    if self.workers > 1:
+                        item.add_marker(pytest.mark.xdist_group(f"{GROUP_PREFIX}{index}"))
+                    ordered.append(item)
+        items[:] = ordered
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_node_collection_finished(self, node, ids):
+        """Rebuild the plan on the controller from the group tags the workers collected"""
+        if self.mode != "lpt" or self.plan:
+            return
+        loads: Dict[str, Tuple[float, List[str]]] = {}
+        for nodeid in ids:
+            group = nodeid.rsplit("@", 1)[1] if "@" in nodeid else "default"
+            load, group_ids = loads.get(group, (0.0, []))
+            group_ids.append(_base_nodeid(nodeid))
+            loads[group] = (load + self.estimate(_base_nodeid(nodeid)), group_ids)
+        self.plan = [loads[group] for group in sorted(loads)]
+
+    def pytest_runtest_logreport(self, report):
+        if self.is_worker:
+            return
+        now = time.perf_counter()
+        if self.first_start is None:
+            self.first_start = now - report.duration
+        self.last_finish = now
+        nodeid = _base_nodeid(report.nodeid)
+        self.durations[nodeid] = self.durations.get(nodeid, 0.0) + report.duration
+        node = getattr(report, "node", None)
+        worker = node.gateway.id if node is not None else "main"
+        self.busy[worker] = self.busy.get(worker, 0.0) + report.duration
+
+    def pytest_sessionfinish(self, session):
+        if self.is_worker or not self.durations:
+            return
+        by_suite: Dict[Tuple[str, Optional[str]], Dict[str, float]] = {}
+        for nodeid, seconds in self.durations.items():
+            prefix, suite, run_key = self.suite_of(nodeid)
+            by_suite.setdefault((suite, run_key), {})[nodeid[len(prefix):]] = seconds * 1000
+        if any(run_key for _, run_key in by_suite):
+            with ResultStore(self.db_path) as store:
+                for (suite, run_key), durations in by_suite.items():
+                    if run_key:
+                        store.record_durations(suite, run_key, durations)
+        if self.mode != "lpt":
+            return
+        predicted = [load for load, _ in self.plan]
+        self.report = {
+            "suite": self.suite,
+            "scope": self.scope,
+            "workers": self.workers,
+            "tests_with_history": sum(1 for nodeid in self.durations if nodeid in self.estimates),
+            "tests": len(self.durations),
+            "predicted_makespan_s": round(max(predicted), 3) if predicted else None,
+            "predicted_loads_s": [round(load, 3) for load in predicted],
+            "actual_makespan_s": round(max(self.busy.values()), 3),
+            "actual_loads_s": {worker: round(busy, 3) for worker, busy in sorted(self.busy.items())},
+            "wall_time_s": round(self.last_finish - self.first_start, 3),
+        }
+        directory = os.path.dirname(self.report_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.report_path, 'w') as f:
+            json.dump(self.report, f, indent=2)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.report:
+            return
+        report = self.report
+        terminalreporter.write_sep("=", "LPT duration schedule")
+        terminalreporter.write_line(
+            f"{report['tests']} tests ({report['tests_with_history']} with history) on {report['workers']} "
+            f"worker(s), scheduled by {report['scope']}")
+        terminalreporter.write_line(
+            f"Predicted makespan: {report['predicted_makespan_s']}s  "
+            f"(loads {', '.join(f'{load}s' for load in report['predicted_loads_s'])})")
+        terminalreporter.write_line(
+            f"Actual makespan:    {report['actual_makespan_s']}s  "
+            f"(busy {', '.join(f'{worker} {busy}s' for worker, busy in report['actual_loads_s'].items())}; "
+            f"wall {report['wall_time_s']}s)")
+        terminalreporter.write_line(f"Schedule report: {self.report_path}")
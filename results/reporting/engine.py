@@ -0,0 +1,149 @@
+"""
+Template rendering for the HTML reports
+
+Templates are compiled once into Python functions that build a tuple of
+literal chunks and formatted fields and join it, so rendering an item is a
+single ``"".join`` instead of repeated string concatenation. Placeholders:
+
+    {{ name }}          value of ``name``, HTML-escaped
+    {{ name:.1f }}      formatted with the spec, then escaped
+    {{ name|raw }}      inserted as is (already rendered HTML)
+"""
+import html
+import os
+import re
+import shutil
+import threading
+from functools import lru_cache
+from typing import Iterable, List, Sequence
+
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+STATIC_DIR = os.path.join(os.path.dirname(__file__), 'static')
+REPORT_CSS = 'report.css'
+# Rendered chunks are joined and written once this many characters are pending
+WRITE_BUFFER_CHARS = 256 * 1024
+
+_PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_]\w*)\s*(?::([^}|]+?))?\s*(\|\s*raw\s*)?\}\}")
+_NEEDS_ESCAPE = re.compile(r"[&<>\"']").search
+
+
+def escape(value) -> str:
+    """HTML-escape any value for element text or a quoted attribute"""
+    value = value if type(value) is str else str(value)
+    # Most fields (names, numbers, timestamps) have nothing to escape
+    return html.escape(value, quote=True) if _NEEDS_ESCAPE(value) else value
+
+
+class Template:
+    """Template text compiled into a render function"""
+    def __init__(self, text: str, name: str = "<string>"):
+        self.name = name
+        self.fields: List[str] = []
+        pieces = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(text):
+            if match.start() > position:
+                pieces.append(repr(text[position:match.start()]))
+            field, spec, raw = match.group(1), match.group(2), match.group(3)
+            self.fields.append(field)
+            value = f"c[{field!r}]"
+            if spec:
+                value = f"format({value}, {spec.strip()!r})"
+            elif raw:
+                value = f"str({value})"
+            pieces.append(value if raw else f"e({value})")
+            position = match.end()
+        if position < len(text):
+            pieces.append(repr(text[position:]))
+        source = f"def render(c, e=escape):\n    return ''.join(({', '.join(pieces)},))\n"
+        namespace = {"escape": escape}
+        exec(compile(source, f"<template {name}>", "exec"), namespace)
+        # render(context) -> str; a missing field raises KeyError naming it
+        self.render = namespace["render"]
+
+
+@lru_cache(maxsize=None)
+def get_template(name: str) -> Template:
+    """Template from the templates directory, compiled on first use"""
+    with open(os.path.join(TEMPLATES_DIR, name), 'r', encoding='utf-8') as f:
+        return Template(f.read(), name)
+
+
+def render(name: str, **context) -> str:
+    return get_template(name).render(context)
+
+
+def summary_cards(cards: Iterable[Sequence]) -> str:
+    """Summary grid from (css kind, value, label) triples; values are pre-formatted"""
+    card = get_template('summary_card.html')
+    return render('summary_grid.html', cards="".join(
+        card.render({"kind": kind, "value": value, "label": label}) for kind, value, label in cards))
+
+
+def stats_table(headers: Sequence[str], rows: Iterable[Sequence]) -> str:
+    """Table of escaped cells; the first column is the row label"""
+    head = "".join(f"<th>{escape(h)}</th>" for h in headers)
+    body = "".join("<tr>" + "".join(f"<td>{escape(cell)}</td>" for cell in row) + "</tr>" for row in rows)
+    return render('stats_table.html', head=head, rows=body)
+
+
+class ReportWriter:
+    """Buffers rendered chunks in a list and writes them joined in large blocks"""
+    def __init__(self, path: str, buffer_chars: int = WRITE_BUFFER_CHARS):
+        self.path = path
+        self.buffer_chars = buffer_chars
+        self._chunks: List[str] = []
+        self._pending = 0
+        self._file = None
+
+    def __enter__(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        return self
+
+    def write(self, chunk: str):
+        self._chunks.append(chunk)
+        self._pending += len(chunk)
+        if self._pending >= self.buffer_chars:
+            self.flush()
+
+    def render(self, name: str, **context):
+        self.write(get_template(name).render(context))
+
+    def flush(self):
+        if self._chunks:
+            self._file.write("".join(self._chunks))
+            self._chunks = []
+            self._pending = 0
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+        self._file.close()
+
+
+_assets_written = set()
+_assets_lock = threading.Lock()
+
+
+def write_static_assets(report_dir: str) -> str:
+    """Copy the shared stylesheet next to the reports, once per directory and process"""
+    target = os.path.join(report_dir, REPORT_CSS)
+    with _assets_lock:
+        if target in _assets_written and os.path.exists(target):
+            return target
+        source = os.path.join(STATIC_DIR, REPORT_CSS)
+        os.makedirs(report_dir, exist_ok=True)
+        with open(source, 'rb') as f:
+            content = f.read()
+        try:
+            with open(target, 'rb') as f:
+                current = f.read()
+        except OSError:
+            current = None
+        if current != content:
+            shutil.copyfile(source, target)
+        _assets_written.add(target)
+    return target
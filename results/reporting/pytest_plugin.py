@@ -0,0 +1,44 @@
+"""
+pytest options shared by the API and desktop suites
+
+The result store and duration scheduling options are the same in both
+suites. Each suite's conftest registers this module as a plugin through
+register(), which does nothing if another conftest already did. So
+collecting both suites in one session (``python -m pytest api desktop``
+from results/) defines every option once.
+"""
+import sys
+
+
+PLUGIN_NAME = "results-reporting"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("results", "Result store and duration scheduling")
+    group.addoption(
+        "--results-db", default=None,
+        help="SQLite result store that every run is recorded in (default results/results.db, 'off' to skip)"
+    )
+    group.addoption(
+        "--trend-runs", type=int, default=30,
+        help="Runs shown in reports/trend_dashboard.html (0 to skip the dashboard)"
+    )
+    group.addoption(
+        "--schedule", choices=["off", "lpt"], default="off",
+        help="Order tests longest first and split them across xdist workers by recorded durations"
+    )
+    group.addoption(
+        "--schedule-scope", choices=["test", "class", "module"], default="class",
+        help="Unit kept together by --schedule lpt; 'class' (default) keeps tests that depend on their "
+             "order, like the API create/verify/delete chain, on one worker"
+    )
+    group.addoption(
+        "--schedule-history-runs", type=int, default=10,
+        help="Recent runs whose median test durations --schedule lpt predicts from"
+    )
+
+
+def register(pluginmanager):
+    """Add the shared options once, however many suite conftests ask for them"""
+    if not pluginmanager.has_plugin(PLUGIN_NAME):
+        pluginmanager.register(sys.modules[__name__], PLUGIN_NAME)
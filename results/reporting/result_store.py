@@ -0,0 +1,427 @@
+"""
+SQLite result store shared by the API, desktop and android suites
+
+Every finished run is written in one transaction (batched ``executemany``
+per table) to a WAL-mode database with indexed tables for runs, tests,
+steps, HTTP exchanges and artifacts. History queries such as the p95
+latency of one endpoint over the last 500 runs then read a single index
+range instead of re-parsing old summary JSON files.
+"""
+import json
+import math
+import os
+import sqlite3
+import statistics
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+
+RESULTS_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Override with the RESULTS_DB environment variable
+DEFAULT_DB_PATH = os.environ.get("RESULTS_DB", os.path.join(RESULTS_ROOT, "results.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    suite TEXT NOT NULL,
+    run_key TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    summary TEXT,
+    UNIQUE (suite, run_key)
+);
+CREATE INDEX IF NOT EXISTS runs_suite_time ON runs (suite, recorded_at);
+
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration_ms REAL,
+    details TEXT,
+    started_at TEXT,
+    UNIQUE (run_id, position)
+);
+CREATE INDEX IF NOT EXISTS tests_name_run ON tests (name, run_id);
+
+CREATE TABLE IF NOT EXISTS steps (
+    id INTEGER PRIMARY KEY,
+    test_id INTEGER NOT NULL REFERENCES tests (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS steps_test ON steps (test_id);
+
+CREATE TABLE IF NOT EXISTS exchanges (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    test_id INTEGER REFERENCES tests (id) ON DELETE CASCADE,
+    endpoint TEXT NOT NULL,
+    method TEXT,
+    url TEXT,
+    status_code INTEGER,
+    latency_ms REAL
+);
+CREATE INDEX IF NOT EXISTS exchanges_endpoint_run ON exchanges (endpoint, run_id, latency_ms);
+
+CREATE TABLE IF NOT EXISTS artifacts (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    test_id INTEGER REFERENCES tests (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    name TEXT,
+    path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_run ON artifacts (run_id);
+
+CREATE TABLE IF NOT EXISTS test_durations (
+    id INTEGER PRIMARY KEY,
+    suite TEXT NOT NULL,
+    run_key TEXT NOT NULL,
+    nodeid TEXT NOT NULL,
+    duration_ms REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS test_durations_suite_run ON test_durations (suite, run_key);
+
+CREATE TABLE IF NOT EXISTS ingested_files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    run_id INTEGER
+);
+"""
+
+PASS_STATUSES = ("PASS", "PASSED")
+API_BASE_PATH = "/api"
+
+
+def _normalize_status(status: str) -> str:
+    return "PASS" if str(status).upper() in PASS_STATUSES else "FAIL"
+
+
+def _endpoint_route(url: str) -> str:
+    """Route of an API URL without host and API base path, e.g. '/productsList'"""
+    path = urlparse(url).path or url
+    if path.startswith(API_BASE_PATH + "/"):
+        path = path[len(API_BASE_PATH):]
+    return path
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class ResultStore:
+    """Run history in one SQLite file; safe to share between threads of one process"""
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        # WAL lets reports read history while another suite is writing its run
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # Writing
+
+    def record_run(self, suite: str, run_key: str, tests: List[Dict], summary: Dict = None,
+                   recorded_at: str = None) -> int:
+        """Store one run in a single transaction; recording the same (suite, run_key) again replaces it.
+
+        Each test dict has ``name`` and ``status`` and optionally ``duration_ms``,
+        ``details``, ``started_at``, ``steps`` (name/status/details dicts),
+        ``exchanges`` (url/method/status_code/latency_ms dicts) and
+        ``artifacts`` (kind/name/path dicts).
+        """
+        statuses = [_normalize_status(test["status"]) for test in tests]
+        passed = statuses.count("PASS")
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM runs WHERE suite = ? AND run_key = ?", (suite, run_key))
+            run_id = self._conn.execute(
+                "INSERT INTO runs (suite, run_key, recorded_at, total, passed, failed, summary) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (suite, run_key, recorded_at or datetime.now().isoformat(), len(tests), passed,
+                 len(tests) - passed, json.dumps(summary, default=str) if summary is not None else None),
+            ).lastrowid
+            self._conn.executemany(
+                "INSERT INTO tests (run_id, position, name, status, duration_ms, details, started_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, position, test["name"], status, test.get("duration_ms"), test.get("details"),
+                  test.get("started_at")) for position, (test, status) in enumerate(zip(tests, statuses))],
+            )
+            test_ids = dict(self._conn.execute("SELECT position, id FROM tests WHERE run_id = ?", (run_id,)))
+            steps, exchanges, artifacts = [], [], []
+            for position, test in enumerate(tests):
+                test_id = test_ids[position]
+                for index, step in enumerate(test.get("steps", [])):
+                    steps.append((test_id, index, step["name"], step["status"], step.get("details")))
+                for exchange in test.get("exchanges", []):
+                    url = exchange.get("url") or ""
+                    exchanges.append((run_id, test_id, exchange.get("endpoint") or _endpoint_route(url),
+                                      exchange.get("method"), url, exchange.get("status_code"),
+                                      exchange.get("latency_ms")))
+                for artifact in test.get("artifacts", []):
+                    artifacts.append((run_id, test_id, artifact["kind"], artifact.get("name"), artifact["path"]))
+            self._conn.executemany(
+                "INSERT INTO steps (test_id, position, name, status, details) VALUES (?, ?, ?, ?, ?)", steps)
+            self._conn.executemany(
+                "INSERT INTO exchanges (run_id, test_id, endpoint, method, url, status_code, latency_ms) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", exchanges)
+            self._conn.executemany(
+                "INSERT INTO artifacts (run_id, test_id, kind, name, path) VALUES (?, ?, ?, ?, ?)", artifacts)
+        return run_id
+
+    def record_api_summary(self, summary: Dict, run_key: str) -> int:
+        """Store an APITestReporter summary; each result is one HTTP exchange"""
+        tests = [{
+            "name": result["test_name"],
+            "status": result["test_status"],
+            "duration_ms": result.get("response_time_ms"),
+            "details": result.get("details"),
+            "started_at": result.get("timestamp"),
+            "exchanges": [{"url": result.get("api_endpoint"), "method": result.get("http_method"),
+                           "status_code": result.get("status_code"), "latency_ms": result.get("response_time_ms")}],
+        } for result in summary.get("test_results", [])]
+        return self.record_run("api", run_key, tests, self._slim_summary(summary), summary.get("execution_time"))
+
+    def record_desktop_summary(self, summary: Dict, run_key: str, resolve=None) -> int:
+        """Store a DesktopReporter summary; screenshots become artifacts.
+
+        ``resolve`` maps a reported screenshot to (step name, image path),
+        e.g. ``ScreenshotStore.resolve``.
+        """
+        def artifact(screenshot):
+            step, path = resolve(screenshot) if resolve is not None else (None, None)
+            return {"kind": "screenshot", "name": step or os.path.basename(screenshot), "path": path or screenshot}
+
+        tests = [{
+            "name": result["test_name"],
+            "status": result["status"],
+            "duration_ms": result["duration"] * 1000 if result.get("duration") is not None else None,
+            "details": result.get("details"),
+            "started_at": result.get("timestamp"),
+            "artifacts": [artifact(screenshot) for screenshot in result.get("screenshots", []) if screenshot],
+        } for result in summary.get("test_results", [])]
+        return self.record_run("desktop", run_key, tests, self._slim_summary(summary),
+                               summary.get("execution_time"))
+
+    def record_android_result(self, result: Dict, run_key: str, recorded_at: str = None) -> int:
+        """Store one android test result with its steps and screenshots"""
+        test = {
+            "name": result.get("test", "unknown"),
+            "status": result.get("status", "failed"),
+            "steps": [{"name": step["step"], "status": step["status"], "details": step.get("details")}
+                      for step in result.get("steps", [])],
+            "artifacts": [{"kind": "screenshot", "name": field, "path": result[field]}
+                          for field in ("screenshot", "login_screenshot") if result.get(field)],
+        }
+        return self.record_run("android", run_key, [test], None, recorded_at)
+
+    def record_durations(self, suite: str, run_key: str, durations: Dict[str, float]):
+        """Store pytest item durations (setup + call + teardown, in ms) by node id"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM test_durations WHERE suite = ? AND run_key = ?", (suite, run_key))
+            self._conn.executemany(
+                "INSERT INTO test_durations (suite, run_key, nodeid, duration_ms) VALUES (?, ?, ?, ?)",
+                [(suite, run_key, nodeid, duration_ms) for nodeid, duration_ms in durations.items()])
+
+    def ingest_summaries(self, suite: str, paths: Iterable[str]) -> List[int]:
+        """Record summary JSON files not seen before (by path, size and mtime); returns the new run ids.
+
+        The run key is the file name without extension, so a run that is
+        already stored under that key is only marked as ingested.
+        """
+        with self._lock:
+            seen = {row[0]: (row[1], row[2]) for row in
+                    self._conn.execute("SELECT path, size, mtime_ns FROM ingested_files")}
+        pending = []
+        for path in paths:
+            path = os.path.abspath(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if seen.get(path) != (stat.st_size, stat.st_mtime_ns):
+                pending.append((stat.st_mtime_ns, path, stat.st_size))
+        run_ids = []
+        # Oldest first, so ids follow execution order
+        for mtime_ns, path, size in sorted(pending):
+            run_key = os.path.splitext(os.path.basename(path))[0]
+            existing = self._query("SELECT id FROM runs WHERE suite = ? AND run_key = ?", (suite, run_key))
+            if existing:
+                run_id = existing[0]["id"]
+            else:
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        summary = json.load(f)
+                except (OSError, ValueError):
+                    # Partially written or foreign file: try again on the next ingest
+                    continue
+                run_id = self._record_summary(suite, summary, run_key,
+                                              datetime.fromtimestamp(mtime_ns / 1e9).isoformat())
+                run_ids.append(run_id)
+            with self._lock, self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO ingested_files (path, size, mtime_ns, run_id) "
+                                   "VALUES (?, ?, ?, ?)", (path, size, mtime_ns, run_id))
+        return run_ids
+
+    def _record_summary(self, suite: str, summary: Dict, run_key: str, file_time: str) -> int:
+        if suite == "api":
+            return self.record_api_summary(summary, run_key)
+        if suite == "desktop":
+            return self.record_desktop_summary(summary, run_key)
+        if suite == "android":
+            return self.record_android_result(summary, run_key, recorded_at=file_time)
+        raise ValueError(f"Unknown suite: {suite}")
+
+    @staticmethod
+    def _slim_summary(summary: Dict) -> Dict:
+        # Per-test rows live in their own tables; keep only the aggregate sections
+        return {key: value for key, value in summary.items() if key != "test_results"}
+
+    # Querying
+
+    def _query(self, sql: str, params: Iterable = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def runs(self, suite: str = None, limit: int = 50) -> List[Dict]:
+        """Most recent runs first"""
+        sql = "SELECT id, suite, run_key, recorded_at, total, passed, failed FROM runs"
+        params = []
+        if suite is not None:
+            sql += " WHERE suite = ?"
+            params.append(suite)
+        sql += " ORDER BY recorded_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self._query(sql, params)]
+
+    def run_summary(self, run_id: int) -> Optional[Dict]:
+        rows = self._query("SELECT summary FROM runs WHERE id = ?", (run_id,))
+        return json.loads(rows[0]["summary"]) if rows and rows[0]["summary"] else None
+
+    def tests(self, run_id: int) -> List[Dict]:
+        return [dict(row) for row in self._query(
+            "SELECT id, position, name, status, duration_ms, details, started_at FROM tests "
+            "WHERE run_id = ? ORDER BY position", (run_id,))]
+
+    def test_history(self, name: str, suite: str = None, limit: int = 100) -> List[Dict]:
+        """Outcome and duration of one test across the most recent runs, newest first"""
+        sql = ("SELECT runs.run_key, runs.recorded_at, tests.status, tests.duration_ms FROM tests "
+               "JOIN runs ON runs.id = tests.run_id WHERE tests.name = ?")
+        params = [name]
+        if suite is not None:
+            sql += " AND runs.suite = ?"
+            params.append(suite)
+        sql += " ORDER BY runs.recorded_at DESC, runs.id DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self._query(sql, params)]
+
+    def _recent_run_ids(self, suite: str, last_runs: int) -> List[int]:
+        return [row["id"] for row in self._query(
+            "SELECT id FROM runs WHERE suite = ? ORDER BY recorded_at DESC, id DESC LIMIT ?", (suite, last_runs))]
+
+    def latency_percentile(self, endpoint: str, pct: float = 95, last_runs: int = 500,
+                           suite: str = "api") -> Optional[float]:
+        """Percentile of every exchange with ``endpoint`` over the last ``last_runs`` runs"""
+        run_ids = self._recent_run_ids(suite, last_runs)
+        if not run_ids:
+            return None
+        # Served from the (endpoint, run_id, latency_ms) index without touching the table
+        values = [row[0] for row in self._query(
+            f"SELECT latency_ms FROM exchanges WHERE endpoint = ? AND latency_ms IS NOT NULL "
+            f"AND run_id IN ({','.join('?' * len(run_ids))}) ORDER BY latency_ms",
+            [endpoint] + run_ids)]
+        return percentile(values, pct)
+
+    def latency_trend(self, endpoint: str, pct: float = 95, last_runs: int = 500,
+                      suite: str = "api") -> List[Dict]:
+        """Per-run percentile of ``endpoint`` latency, oldest run first"""
+        run_ids = self._recent_run_ids(suite, last_runs)
+        if not run_ids:
+            return []
+        rows = self._query(
+            f"SELECT exchanges.run_id, runs.run_key, runs.recorded_at, exchanges.latency_ms FROM exchanges "
+            f"JOIN runs ON runs.id = exchanges.run_id WHERE exchanges.endpoint = ? "
+            f"AND exchanges.latency_ms IS NOT NULL AND exchanges.run_id IN ({','.join('?' * len(run_ids))}) "
+            f"ORDER BY runs.recorded_at, exchanges.run_id, exchanges.latency_ms",
+            [endpoint] + run_ids)
+        trend: List[Dict] = []
+        for row in rows:
+            if not trend or trend[-1]["run_id"] != row["run_id"]:
+                trend.append({"run_id": row["run_id"], "run_key": row["run_key"],
+                              "recorded_at": row["recorded_at"], "latencies": []})
+            trend[-1]["latencies"].append(row["latency_ms"])
+        for point in trend:
+            latencies = point.pop("latencies")
+            point["count"] = len(latencies)
+            point[f"p{pct:g}_ms"] = percentile(latencies, pct)
+        return trend
+
+    def test_outcomes(self, suite: str, last_runs: int = 30) -> List[Dict]:
+        """Every test row of the last ``last_runs`` runs of a suite, oldest run first"""
+        run_ids = self._recent_run_ids(suite, last_runs)
+        if not run_ids:
+            return []
+        return [dict(row) for row in self._query(
+            f"SELECT tests.run_id, runs.recorded_at, tests.name, tests.status, tests.duration_ms FROM tests "
+            f"JOIN runs ON runs.id = tests.run_id WHERE tests.run_id IN ({','.join('?' * len(run_ids))}) "
+            f"ORDER BY runs.recorded_at, tests.run_id, tests.position", run_ids)]
+
+    def duration_estimates(self, suite: str, last_runs: int = 10) -> Dict[str, float]:
+        """Median duration in ms of every node id over the last ``last_runs`` recorded runs"""
+        rows = self._query(
+            "SELECT nodeid, duration_ms FROM test_durations WHERE suite = ? AND run_key IN "
+            "(SELECT run_key FROM test_durations WHERE suite = ? GROUP BY run_key ORDER BY MAX(id) DESC LIMIT ?) "
+            "ORDER BY nodeid", (suite, suite, last_runs))
+        samples: Dict[str, List[float]] = {}
+        for row in rows:
+            samples.setdefault(row["nodeid"], []).append(row["duration_ms"])
+        return {nodeid: statistics.median(values) for nodeid, values in samples.items()}
+
+    def endpoints(self, suite: str = "api") -> List[str]:
+        return [row[0] for row in self._query(
+            "SELECT DISTINCT endpoint FROM exchanges JOIN runs ON runs.id = exchanges.run_id "
+            "WHERE runs.suite = ? ORDER BY endpoint", (suite,))]
+
+    def artifacts(self, run_id: int, kind: str = None) -> List[Dict]:
+        sql = "SELECT test_id, kind, name, path FROM artifacts WHERE run_id = ?"
+        params = [run_id]
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        return [dict(row) for row in self._query(sql, params)]
+
+    def prune(self, suite: str, keep_runs: int) -> int:
+        """Delete all but the newest ``keep_runs`` runs of a suite (tests, steps etc. cascade)"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM runs WHERE suite = ? AND id NOT IN "
+                "(SELECT id FROM runs WHERE suite = ? ORDER BY recorded_at DESC, id DESC LIMIT ?)",
+                (suite, suite, keep_runs))
+            return cursor.rowcount
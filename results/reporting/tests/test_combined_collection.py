@@ -0,0 +1,23 @@
+"""
+The API and desktop suites share pytest options; collecting both in one session must still work
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+RESULTS_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_api_and_desktop_collect_together():
+    for module in ("requests", "httpx", "playwright"):
+        pytest.importorskip(module)
+    completed = subprocess.run(
+        [sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider", "api", "desktop"],
+        cwd=RESULTS_DIR, capture_output=True, text=True, timeout=300,
+    )
+    assert completed.returncode == 0, completed.stdout[-2000:] + completed.stderr[-2000:]
+    assert "tests/test_api_automation.py::" in completed.stdout
+    assert "tests/test_desktop_automation.py::" in completed.stdout
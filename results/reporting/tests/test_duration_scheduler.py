@@ -0,0 +1,113 @@
+"""
+LPT packing, scheduling units and the estimate handoff from the xdist controller to its workers
+"""
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from ..duration_scheduler import ESTIMATES_KEY, WORKERS_KEY, DurationScheduler, lpt_schedule, unit_of
+from ..result_store import ResultStore
+
+
+class FakeConfig:
+    """The parts of a pytest config the scheduler reads"""
+    def __init__(self, rootpath, workers=1, workerinput=None):
+        self.rootpath = Path(rootpath)
+        self.option = SimpleNamespace(dist="load" if workers > 1 else "no", loadgroup=False)
+        self._options = {"dist": self.option.dist, "tx": ["popen"] * workers if workers > 1 else []}
+        if workerinput is not None:
+            self.workerinput = workerinput
+
+    def getoption(self, name, default=None):
+        return self._options.get(name, default)
+
+
+class FakeItem:
+    def __init__(self, nodeid):
+        self.nodeid = nodeid
+        self.markers = []
+
+    def add_marker(self, marker):
+        self.markers.append(marker)
+
+
+@pytest.mark.parametrize("scope, expected", [
+    ("test", "tests/test_a.py::TestA::test_one"),
+    ("class", "tests/test_a.py::TestA"),
+    ("module", "tests/test_a.py"),
+])
+def test_unit_of_scopes(scope, expected):
+    assert unit_of("tests/test_a.py::TestA::test_one", scope) == expected
+
+
+def test_unit_of_module_level_test():
+    assert unit_of("tests/test_b.py::test_two", "class") == "tests/test_b.py"
+    assert unit_of("tests/test_b.py::test_two[10_terms]", "test") == "tests/test_b.py::test_two[10_terms]"
+
+
+def test_lpt_schedule_packs_longest_first():
+    plan = lpt_schedule({"a": 5, "b": 4, "c": 3, "d": 3, "e": 3}, 2)
+    assert [units for _, units in plan] == [["a", "d"], ["b", "c", "e"]]
+    assert [load for load, _ in plan] == [8, 10]
+
+
+def test_lpt_schedule_worker_counts():
+    units = {"a": 2.0, "b": 1.0}
+    assert lpt_schedule(units, 1) == [(3.0, ["a", "b"])]
+    assert lpt_schedule(units, 0) == [(3.0, ["a", "b"])]
+    assert lpt_schedule(units, 4)[2:] == [(0.0, []), (0.0, [])]
+    assert lpt_schedule({}, 2) == [(0.0, []), (0.0, [])]
+
+
+def _store_durations(db_path, suite, durations_ms):
+    with ResultStore(db_path) as store:
+        store.record_durations(suite, "previous", durations_ms)
+
+
+def test_estimates_are_handed_to_workers(tmp_path):
+    db_path = str(tmp_path / "results.db")
+    _store_durations(db_path, "api", {"tests/test_api.py::TestAPI::test_one": 4000})
+    _store_durations(db_path, "desktop", {"tests/test_ui.py::TestUI::test_two": 9000})
+    controller = DurationScheduler(FakeConfig(tmp_path, workers=2), "api", db_path, "run", mode="lpt",
+                                   root=str(tmp_path / "api"))
+    controller.add_suite("desktop", "run", root=str(tmp_path / "desktop"))
+    assert controller.estimates == {"api/tests/test_api.py::TestAPI::test_one": 4.0,
+                                    "desktop/tests/test_ui.py::TestUI::test_two": 9.0}
+
+    node = SimpleNamespace(workerinput={"workerid": "gw0"})
+    controller.pytest_configure_node(node)
+    assert node.workerinput[WORKERS_KEY] == 2
+
+    worker_config = FakeConfig(tmp_path, workerinput=node.workerinput)
+    worker = DurationScheduler(worker_config, "api", db_path, None, mode="lpt", root=str(tmp_path / "api"))
+    assert worker.estimates == node.workerinput[ESTIMATES_KEY] == controller.estimates
+    assert worker.workers == 2
+    assert worker_config.option.loadgroup is True
+
+
+def test_collection_is_ordered_and_grouped_by_plan(tmp_path):
+    db_path = str(tmp_path / "results.db")
+    _store_durations(db_path, "api", {"tests/test_a.py::TestA::test_1": 1000, "tests/test_a.py::TestA::test_2": 1000,
+                                      "tests/test_b.py::TestB::test_1": 5000})
+    scheduler = DurationScheduler(FakeConfig(tmp_path, workers=2), "api", db_path, "run", mode="lpt")
+    items = [FakeItem(nodeid) for nodeid in ("tests/test_a.py::TestA::test_1", "tests/test_a.py::TestA::test_2",
+                                             "tests/test_b.py::TestB::test_1")]
+    scheduler.pytest_collection_modifyitems(None, None, items)
+    # The heavier class goes first; the lighter one keeps its collected order
+    assert [item.nodeid for item in items] == ["tests/test_b.py::TestB::test_1", "tests/test_a.py::TestA::test_1",
+                                              "tests/test_a.py::TestA::test_2"]
+    groups = [item.markers[0].args[0] for item in items]
+    assert groups[1] == groups[2] != groups[0]
+
+
+def test_durations_are_recorded_per_suite(tmp_path):
+    db_path = str(tmp_path / "results.db")
+    scheduler = DurationScheduler(FakeConfig(tmp_path), "api", db_path, "run-api", root=str(tmp_path / "api"))
+    scheduler.add_suite("desktop", "run-desktop", root=str(tmp_path / "desktop"))
+    for nodeid, duration in (("api/tests/test_api.py::test_one", 0.5), ("desktop/tests/test_ui.py::test_two", 2.0)):
+        scheduler.pytest_runtest_logreport(SimpleNamespace(nodeid=nodeid, duration=duration))
+    scheduler.pytest_sessionfinish(None)
+    with ResultStore(db_path) as store:
+        assert store.duration_estimates("api") == {"tests/test_api.py::test_one": 500.0}
+        assert store.duration_estimates("desktop") == {"tests/test_ui.py::test_two": 2000.0}
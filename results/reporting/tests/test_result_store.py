@@ -0,0 +1,38 @@
+"""
+Percentiles of the result store against known nearest-rank quantiles
+"""
+import pytest
+
+from ..result_store import ResultStore, percentile
+
+
+@pytest.mark.parametrize("values, pct, expected", [
+    (list(range(1, 21)), 95, 19),
+    (list(range(1, 11)), 50, 5),
+    (list(range(1, 11)), 90, 9),
+    (list(range(1, 11)), 100, 10),
+    (list(range(1, 11)), 0, 1),
+    (list(range(1, 101)), 99, 99),
+    ([7.5], 95, 7.5),
+])
+def test_percentile_nearest_rank(values, pct, expected):
+    assert percentile(values, pct) == expected
+
+
+def test_percentile_of_nothing():
+    assert percentile([], 95) is None
+
+
+def test_latency_percentile_over_runs(tmp_path):
+    with ResultStore(str(tmp_path / "results.db")) as store:
+        # 1..20 ms over two runs of ten exchanges
+        for run in range(2):
+            store.record_run("api", f"run{run}", [{
+                "name": f"test_{i}", "status": "PASS",
+                "exchanges": [{"url": "https://automationexercise.com/api/productsList", "method": "GET",
+                               "status_code": 200, "latency_ms": float(run * 10 + i)}],
+            } for i in range(1, 11)])
+        assert store.latency_percentile("/productsList", 95) == 19.0
+        assert store.latency_percentile("/productsList", 50) == 10.0
+        trend = store.latency_trend("/productsList", 50)
+        assert [point["p50_ms"] for point in trend] == [5.0, 15.0]
@@ -0,0 +1,41 @@
+"""
+Shard files of a distributed run: atomic writes, worker ordering and cleanup
+"""
+import json
+
+from ..worker_shards import ResultShards, worker_id
+
+
+def test_shards_are_read_in_worker_index_order(tmp_path):
+    shards = ResultShards(str(tmp_path), "run1")
+    for worker in ("gw10", "gw2", "gw0", "gw1"):
+        shards.write(worker, {"worker": worker})
+    assert [shard["worker"] for shard in shards.read_all()] == ["gw0", "gw1", "gw2", "gw10"]
+    assert not list((tmp_path / "run1").glob("*.tmp"))
+
+
+def test_runs_are_kept_apart_and_cleaned_up(tmp_path):
+    ResultShards(str(tmp_path), "old").write("gw0", {"worker": "stale"})
+    shards = ResultShards(str(tmp_path), "new")
+    assert shards.read_all() == []
+    shards.write("gw0", {"worker": "gw0"})
+    shards.cleanup()
+    assert shards.read_all() == []
+    assert ResultShards(str(tmp_path), "old").read_all() == [{"worker": "stale"}]
+
+
+def test_custom_serializer(tmp_path):
+    shards = ResultShards(str(tmp_path), "run", dumps=lambda payload: json.dumps(payload, indent=2),
+                          loads=json.loads)
+    path = shards.write("gw0", {"values": [1, 2]})
+    assert "\n" in open(path).read()
+    assert shards.read_all() == [{"values": [1, 2]}]
+
+
+def test_worker_id():
+    class Config:
+        pass
+    config = Config()
+    assert worker_id(config) is None
+    config.workerinput = {"workerid": "gw3"}
+    assert worker_id(config) == "gw3"
@@ -0,0 +1,187 @@
+"""
+Trend and flakiness dashboard over the run history in the result store
+
+Summary JSON files are ingested incrementally (only files that are new or
+changed since the last ingest), then the last N runs of a suite are turned
+into per-test pass rates, flakiness scores and duration trends, and per
+endpoint p95 latency trends, rendered as one HTML page with SVG sparklines.
+
+    python -m results.reporting.trends --suite api \\
+        --summaries "results/api/reports/history/*.json" --output results/api/reports/trend_dashboard.html
+"""
+import argparse
+import glob
+import os
+import statistics
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from .engine import REPORT_CSS, ReportWriter, get_template, render, summary_cards, write_static_assets
+from .result_store import DEFAULT_DB_PATH, ResultStore
+
+
+SPARKLINE_WIDTH = 120
+SPARKLINE_HEIGHT = 24
+# Latest duration above this multiple of the median of earlier runs counts as a regression
+REGRESSION_FACTOR = 1.5
+# Durations under this many ms are too noisy to flag
+REGRESSION_MIN_MS = 50
+
+
+def flakiness_score(statuses: Sequence[str]) -> float:
+    """Share of consecutive runs whose outcome flipped: 0 is stable, 1 alternates every run"""
+    if len(statuses) < 2:
+        return 0.0
+    flips = sum(1 for previous, current in zip(statuses, statuses[1:]) if previous != current)
+    return flips / (len(statuses) - 1)
+
+
+def compute_trends(store: ResultStore, suite: str, last_runs: int = 30) -> Dict:
+    """Per-test and per-endpoint trends over the last ``last_runs`` runs of a suite"""
+    rows = store.test_outcomes(suite, last_runs)
+    run_ids = list(dict.fromkeys(row["run_id"] for row in rows))
+    tests: Dict[str, Dict] = {}
+    for row in rows:
+        test = tests.setdefault(row["name"], {"name": row["name"], "statuses": [], "durations": []})
+        test["statuses"].append(row["status"])
+        test["durations"].append(row["duration_ms"])
+    for test in tests.values():
+        statuses = test["statuses"]
+        test["runs"] = len(statuses)
+        test["pass_rate"] = statuses.count("PASS") / len(statuses)
+        test["flakiness"] = flakiness_score(statuses)
+        test["last_status"] = statuses[-1]
+        durations = [d for d in test["durations"] if d is not None]
+        test["last_duration_ms"] = durations[-1] if durations else None
+        test["regression"] = _is_regression(durations)
+    latest = [row for row in rows if run_ids and row["run_id"] == run_ids[-1]]
+    endpoints = []
+    if suite == "api":
+        for endpoint in store.endpoints(suite):
+            trend = store.latency_trend(endpoint, 95, last_runs, suite)
+            if trend:
+                values = [point["p95_ms"] for point in trend]
+                endpoints.append({"endpoint": endpoint, "p95_ms": values, "runs": len(values),
+                                  "regression": _is_regression(values)})
+    return {
+        "suite": suite,
+        "runs": len(run_ids),
+        "latest_pass_rate": sum(row["status"] == "PASS" for row in latest) / len(latest) if latest else 0.0,
+        # Flaky first, then least reliable
+        "tests": sorted(tests.values(), key=lambda t: (-t["flakiness"], t["pass_rate"], t["name"])),
+        "endpoints": endpoints,
+    }
+
+
+def _is_regression(values: List[float]) -> bool:
+    if len(values) < 3:
+        return False
+    baseline = statistics.median(values[:-1])
+    return values[-1] >= REGRESSION_MIN_MS and values[-1] > baseline * REGRESSION_FACTOR
+
+
+def sparkline(values: Sequence[Optional[float]], width: int = SPARKLINE_WIDTH,
+              height: int = SPARKLINE_HEIGHT) -> str:
+    """Inline SVG line of the values, oldest left; missing values are skipped"""
+    points = [(i, v) for i, v in enumerate(values) if v is not None]
+    if not points:
+        return ""
+    low = min(v for _, v in points)
+    span = (max(v for _, v in points) - low) or 1
+    step = width / max(len(values) - 1, 1)
+    coords = " ".join(f"{i * step:.1f},{height - 2 - (v - low) / span * (height - 4):.1f}" for i, v in points)
+    last_x, last_y = coords.rsplit(" ", 1)[-1].split(",")
+    return (f'<svg class="sparkline" width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+            f'<polyline points="{coords}"/><circle cx="{last_x}" cy="{last_y}" r="2"/></svg>')
+
+
+def outcome_strip(statuses: Sequence[str], width: int = SPARKLINE_WIDTH, height: int = SPARKLINE_HEIGHT) -> str:
+    """One bar per run, green for a pass and red for a failure"""
+    if not statuses:
+        return ""
+    bar = width / len(statuses)
+    bars = "".join(f'<rect class="{"pass" if status == "PASS" else "fail"}" x="{i * bar:.1f}" y="0" '
+                   f'width="{max(bar - 1, 1):.1f}" height="{height}"/>' for i, status in enumerate(statuses))
+    return f'<svg class="outcomes" width="{width}" height="{height}" viewBox="0 0 {width} {height}">{bars}</svg>'
+
+
+def _format_ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.0f} ms"
+
+
+def render_dashboard(trends: Dict, output_path: str) -> str:
+    """Write the dashboard page next to the shared stylesheet"""
+    tests = trends["tests"]
+    flaky = sum(1 for test in tests if test["flakiness"] > 0)
+    regressions = sum(1 for test in tests if test["regression"]) + sum(1 for e in trends["endpoints"]
+                                                                        if e["regression"])
+    cards = summary_cards([
+        ("total", trends["runs"], "Runs Analysed"),
+        ("calls", len(tests), "Tests Tracked"),
+        ("failed", flaky, "Flaky Tests"),
+        ("response", regressions, "Slowdowns in Last Run"),
+    ])
+    sections = ""
+    if trends["endpoints"]:
+        endpoint_row = get_template('trend_endpoint_row.html')
+        sections = render('section_title.html', title="⏱️ Endpoint p95 Latency") + render(
+            'trend_table.html', head="<th>Endpoint</th><th>Runs</th><th>Trend</th><th>Latest p95</th>"
+                                     "<th>Median p95</th>",
+            rows="".join(endpoint_row.render({
+                "endpoint": endpoint["endpoint"], "runs": endpoint["runs"],
+                "trend": sparkline(endpoint["p95_ms"]),
+                "latest": _format_ms(endpoint["p95_ms"][-1]),
+                "median": _format_ms(statistics.median(endpoint["p95_ms"])),
+                "row_class": "regression" if endpoint["regression"] else "",
+            }) for endpoint in trends["endpoints"]))
+    write_static_assets(os.path.dirname(output_path))
+    test_row = get_template('trend_test_row.html')
+    with ReportWriter(output_path) as writer:
+        writer.render('page_head.html', title=f"{trends['suite'].title()} Test Trends", stylesheet=REPORT_CSS,
+                      body_class=f"trends {trends['suite']}")
+        writer.render('page_header.html', heading=f"📈 {trends['suite'].title()} Trends and Flakiness",
+                      subtitle=f"Last {trends['runs']} runs from the result store",
+                      generated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        writer.render('summary.html', cards=cards, pass_rate=trends["latest_pass_rate"] * 100, sections=sections,
+                      results_title="🧪 Tests by Flakiness")
+        writer.render('trend_table.html',
+                      head="<th>Test</th><th>Runs</th><th>Outcomes</th><th>Pass Rate</th><th>Flakiness</th>"
+                           "<th>Duration</th><th>Last</th>",
+                      rows="".join(test_row.render({
+                          "name": test["name"], "runs": test["runs"],
+                          "outcomes": outcome_strip(test["statuses"]),
+                          "pass_rate": test["pass_rate"] * 100, "flakiness": test["flakiness"],
+                          "trend": sparkline(test["durations"]),
+                          "last": _format_ms(test["last_duration_ms"]),
+                          "row_class": " ".join(c for c, on in (("flaky", test["flakiness"] > 0),
+                                                                ("regression", test["regression"])) if on),
+                      }) for test in tests))
+        writer.render('page_tail.html', footer="🤖 Generated from the shared result store",
+                      powered_by=f"{len(tests)} tests over {trends['runs']} runs")
+    return output_path
+
+
+def update_dashboard(suite: str, summary_paths: Sequence[str], output_path: str, db_path: str = DEFAULT_DB_PATH,
+                     last_runs: int = 30) -> str:
+    """Ingest new summary files, then re-render the dashboard"""
+    with ResultStore(db_path) as store:
+        store.ingest_summaries(suite, summary_paths)
+        return render_dashboard(compute_trends(store, suite, last_runs), output_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the trend and flakiness dashboard of a suite")
+    parser.add_argument("--suite", choices=["api", "desktop", "android"], required=True)
+    parser.add_argument("--summaries", nargs="*", default=[],
+                        help="Summary JSON files or glob patterns to ingest before rendering")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Result store database")
+    parser.add_argument("--runs", type=int, default=30, help="Number of most recent runs to analyse")
+    parser.add_argument("--output", default="trend_dashboard.html")
+    args = parser.parse_args()
+    paths = [path for pattern in args.summaries for path in sorted(glob.glob(pattern))]
+    report = update_dashboard(args.suite, paths, args.output, args.db, args.runs)
+    print(f"Trend dashboard generated: {report}")
+
+
+if __name__ == "__main__":
+    main()
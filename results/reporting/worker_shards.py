@@ -0,0 +1,78 @@
+"""
+Per-worker result shards for pytest-xdist runs
+
+Each worker writes its results to its own shard file; the controller
+merges every shard of the run in pytest_sessionfinish and renders the
+reports once. The API and desktop suites each pass in their shard
+directory and hand the run id to their workers under their own
+workerinput key, so both suites can shard within one session.
+"""
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+_WORKER_INDEX = re.compile(r"gw(\d+)\.json$")
+
+
+def worker_id(config) -> Optional[str]:
+    """xdist worker id (e.g. 'gw0') of this process, or None outside a worker"""
+    workerinput = getattr(config, "workerinput", None)
+    return workerinput.get("workerid") if workerinput else None
+
+
+def is_xdist_controller(config) -> bool:
+    """True in the controller process of a run distributed with pytest-xdist"""
+    return worker_id(config) is None and config.pluginmanager.getplugin("dsession") is not None
+
+
+def new_run_id() -> str:
+    """Identifier that keeps shards of concurrent or stale runs apart"""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+
+
+def _compact_dumps(payload: Dict) -> str:
+    return json.dumps(payload, separators=(",", ":"), default=str)
+
+
+def _shard_order(name: str):
+    # gw2 before gw10; anything not named after a worker goes last
+    match = _WORKER_INDEX.match(name)
+    return (0, int(match.group(1)), name) if match else (1, 0, name)
+
+
+class ResultShards:
+    """Shard files of one distributed run, one JSON document per worker"""
+    def __init__(self, shards_dir: str, run_id: str, dumps: Callable[[Dict], str] = _compact_dumps,
+                 loads: Callable = json.loads):
+        self.run_dir = os.path.join(shards_dir, run_id)
+        self.dumps = dumps
+        self.loads = loads
+
+    def write(self, worker: str, payload: Dict) -> str:
+        """Atomically write a worker's shard and return its path"""
+        os.makedirs(self.run_dir, exist_ok=True)
+        path = os.path.join(self.run_dir, f"{worker}.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.dumps(payload))
+        os.replace(tmp_path, path)
+        return path
+
+    def read_all(self) -> List[Dict]:
+        """Every completed shard of the run, ordered by worker index"""
+        if not os.path.isdir(self.run_dir):
+            return []
+        shards = []
+        for name in sorted(os.listdir(self.run_dir), key=_shard_order):
+            if name.endswith(".json"):
+                with open(os.path.join(self.run_dir, name), 'r', encoding='utf-8') as f:
+                    shards.append(self.loads(f.read()))
+        return shards
+
+    def cleanup(self):
+        """Remove the run's shard directory once merged"""
+        shutil.rmtree(self.run_dir, ignore_errors=True)